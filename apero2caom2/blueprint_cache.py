@@ -0,0 +1,259 @@
+# ***********************************************************************
+# ******************  CANADIAN ASTRONOMY DATA CENTRE  *******************
+# *************  CENTRE CANADIEN DE DONNÉES ASTRONOMIQUES  **************
+#
+#  (c) 2026.                            (c) 2026.
+#  Government of Canada                 Gouvernement du Canada
+#  National Research Council            Conseil national de recherches
+#  Ottawa, Canada, K1A 0R6              Ottawa, Canada, K1A 0R6
+#  All rights reserved                  Tous droits réservés
+#
+#  NRC disclaims any warranties,        Le CNRC dénie toute garantie
+#  expressed, implied, or               énoncée, implicite ou légale,
+#  statutory, of any kind with          de quelque nature que ce
+#  respect to the software,             soit, concernant le logiciel,
+#  including without limitation         y compris sans restriction
+#  any warranty of merchantability      toute garantie de valeur
+#  or fitness for a particular          marchande ou de pertinence
+#  purpose. NRC shall not be            pour un usage particulier.
+#  liable in any event for any          Le CNRC ne pourra en aucun cas
+#  damages, whether direct or           être tenu responsable de tout
+#  indirect, special or general,        dommage, direct ou indirect,
+#  consequential or incidental,         particulier ou général,
+#  arising from the use of the          accessoire ou fortuit, résultant
+#  software.  Neither the name          de l'utilisation du logiciel. Ni
+#  of the National Research             le nom du Conseil National de
+#  Council of Canada nor the            Recherches du Canada ni les noms
+#  names of its contributors may        de ses  participants ne peuvent
+#  be used to endorse or promote        être utilisés pour approuver ou
+#  products derived from this           promouvoir les produits dérivés
+#  software without specific prior      de ce logiciel sans autorisation
+#  written permission.                  préalable et particulière
+#                                       par écrit.
+#
+#  This file is part of the             Ce fichier fait partie du projet
+#  OpenCADC project.                    OpenCADC.
+#
+#  OpenCADC is free software:           OpenCADC est un logiciel libre ;
+#  you can redistribute it and/or       vous pouvez le redistribuer ou le
+#  modify it under the terms of         modifier suivant les termes de
+#  the GNU Affero General Public        la “GNU Affero General Public
+#  License as published by the          License” telle que publiée
+#  Free Software Foundation,            par la Free Software Foundation
+#  either version 3 of the              : soit la version 3 de cette
+#  License, or (at your option)         licence, soit (à votre gré)
+#  any later version.                   toute version ultérieure.
+#
+#  OpenCADC is distributed in the       OpenCADC est distribué
+#  hope that it will be useful,         dans l’espoir qu’il vous
+#  but WITHOUT ANY WARRANTY;            sera utile, mais SANS AUCUNE
+#  without even the implied             GARANTIE : sans même la garantie
+#  warranty of MERCHANTABILITY          implicite de COMMERCIALISABILITÉ
+#  or FITNESS FOR A PARTICULAR          ni d’ADÉQUATION À UN OBJECTIF
+#  PURPOSE.  See the GNU Affero         PARTICULIER. Consultez la Licence
+#  General Public License for           Générale Publique GNU Affero
+#  more details.                        pour plus de détails.
+#
+#  You should have received             Vous devriez avoir reçu une
+#  a copy of the GNU Affero             copie de la Licence Générale
+#  General Public License along         Publique GNU Affero avec
+#  with OpenCADC.  If not, see          OpenCADC ; si ce n’est
+#  <http://www.gnu.org/licenses/>.      pas le cas, consultez :
+#                                       <http://www.gnu.org/licenses/>.
+#
+#  $Revision: 4 $
+#
+# ***********************************************************************
+#
+
+"""
+Keep each blueprint file loaded once per process.
+
+ObsBlueprint.load_from_file parses the text of the file, and configures the WCS axes, for every destination URI of
+every file, although a pipeline run uses about ten blueprint files. The parsers change the blueprint they are given, by
+replacing function references with their values, and adding the values found in the headers, so each use gets a copy
+of the loaded template, which is much cheaper than loading the file again.
+
+A BlueprintPlan sorts the template entries once, into constants, (keywords, default) look-ups, and plugin function
+calls, and resolves each plugin function call to its function, so a missing function is reported when the blueprint
+file is loaded, instead of for every file. Making a copy only copies the containers a parser can change. The other
+values, which are most of a blueprint, are shared by all the copies.
+"""
+
+import logging
+import types
+
+from copy import copy
+from os import stat
+
+from caom2utils.blueprints import ObsBlueprint
+
+
+__all__ = ['BlueprintCache', 'BlueprintPlan']
+
+
+def _is_shared(name, value):
+    """The plugin module, the instances created from it, and loggers, are never copied."""
+    return isinstance(value, (types.ModuleType, logging.Logger)) or name.startswith('_module')
+
+
+def _has_containers(value):
+    if isinstance(value, (dict, list, set)):
+        return True
+    if isinstance(value, tuple):
+        return any(_has_containers(entry) for entry in value)
+    return False
+
+
+def _copy_containers(value):
+    """Copy the dicts, lists, sets, and tuples that hold them, in value. Everything else is shared."""
+    if isinstance(value, dict):
+        return {key: _copy_containers(entry) for key, entry in value.items()}
+    if isinstance(value, list):
+        return [_copy_containers(entry) for entry in value]
+    if isinstance(value, set):
+        return set(value)
+    if isinstance(value, tuple) and _has_containers(value):
+        return tuple(_copy_containers(entry) for entry in value)
+    return value
+
+
+class BlueprintPlan:
+    """A loaded ObsBlueprint, with the plan entries sorted once, so that each copy of the blueprint only copies the
+    entries that a parser can change.
+
+    The constants, look_ups, functions, and missing_functions are keyed by (extension, blueprint key), where the
+    extension is None for the primary plan.
+    """
+
+    def __init__(self, template):
+        """
+        :param template: ObsBlueprint, as loaded from the blueprint file. It is not changed.
+        """
+        self._template = template
+        # the plan entries that hold containers are copied for each use, the others are shared
+        self._mutable_keys = {}
+        self._constants = {}
+        self._look_ups = {}
+        # plugin function calls, resolved to the function, or to None when the plugin does not have it
+        self._function_calls = {}
+        self._plan_keys(None, template._plan)
+        for extension, extension_plan in template._extensions.items():
+            self._plan_keys(extension, extension_plan)
+        # any other attributes that hold containers, e.g. the WCS axis configuration
+        self._copied_attributes = [
+            name
+            for name, value in vars(template).items()
+            if name not in ('_plan', '_extensions') and not _is_shared(name, value) and _has_containers(value)
+        ]
+
+    @property
+    def constants(self):
+        return self._constants
+
+    @property
+    def look_ups(self):
+        return self._look_ups
+
+    @property
+    def functions(self):
+        """:return: dict of the plugin function for each plugin function call"""
+        return {key: value for key, value in self._function_calls.items() if value is not None}
+
+    @property
+    def missing_functions(self):
+        """:return: dict of the plugin function call text for each call the plugin has no function for"""
+        return {
+            key: self._plan_value(*key) for key, value in self._function_calls.items() if value is None
+        }
+
+    def _plan_value(self, extension, key):
+        template = self._template
+        return template._plan[key] if extension is None else template._extensions[extension][key]
+
+    def _plan_keys(self, extension, plan):
+        self._mutable_keys[extension] = [key for key, value in plan.items() if _has_containers(value)]
+        # the parsers call the instance methods when there is an instance, and the module functions otherwise
+        plugin = self._template._module_instance
+        if plugin is None:
+            plugin = self._template._module
+        for key, value in plan.items():
+            if ObsBlueprint.needs_lookup(value):
+                self._look_ups[(extension, key)] = value
+            elif ObsBlueprint.is_function(value):
+                if plugin is None:
+                    # the parsers leave function calls alone when there is no plugin
+                    self._constants[(extension, key)] = value
+                else:
+                    self._function_calls[(extension, key)] = getattr(plugin, value.split('(')[0], None)
+            else:
+                self._constants[(extension, key)] = value
+
+    @staticmethod
+    def _copy_plan(plan, mutable_keys):
+        result = dict(plan)
+        for key in mutable_keys:
+            result[key] = _copy_containers(result[key])
+        return result
+
+    def instantiate(self):
+        """
+        :return: ObsBlueprint with the content of the template, that can be changed without changing the template
+        """
+        template = self._template
+        result = copy(template)
+        result._plan = self._copy_plan(template._plan, self._mutable_keys[None])
+        result._extensions = {
+            extension: self._copy_plan(extension_plan, self._mutable_keys[extension])
+            for extension, extension_plan in template._extensions.items()
+        }
+        for name in self._copied_attributes:
+            setattr(result, name, _copy_containers(getattr(template, name)))
+        return result
+
+
+class BlueprintCache:
+    """Blueprint templates, by blueprint file name and plugin module file name. A template is loaded again when the
+    blueprint file modification time, or the plugin module, changes."""
+
+    def __init__(self):
+        self._templates = {}
+        self._hits = 0
+        self._misses = 0
+        self._logger = logging.getLogger(self.__class__.__name__)
+
+    @property
+    def hits(self):
+        return self._hits
+
+    @property
+    def misses(self):
+        return self._misses
+
+    def get(self, bp_fqn, module_fqn, module):
+        """
+        :param bp_fqn: str fully-qualified name of the blueprint file
+        :param module_fqn: str fully-qualified name of the plugin module file
+        :param module: the plugin module, as used by ObsBlueprint, or None
+        :return: ObsBlueprint loaded from bp_fqn, for the exclusive use of the caller
+        """
+        key = (bp_fqn, module_fqn)
+        mtime = stat(bp_fqn).st_mtime_ns
+        entry = self._templates.get(key)
+        if entry is not None and entry[0] == mtime and entry[1] is module:
+            self._hits += 1
+        else:
+            self._misses += 1
+            self._logger.debug(f'Load blueprint {bp_fqn}')
+            template = ObsBlueprint(module=module)
+            template.load_from_file(bp_fqn)
+            plan = BlueprintPlan(template)
+            for (extension, blueprint_key), value in plan.missing_functions.items():
+                where = blueprint_key if extension is None else f'{blueprint_key} in extension {extension}'
+                self._logger.warning(f'{module_fqn} has no function for {value}, used by {where} in {bp_fqn}.')
+            entry = (mtime, module, plan)
+            self._templates[key] = entry
+        return entry[2].instantiate()
+
+    def clear(self):
+        self._templates = {}
@@ -67,7 +67,9 @@
 #
 
 import logging
+import sys
 
+from collections import namedtuple
 from enum import Enum
 from os.path import basename
 from re import match
@@ -76,7 +78,7 @@ from urllib.parse import urlparse
 from caom2pipe.manage_composable import build_uri, get_keyword, StorageName
 
 
-__all__ = ['CFHTName']
+__all__ = ['CFHTName', 'CFHTPrefix', 'CFHTPrefixResolver', 'resolve_prefixes']
 
 
 class Inst(Enum):
@@ -450,6 +452,81 @@ class CFHTName(StorageName):
         )
 
 
+CFHTPrefix = namedtuple('CFHTPrefix', 'obs_id product_id')
+
+
+class CFHTPrefixResolver:
+    """Map CFHT file name prefixes, as they are listed in APERO provenance tables, to the obs_id and product_id a
+    CFHTName would have for the same name, without the StorageName machinery.
+
+    The obs_id and product_id values follow CFHTName.set_file_id, set_obs_id, and set_product_id. Results are
+    interned, and cached until the cache holds max_size entries, when it is emptied.
+    """
+
+    __slots__ = ('_cache', '_max_size', '_hits', '_misses')
+
+    def __init__(self, max_size=100000):
+        self._cache = {}
+        self._max_size = max_size
+        self._hits = 0
+        self._misses = 0
+
+    @property
+    def hits(self):
+        return self._hits
+
+    @property
+    def misses(self):
+        return self._misses
+
+    def resolve(self, prefix):
+        """
+        :param prefix: str CFHT file name, or the part of one before the first '_'
+        :return: CFHTPrefix
+        """
+        result = self._cache.get(prefix)
+        if result is None:
+            self._misses += 1
+            file_name = basename(urlparse(prefix).path)
+            file_id = CFHTName.remove_extensions(file_name)
+            obs_id = CFHTName.get_obs_id(file_id)
+            if obs_id == file_id:
+                temp = match('^[0-9]{5,7}', file_name)
+                if temp:
+                    obs_id = file_name[:temp.end()]
+            product_id = file_id.split('_')[0] if '_diag' in file_name else file_id
+            result = CFHTPrefix(sys.intern(obs_id), sys.intern(product_id))
+            if len(self._cache) >= self._max_size:
+                self._cache.clear()
+            self._cache[sys.intern(prefix)] = result
+        else:
+            self._hits += 1
+        return result
+
+    def resolve_all(self, prefixes):
+        """
+        :param prefixes: iterable of str CFHT file name prefixes
+        :return: dict of prefix: CFHTPrefix, with one entry for each unique prefix, in the order first seen
+        """
+        result = {}
+        for prefix in prefixes:
+            if prefix not in result:
+                result[prefix] = self.resolve(prefix)
+        return result
+
+
+# shared by all the provenance visits in a process
+_resolver = CFHTPrefixResolver()
+
+
+def resolve_prefixes(prefixes):
+    """
+    :param prefixes: iterable of str CFHT file name prefixes
+    :return: dict of prefix: CFHTPrefix, with one entry for each unique prefix, in the order first seen
+    """
+    return _resolver.resolve_all(prefixes)
+
+
 def get_instrument(headers, entry):
     """
     SF - 15-04-20 - slack - what if there's no INSTRUME or DETECTOR
@@ -72,17 +72,21 @@ application.
 
 'run' executes based on either provided lists of work, or files on disk.
 'run_incremental' executes incrementally, usually based on time-boxed intervals.
+'run_watched' executes continuously, based on notifications of files being written to the data_sources directories.
 """
 
 import logging
 import sys
 import traceback
 
-from caom2pipe.client_composable import ClientCollection
+from cadctap import CadcTapClient
+from caom2pipe.client_composable import ClientCollection, define_subject
 from caom2pipe.manage_composable import Config
 from caom2pipe.run_composable import run_by_state_runner_meta, run_by_todo_runner_meta
 from apero2caom2 import file2caom2_augmentation, provenance_augmentation
-from apero2caom2.data_source import APEROLocalFilesDataSource, APEROTodoFileDataSource
+from apero2caom2.data_source import (
+    APEROLocalFilesDataSource, APEROTodoFileDataSource, APEROWatchedFilesDataSource
+)
 from apero2caom2.main_app import APEROName
 
 
@@ -90,17 +94,38 @@ META_VISITORS = [file2caom2_augmentation]
 DATA_VISITORS = [provenance_augmentation]
 
 
+def _get_storage_inventory_tap_client(config):
+    result = None
+    if config.store_modified_files_only and config.storage_inventory_tap_resource_id:
+        # one query for all the files in a directory, instead of one request per file
+        result = CadcTapClient(define_subject(config), resource_id=config.storage_inventory_tap_resource_id)
+    return result
+
+
 def _common_init():
     config = Config()
     config.get_executors()
     clients = ClientCollection(config)
     if config.use_local_files:
-        data_sources = [APEROLocalFilesDataSource(config, clients.data_client)]
+        data_sources = [
+            APEROLocalFilesDataSource(
+                config,
+                clients.data_client,
+                storage_inventory_tap_client=_get_storage_inventory_tap_client(config),
+            )
+        ]
     else:
         data_sources = [APEROTodoFileDataSource(config, APEROName)]
     return config, clients, data_sources
 
 
+def _close(data_sources):
+    for data_source in data_sources:
+        if isinstance(data_source, APEROLocalFilesDataSource):
+            # wait for the background file moves
+            data_source.close()
+
+
 def _run():
     """
     Uses a todo file to identify the work to be done.
@@ -109,16 +134,19 @@ def _run():
         is used by airflow for task instance management and reporting.
     """
     config, clients, data_sources = _common_init()
-    return run_by_todo_runner_meta(
-        config=config,
-        clients=clients,
-        sources=data_sources,
-        meta_visitors=META_VISITORS,
-        data_visitors=DATA_VISITORS,
-        storage_name_ctor=APEROName,
-        organizer_module_name='apero2caom2.main_app',
-        organizer_class_name='APEROOrganizeExecutesRunnerMeta',
-    )
+    try:
+        return run_by_todo_runner_meta(
+            config=config,
+            clients=clients,
+            sources=data_sources,
+            meta_visitors=META_VISITORS,
+            data_visitors=DATA_VISITORS,
+            storage_name_ctor=APEROName,
+            organizer_module_name='apero2caom2.main_app',
+            organizer_class_name='APEROOrganizeExecutesRunnerMeta',
+        )
+    finally:
+        _close(data_sources)
 
 
 def run():
@@ -137,16 +165,19 @@ def _run_incremental():
     """Uses a state file with a timestamp to identify the work to be done.
     """
     config, clients, data_sources = _common_init()
-    return run_by_state_runner_meta(
-        config=config,
-        clients=clients,
-        sources=data_sources,
-        meta_visitors=META_VISITORS,
-        data_visitors=DATA_VISITORS,
-        storage_name_ctor=APEROName,
-        organizer_module_name='apero2caom2.main_app',
-        organizer_class_name='APEROOrganizeExecutesRunnerMeta',
-    )
+    try:
+        return run_by_state_runner_meta(
+            config=config,
+            clients=clients,
+            sources=data_sources,
+            meta_visitors=META_VISITORS,
+            data_visitors=DATA_VISITORS,
+            storage_name_ctor=APEROName,
+            organizer_module_name='apero2caom2.main_app',
+            organizer_class_name='APEROOrganizeExecutesRunnerMeta',
+        )
+    finally:
+        _close(data_sources)
 
 
 def run_incremental():
@@ -159,3 +190,44 @@ def run_incremental():
         tb = traceback.format_exc()
         logging.debug(tb)
         sys.exit(-1)
+
+
+def _run_watched():
+    """Uses notifications of files being written to the data_sources directories to identify the work to be done, and
+    does that work as the files arrive. Runs until interrupted.
+    """
+    config = Config()
+    config.get_executors()
+    clients = ClientCollection(config)
+    data_source = APEROWatchedFilesDataSource(
+        config, clients.data_client, storage_inventory_tap_client=_get_storage_inventory_tap_client(config)
+    )
+    try:
+        # the work list from the watched data source has no end, so the runner, reporter, and organizer are built once
+        run_by_todo_runner_meta(
+            config=config,
+            clients=clients,
+            sources=[data_source],
+            meta_visitors=META_VISITORS,
+            data_visitors=DATA_VISITORS,
+            storage_name_ctor=APEROName,
+            organizer_module_name='apero2caom2.main_app',
+            organizer_class_name='APEROOrganizeExecutesRunnerMeta',
+        )
+    except KeyboardInterrupt:
+        logging.info('Stopping.')
+    finally:
+        data_source.close()
+    return 0
+
+
+def run_watched():
+    """Wraps _run_watched in exception handling."""
+    try:
+        _run_watched()
+        sys.exit(0)
+    except Exception as e:
+        logging.error(e)
+        tb = traceback.format_exc()
+        logging.debug(tb)
+        sys.exit(-1)
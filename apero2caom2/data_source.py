@@ -66,29 +66,401 @@
 # ***********************************************************************
 #
 
+import atexit
+import logging
+import subprocess
+
+from array import array
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
+from hashlib import blake2b
+from os import scandir, stat
+from os.path import basename, dirname, exists, join
 from caom2utils.data_util import get_local_file_info
 from caom2pipe.astro_composable import check_fitsverify
+from caom2pipe.client_composable import query_tap_client
 from caom2pipe.data_source_composable import DataSource, LocalFilesDataSourceRunnerMeta, TodoFileDataSourceRunnerMeta
-from apero2caom2.main_app import APEROName
+from caom2pipe.manage_composable import StorageName
+from apero2caom2.file_state import FileStateIndex
+from apero2caom2.file_watcher import get_file_watcher
+from apero2caom2.fits_structure import check_structure
+from apero2caom2.move_queue import MoveQueue
+from apero2caom2.main_app import APEROName, group_by_observation, observation_groups_enabled
 
 
-class APEROTodoFileDataSource(TodoFileDataSourceRunnerMeta):
+class TodoFileWork:
+    """The unique, non-empty lines of a todo file, as a deque-like work list that creates each StorageName instance
+    only when it is removed from the list.
 
-    def _find_work(self, entry_path):
-        with open(entry_path) as f:
+    Only the file offset of each unique line is kept in memory, so the memory use does not depend on the length of the
+    lines, or on how much a StorageName instance holds. Duplicate lines are found by a 64-bit digest, which is only
+    kept while the file is first read. Lines with the same digest are compared, so a digest collision does not drop
+    an entry.
+    """
+
+    def __init__(self, fqn, storage_name_ctor):
+        """
+        :param fqn: str fully-qualified name of the todo file
+        :param storage_name_ctor: callable that returns a StorageName instance for a str line of the todo file
+        """
+        self._fqn = fqn
+        self._storage_name_ctor = storage_name_ctor
+        self._offsets = array('q')
+        self._next = 0
+        self._f = None
+        # entries added after the todo file is read, e.g. retries
+        self._extra = deque()
+        self._logger = logging.getLogger(self.__class__.__name__)
+        # digest: the offset of the line, or a tuple of offsets for the rare lines that have the same digest
+        seen = {}
+        duplicates = 0
+        with open(fqn, 'rb') as f, open(fqn, 'rb') as earlier:
+            offset = 0
             for line in f:
                 temp = line.strip()
                 if len(temp) > 0:
                     # ignore empty lines
-                    self._logger.debug(f'Adding entry {temp} to work list.')
-                    self._work.append(APEROName(
-                        instrument=self._config.lookup.get('instrument'), source_names=[temp]
-                    ))
+                    key = blake2b(temp, digest_size=8).digest()
+                    previous = seen.get(key)
+                    if previous is None:
+                        seen[key] = offset
+                        self._offsets.append(offset)
+                    else:
+                        previous = previous if isinstance(previous, tuple) else (previous,)
+                        if TodoFileWork._read_before(temp, previous, earlier):
+                            duplicates += 1
+                        else:
+                            seen[key] = previous + (offset,)
+                            self._offsets.append(offset)
+                offset += len(line)
+        self._logger.info(f'Found {len(self._offsets)} entries in {fqn}. Ignoring {duplicates} duplicates.')
+
+    @staticmethod
+    def _read_before(line, offsets, f):
+        """
+        :param line: bytes stripped line
+        :param offsets: tuple of int offsets of the earlier lines with the same digest
+        :param f: binary file object for the todo file
+        :return: True if one of the earlier lines is the same as line
+        """
+        for offset in offsets:
+            f.seek(offset)
+            if f.readline().strip() == line:
+                return True
+        return False
+
+    def __bool__(self):
+        return len(self) > 0
+
+    def __iter__(self):
+        while len(self) > 0:
+            yield self.popleft()
+
+    def __len__(self):
+        return len(self._offsets) - self._next + len(self._extra)
+
+    def append(self, entry):
+        self._extra.append(entry)
+
+    def popleft(self):
+        if self._next < len(self._offsets):
+            if self._f is None:
+                self._f = open(self._fqn, 'rb')
+            self._f.seek(self._offsets[self._next])
+            temp = self._f.readline().strip().decode()
+            self._next += 1
+            if self._next == len(self._offsets):
+                self._f.close()
+                self._f = None
+            self._logger.debug(f'Processing entry {temp} from the work list.')
+            return self._storage_name_ctor(temp)
+        if len(self._extra) > 0:
+            return self._extra.popleft()
+        raise IndexError('pop from an empty work list')
+
+
+class WindowedWork:
+    """A deque-like work list that returns the entries of another work list in key order, one window of entries at a
+    time.
+
+    Each window is sorted when it is first needed, so ordering n entries costs O(n log w) for a window of w entries,
+    and at most w entries are held in memory beyond those in the underlying work list, which may be a lazy
+    TodoFileWork.
+    """
+
+    def __init__(self, work, key, window):
+        """
+        :param work: deque-like collection of StorageName instances
+        :param key: callable that returns a sort key for a StorageName instance
+        :param window: int maximum number of entries that are sorted together
+        """
+        self._work = work
+        self._key = key
+        self._window = window
+        self._buffer = deque()
+
+    def __bool__(self):
+        return len(self) > 0
+
+    def __iter__(self):
+        while len(self) > 0:
+            yield self.popleft()
+
+    def __len__(self):
+        return len(self._buffer) + len(self._work)
+
+    def append(self, entry):
+        self._work.append(entry)
+
+    def popleft(self):
+        if len(self._buffer) == 0:
+            temp = []
+            while len(temp) < self._window and len(self._work) > 0:
+                temp.append(self._work.popleft())
+            # sorted is stable, so entries with the same key stay in the order they were found
+            self._buffer = deque(sorted(temp, key=self._key))
+        if len(self._buffer) == 0:
+            raise IndexError('pop from an empty work list')
+        return self._buffer.popleft()
+
+
+class GroupedWork:
+    """A deque-like work list that returns the entries of another work list grouped by observation, one window of
+    entries at a time.
+
+    Only the files for an observation that are in the same window are grouped, and at most one window of entries is
+    held in memory beyond those in the underlying work list, which may be a lazy TodoFileWork. Entries that have not
+    been grouped yet count as one each in len.
+    """
+
+    def __init__(self, work, window):
+        """
+        :param work: deque-like collection of APEROName instances
+        :param window: int maximum number of entries that are grouped together
+        """
+        self._work = work
+        self._window = window
+        self._buffer = deque()
+
+    def __bool__(self):
+        return len(self) > 0
+
+    def __iter__(self):
+        while len(self) > 0:
+            yield self.popleft()
+
+    def __len__(self):
+        return len(self._buffer) + len(self._work)
+
+    def append(self, entry):
+        self._work.append(entry)
+
+    def popleft(self):
+        if len(self._buffer) == 0:
+            temp = []
+            while len(temp) < self._window and len(self._work) > 0:
+                temp.append(self._work.popleft())
+            self._buffer = group_by_observation(temp)
+        if len(self._buffer) == 0:
+            raise IndexError('pop from an empty work list')
+        return self._buffer.popleft()
+
+
+def locality_key(storage_name):
+    """Put the files for the same DRS target, the same observation, and the same blueprint next to each other, so
+    the repeated reads of an observation, blueprint, or provenance input happen close together."""
+    return storage_name.target, storage_name.obs_id, storage_name.blueprint_name
+
+
+# the work_order lookup values, and the sort key for each, None for the order in which the data source finds the work
+WORK_ORDERS = {
+    'none': None,
+    'locality': locality_key,
+}
+
+
+class APEROTodoFileDataSource(TodoFileDataSourceRunnerMeta):
+
+    def _find_work(self, entry_path):
+        # build the APEROName instances just in time, so million-line todo files start immediately, in constant memory
+        self._work = organize_work(TodoFileWork(entry_path, self._build_storage_name), self._config)
+
+    def clean_up(self, entry, execution_result, current_count):
+        entry.release_fits_access()
+        super().clean_up(entry, execution_result, current_count)
+
+    def _build_storage_name(self, entry):
+        return APEROName(instrument=self._config.lookup.get('instrument'), source_names=[entry])
 
 
 class APEROLocalFilesDataSource(LocalFilesDataSourceRunnerMeta):
 
+    def __init__(self, config, cadc_client, storage_inventory_tap_client=None, **kwargs):
+        super().__init__(config, cadc_client, **kwargs)
+        self._file_state = None
+        file_state_index = config.lookup.get('file_state_index')
+        if file_state_index:
+            # only re-read and re-verify files whose size, mtime or inode has changed since the last scan
+            self._file_state = FileStateIndex(join(config.working_directory, file_state_index))
+        self._storage_inventory_tap_client = storage_inventory_tap_client
+        self._storage_inventory_chunk_size = config.lookup.get('storage_inventory_query_chunk_size', 500)
+        self._prepared_directories = set()
+        # the URIs that have been checked with a bulk query, and the md5sums of those that are at CADC
+        self._remote_queried = set()
+        self._remote_md5sums = {}
+        # fitsverify runs in a pool of worker threads, over batches of files, when there is more than one worker
+        self._fitsverify_workers = config.lookup.get('fitsverify_workers', 1)
+        self._fitsverify_batch_size = config.lookup.get('fitsverify_batch_size', 20)
+        self._fitsverify_pool = None
+        self._pending_verdicts = {}
+        # 'structural' checks the FITS block structure in-process first, and only runs fitsverify for the files that
+        # do not pass those checks
+        self._fits_verifier = config.lookup.get('fits_verifier', 'fitsverify')
+        self._move_queue = None
+        move_journal = config.lookup.get('move_journal')
+        if move_journal and self._cleanup_when_storing:
+            # success and failure moves happen on a background thread, instead of inline with discovery and ingestion
+            self._move_queue = MoveQueue(join(config.working_directory, move_journal), self._move_now)
+            atexit.register(self._move_queue.close)
+
+    def _candidate_uri(self, file_name):
+        return f'{StorageName.scheme}:{StorageName.collection}/{self._config.lookup.get("instrument")}/{file_name}'
+
+    def _prepare_directory(self, dir_name):
+        """Do the work that is cheaper to do once for all the files in a directory than once for each file.
+
+        :param dir_name: str fully-qualified directory name
+        """
+        self._logger.debug(f'Begin _prepare_directory for {dir_name}')
+        self._prepared_directories.add(dir_name)
+        candidates = []
+        with scandir(dir_name) as dir_listing:
+            for entry in dir_listing:
+                if entry.is_file() and not entry.name.startswith('.') and DataSource.default_filter(self, entry):
+                    candidates.append(entry)
+        self._prepare_candidates(candidates)
+        self._logger.debug('End _prepare_directory')
+
+    def _prepare_candidates(self, candidates):
+        """
+        :param candidates: list of os.DirEntry for the files that default_filter will be called for
+        """
+        if (
+            self._storage_inventory_tap_client is not None
+            and self._cleanup_when_storing
+            and self._store_modified_files_only
+        ):
+            self._prefetch_remote_md5sums(candidates)
+        if self._fitsverify_workers > 1 and self._fits_verifier != 'structural':
+            self._submit_fitsverify(candidates)
+
+    def _submit_fitsverify(self, candidates):
+        fqns = []
+        for entry in candidates:
+            if '.fits' in entry.name and (
+                self._file_state is None or self._file_state.get_verdict(entry.path, entry.stat()) is None
+            ):
+                fqns.append(entry.path)
+        if len(fqns) == 0:
+            return
+        if self._fitsverify_pool is None:
+            self._fitsverify_pool = ThreadPoolExecutor(max_workers=self._fitsverify_workers)
+        for start in range(0, len(fqns), self._fitsverify_batch_size):
+            batch = fqns[start:start + self._fitsverify_batch_size]
+            future = self._fitsverify_pool.submit(fitsverify_batch, batch)
+            for fqn in batch:
+                self._pending_verdicts[fqn] = future
+        self._logger.info(f'Submitted {len(fqns)} files to fitsverify with {self._fitsverify_workers} workers.')
+
+    def _prefetch_remote_md5sums(self, candidates):
+        uris = [self._candidate_uri(entry.name) for entry in candidates]
+        try:
+            self._remote_md5sums.update(
+                query_remote_md5sums(uris, self._storage_inventory_tap_client, self._storage_inventory_chunk_size)
+            )
+            self._remote_queried.update(uris)
+        except Exception as e:
+            # _is_remote_different falls back to one request per file for the URIs that are not in _remote_queried
+            self._logger.warning(f'Bulk Storage Inventory query failed with {e}. Checking files individually.')
+
+    def _is_remote_different(self, index, storage_name):
+        uri = storage_name.destination_uris[index]
+        if uri not in self._remote_queried:
+            return super()._is_remote_different(index, storage_name)
+        remote_md5sum = self._remote_md5sums.get(uri)
+        if remote_md5sum is None:
+            # the file is not at CADC
+            return True
+        local_file_info = storage_name.get_discovered_file_info(storage_name.source_names[index])
+        return _strip_md5_prefix(local_file_info.md5sum) != remote_md5sum
+
+    def _get_file_info(self, dir_entry):
+        if self._file_state is None:
+            return get_local_file_info(dir_entry.path)
+        return self._file_state.get_file_info(dir_entry.path, dir_entry.stat())
+
+    def _verify_entry(self, dir_entry):
+        """
+        :param dir_entry: os.DirEntry
+        :return: True if the file passes the check, False otherwise, re-using the recorded verdict for unchanged files
+        """
+        if self._file_state is None:
+            return self._verify_file(dir_entry.path)
+        result = self._file_state.get_verdict(dir_entry.path, dir_entry.stat())
+        if result is None:
+            result = self._verify_file(dir_entry.path)
+            self._file_state.set_verdict(dir_entry.path, result)
+        return result
+
+    def _set_outcome(self, fqn, outcome):
+        if self._file_state is not None:
+            self._file_state.set_outcome(fqn, outcome)
+
+    def _move_action(self, fqn, destination):
+        if self._move_queue is None:
+            self._move_now(fqn, destination)
+        else:
+            self._move_queue.put(fqn, destination)
+
+    def _move_now(self, fqn, destination):
+        """Move the file, inline or on the MoveQueue thread."""
+        super()._move_action(fqn, destination)
+        destination_fqn = join(destination, basename(fqn))
+        if self._file_state is not None and not exists(fqn) and exists(destination_fqn):
+            # the index entry, with the outcome recorded before the move, follows the file once it has moved
+            self._file_state.move(fqn, destination_fqn)
+
+    def clean_up(self, entry, execution_result, current_count):
+        # close the files, and record the outcome, before the files are moved
+        entry.release_fits_access()
+        for source_name in entry.source_names:
+            self._set_outcome(source_name, 'succeeded' if execution_result == 0 else 'failed')
+        super().clean_up(entry, execution_result, current_count)
+
+    def close(self):
+        if self._move_queue is not None:
+            self._move_queue.close()
+        if self._fitsverify_pool is not None:
+            self._fitsverify_pool.shutdown(wait=True)
+            self._fitsverify_pool = None
+        if self._file_state is not None:
+            self._file_state.close()
+
+    def get_work(self):
+        try:
+            work = super().get_work()
+        finally:
+            self._discard_pending_verdicts()
+        return organize_work(work, self._config)
+
+    def _discard_pending_verdicts(self):
+        """Forget the fitsverify batches for the files that were not checked, e.g. because they were filtered out
+        after they were submitted, at the end of each scan, so they do not accumulate over the run."""
+        for future in set(self._pending_verdicts.values()):
+            future.cancel()
+        self._pending_verdicts = {}
+
     def _verify_file(self, fqn):
         """
         Check file content for correctness, by whatever rules the file needs to conform to.
@@ -99,6 +471,15 @@ class APEROLocalFilesDataSource(LocalFilesDataSourceRunnerMeta):
         :return: True if the file passes the check, False otherwise
         """
         if '.fits' in fqn:
+            if self._fits_verifier == 'structural':
+                problem = check_structure(fqn)
+                if problem is None:
+                    return True
+                self._logger.info(f'Checking {fqn} with fitsverify, because {problem}.')
+            future = self._pending_verdicts.pop(fqn, None)
+            if future is not None and future.result().get(fqn):
+                return True
+            # check_fitsverify has the final say on files that a batch did not report as OK
             return check_fitsverify(fqn)
         else:
             return True
@@ -114,16 +495,20 @@ class APEROLocalFilesDataSource(LocalFilesDataSourceRunnerMeta):
                 # skip dot files
                 work_with_file = False
             else:
+                if dirname(dir_entry.path) not in self._prepared_directories:
+                    self._prepare_directory(dirname(dir_entry.path))
                 self._temp_storage_name = APEROName(
                     instrument=self._config.lookup.get('instrument'), source_names=[dir_entry.path]
                 )
-                local_file_info = get_local_file_info(dir_entry.path)
+                local_file_info = self._get_file_info(dir_entry)
                 index = 0
                 self._temp_storage_name.set_file_info(index, local_file_info)
+                # hand the FileInfo to the executors, so the file is only read once per pipeline invocation
+                self._temp_storage_name.set_discovered(dir_entry.path, local_file_info)
                 if '.hdf5' in dir_entry.name or '.h5' in dir_entry.name:
                     # no hdf5 validation
                     pass
-                elif self._verify_file(dir_entry.path):
+                elif self._verify_entry(dir_entry):
                     # only work with files that pass the FITS verification
                     if self._cleanup_when_storing:
                         if self._store_modified_files_only:
@@ -137,6 +522,7 @@ class APEROLocalFilesDataSource(LocalFilesDataSourceRunnerMeta):
                                 # if the file already exists, with the same checksum, at CADC, Kanoa says move it to the
                                 # 'succeeded' directory.
                                 self._skipped_files += 1
+                                self._set_outcome(dir_entry.path, 'skipped')
                                 self._move_action(dir_entry.path, self._cleanup_success_directory)
                                 self._reporter.capture_success(
                                     self._temp_storage_name.obs_id,
@@ -148,6 +534,7 @@ class APEROLocalFilesDataSource(LocalFilesDataSourceRunnerMeta):
                         work_with_file = True
                 else:
                     self._rejected_files += 1
+                    self._set_outcome(dir_entry.path, 'rejected')
                     if self._cleanup_when_storing:
                         self._logger.warning(
                             f'Rejecting {dir_entry.path}. Moving to {self._cleanup_failure_directory}'
@@ -162,3 +549,181 @@ class APEROLocalFilesDataSource(LocalFilesDataSourceRunnerMeta):
             work_with_file = False
         self._logger.debug(f'Done default_filter says work_with_file is {work_with_file} for {dir_entry.path}')
         return work_with_file
+
+
+class WatchedWork:
+    """A deque-like work list without an end. When the entries of one batch of settled files are used up, popleft waits
+    for the next batch, so one runner, reporter, and organizer handle all the files for the life of the process.
+    """
+
+    def __init__(self, next_batch):
+        """
+        :param next_batch: callable that waits for, and returns, a deque-like collection of the next StorageName
+            instances. It may return an empty collection.
+        """
+        self._next_batch = next_batch
+        self._batch = deque()
+
+    def __bool__(self):
+        return True
+
+    def __iter__(self):
+        while True:
+            yield self.popleft()
+
+    def __len__(self):
+        # there is always at least one more entry to wait for
+        return len(self._batch) + 1
+
+    def append(self, entry):
+        self._batch.append(entry)
+
+    def popleft(self):
+        while len(self._batch) == 0:
+            self._batch = self._next_batch()
+        return self._batch.popleft()
+
+
+class WatchedEntry:
+    """The os.DirEntry behaviour that default_filter relies on, for a file reported by a FileWatcher."""
+
+    def __init__(self, fqn):
+        self.path = fqn
+        self.name = basename(fqn)
+        self._stat = None
+
+    def inode(self):
+        return self.stat().st_ino
+
+    def is_dir(self, follow_symlinks=True):
+        return False
+
+    def is_file(self, follow_symlinks=True):
+        return True
+
+    def stat(self, follow_symlinks=True):
+        if self._stat is None:
+            self._stat = stat(self.path)
+        return self._stat
+
+
+class APEROWatchedFilesDataSource(APEROLocalFilesDataSource):
+    """Identify work from file system notifications for the data_sources directories, instead of from directory
+    listings, so that files are found seconds after they are written, without walking the directory trees.
+
+    Files are filtered, verified, stored, and cleaned up exactly as for APEROLocalFilesDataSource.
+    """
+
+    def __init__(self, config, cadc_client, storage_inventory_tap_client=None, **kwargs):
+        super().__init__(config, cadc_client, storage_inventory_tap_client, **kwargs)
+        self._watch_timeout = config.lookup.get('watch_timeout', 60)
+        self._watcher = get_file_watcher(
+            config.data_sources,
+            join(config.working_directory, config.lookup.get('watch_cursor', 'watch_cursor.yml')),
+            debounce=config.lookup.get('watch_debounce', 5),
+            mode=config.lookup.get('watch_mode', 'inotify'),
+            poll_interval=config.lookup.get('watch_poll_interval', 30),
+        )
+
+    def _prepare_directory(self, dir_name):
+        # get_work prepares only the files that were reported by the watcher, instead of whole directories
+        pass
+
+    def clean_up(self, entry, execution_result, current_count):
+        super().clean_up(entry, execution_result, current_count)
+        for source_name in entry.source_names:
+            self._watcher.done(source_name)
+
+    def close(self):
+        super().close()
+        self._watcher.close()
+
+    def get_work(self):
+        """
+        :return: WatchedWork of APEROName instances, for the files as they are completely written, without an end
+        """
+        return WatchedWork(self._get_settled_work)
+
+    def _get_settled_work(self):
+        """
+        :return: deque of APEROName instances for the files that were completely written since the last call, after
+            waiting up to watch_timeout seconds for at least one
+        """
+        self._logger.debug('Begin _get_settled_work.')
+        work = deque()
+        entries = [WatchedEntry(fqn) for fqn in self._watcher.settled(self._watch_timeout)]
+        candidates = [
+            entry for entry in entries if not entry.name.startswith('.') and DataSource.default_filter(self, entry)
+        ]
+        # the remote state of a file may change between notifications
+        self._remote_queried = set()
+        self._remote_md5sums = {}
+        self._prepare_candidates(candidates)
+        for entry in entries:
+            if self.default_filter(entry):
+                work.append(self._temp_storage_name)
+            else:
+                self._watcher.done(entry.path)
+        self._discard_pending_verdicts()
+        self._logger.info(f'Found {len(work)} entries to process.')
+        self._logger.debug('End _get_settled_work')
+        return organize_work(work, self._config)
+
+
+def organize_work(work, config):
+    """The data source-independent arrangement of the work list, before it is handed to the executors. Entries are
+    put in the work_order order, then grouped by observation.
+
+    :param work: deque-like collection of APEROName instances
+    :param config: caom2pipe.manage_composable.Config
+    :return: deque-like collection of StorageName instances
+    """
+    key = WORK_ORDERS[config.lookup.get('work_order', 'none')]
+    if key is not None:
+        work = WindowedWork(work, key, config.lookup.get('work_order_window', 10000))
+    if observation_groups_enabled(config):
+        work = GroupedWork(work, config.lookup.get('group_by_observation_window', 10000))
+    return work
+
+
+def query_remote_md5sums(uris, tap_client, chunk_size=500):
+    """Find the Storage Inventory md5sums for many file URIs, with one query for each chunk of URIs, instead of one
+    request for each file.
+
+    :param uris: list of str file URIs
+    :param tap_client: CadcTapClient for the storage_inventory_tap_resource_id service
+    :param chunk_size: int maximum number of URIs in a single query
+    :return: dict of md5sums, without the 'md5:' prefix, keyed by URI. URIs that are not in Storage Inventory are not
+        in the dict.
+    """
+    result = {}
+    for start in range(0, len(uris), chunk_size):
+        quoted = [uri.replace("'", "''") for uri in uris[start:start + chunk_size]]
+        in_list = ', '.join(f"'{uri}'" for uri in quoted)
+        qs = f"SELECT uri, contentChecksum FROM inventory.Artifact WHERE uri IN ({in_list})"
+        for row in query_tap_client(qs, tap_client):
+            result[str(row['uri'])] = _strip_md5_prefix(str(row['contentChecksum']))
+    return result
+
+
+def _strip_md5_prefix(md5sum):
+    return md5sum.replace('md5:', '') if md5sum else md5sum
+
+
+def fitsverify_batch(fqns):
+    """Run a single fitsverify process over many files.
+
+    :param fqns: list of str fully-qualified file names
+    :return: dict of True values, keyed by the fully-qualified names of the files that fitsverify reports as OK. Files
+        that are not reported as OK are not in the dict.
+    """
+    result = {}
+    try:
+        output = subprocess.run(['fitsverify', '-q', '-e'] + fqns, capture_output=True, text=True).stdout
+    except OSError as e:
+        logging.warning(f'fitsverify batch failed with {e}')
+        return result
+    for line in output.splitlines():
+        if line.startswith('verification OK: '):
+            result[line[len('verification OK: '):].strip()] = True
+    return result
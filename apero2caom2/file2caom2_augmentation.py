@@ -66,22 +66,23 @@
 # ***********************************************************************
 #
 
-import importlib
 import logging
-import sys
 import traceback
 
-from os.path import basename, dirname, exists
+from os.path import dirname, exists
 
 from caom2 import Algorithm, SimpleObservation, DerivedObservation
-from caom2utils.blueprints import ObsBlueprint
 from caom2utils.parsers import BlueprintParser, FitsParser
-from caom2utils.caomvalidator import validate
-from caom2utils.wcsvalidator import InvalidWCSError
+from apero2caom2.blueprint_cache import BlueprintCache
+from apero2caom2.plugin_registry import PluginRegistry
 
 
 __all__ = ['File2caom2Visitor']
 
+# the blueprint files, and the plugin modules, are loaded once for each process
+_blueprint_cache = BlueprintCache()
+_plugin_registry = PluginRegistry()
+
 
 class File2caom2Visitor:
     """
@@ -98,6 +99,7 @@ class File2caom2Visitor:
         self.logger = logging.getLogger(self.__class__.__name__)
         self.module = None
         self.update_method_module = None
+        self._plugin = None
 
     def _get_blueprints(self, dest_uri):
         result = []
@@ -106,10 +108,9 @@ class File2caom2Visitor:
         module_fqn = f'{dirname(bp_fqn)}/{self.config.lookup.get("instrument").lower()}.py'
         self.logger.info(f'Load module {module_fqn}')
         self._load_module(module_fqn)
-        blueprint = ObsBlueprint(module=self.module)
         if exists(bp_fqn):
             try:
-                blueprint.load_from_file(bp_fqn)
+                blueprint = _blueprint_cache.get(bp_fqn, module_fqn, self.module)
             except Exception as e:
                 self.logger.error(f'Blueprint load failure: {e}')
                 self.logger.debug(traceback.format_exc())
@@ -125,37 +126,26 @@ class File2caom2Visitor:
 
     def _get_parser(self, blueprint, uri):
         self.logger.debug('Begin _get_parser')
-        headers = self.storage_name.metadata.get(uri)
-        if headers is None or len(headers) == 0 or 'no_wcs' in self.storage_name.blueprint_name:
+        fits_access = self.storage_name.fits_access(uri)
+        if not fits_access.in_memory or 'no_wcs' in self.storage_name.blueprint_name:
             parser = BlueprintParser(blueprint, uri)
         else:
-            parser = FitsParser(headers, blueprint, uri)
+            parser = FitsParser(fits_access.headers, blueprint, uri)
         self.logger.debug(f'Created {parser.__class__.__name__} parser for {uri}.')
         return parser
 
     def _load_module(self, module):
         """If a user provides code for execution during blueprint configuration, add that code to the execution
-        environment of the interpreter here.
+        environment of the interpreter here. The code is loaded once per process, and again when the file changes.
 
         :param module the fully-qualified path name to the source code from a user.
         """
-        mname = basename(module)
-        if '.' in mname:
-            # remove extension from the provided name
-            mname = mname.split('.')[0]
-        pname = dirname(module)
-        sys.path.append(pname)
-        try:
-            self.module = importlib.import_module(mname)
-        except ImportError as e:
-            self.logger.warning(f'Could import module {mname!r} in {pname!r}')
+        self._plugin = _plugin_registry.get(module)
+        self.module = self._plugin.module
 
     def _load_update_method(self):
-        if hasattr(self.module, 'update'):
-            self.update_method_module= self.module
-        elif hasattr(self.module, 'ObservationUpdater'):
-            # for backwards compatibility with caom2repo
-            self.update_method_module = getattr(self.module, 'ObservationUpdater')()
+        if self._plugin is not None:
+            self.update_method_module = self._plugin.update_method_module
 
     def _loaded_module_visit(self, parser, visit_local):
         result = self.observation
@@ -234,13 +224,7 @@ class File2caom2Visitor:
                     result = self._loaded_module_visit(parser, self.storage_name.source_names[index])
                     if result:
                         self.observation = result
-                    try:
-                        validate(self.observation)
-                    except InvalidWCSError as e:
-                        self.logger.error(e)
-                        tb = traceback.format_exc()
-                        self.logger.debug(tb)
-                        raise e
+                    # validation is done once for each observation, after all the visitors, by the executors
 
         except Exception as e:
             self.logger.debug(traceback.format_exc())
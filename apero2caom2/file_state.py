@@ -0,0 +1,236 @@
+# ***********************************************************************
+# ******************  CANADIAN ASTRONOMY DATA CENTRE  *******************
+# *************  CENTRE CANADIEN DE DONNÉES ASTRONOMIQUES  **************
+#
+#  (c) 2026.                            (c) 2026.
+#  Government of Canada                 Gouvernement du Canada
+#  National Research Council            Conseil national de recherches
+#  Ottawa, Canada, K1A 0R6              Ottawa, Canada, K1A 0R6
+#  All rights reserved                  Tous droits réservés
+#
+#  NRC disclaims any warranties,        Le CNRC dénie toute garantie
+#  expressed, implied, or               énoncée, implicite ou légale,
+#  statutory, of any kind with          de quelque nature que ce
+#  respect to the software,             soit, concernant le logiciel,
+#  including without limitation         y compris sans restriction
+#  any warranty of merchantability      toute garantie de valeur
+#  or fitness for a particular          marchande ou de pertinence
+#  purpose. NRC shall not be            pour un usage particulier.
+#  liable in any event for any          Le CNRC ne pourra en aucun cas
+#  damages, whether direct or           être tenu responsable de tout
+#  indirect, special or general,        dommage, direct ou indirect,
+#  consequential or incidental,         particulier ou général,
+#  arising from the use of the          accessoire ou fortuit, résultant
+#  software.  Neither the name          de l'utilisation du logiciel. Ni
+#  of the National Research             le nom du Conseil National de
+#  Council of Canada nor the            Recherches du Canada ni les noms
+#  names of its contributors may        de ses  participants ne peuvent
+#  be used to endorse or promote        être utilisés pour approuver ou
+#  products derived from this           promouvoir les produits dérivés
+#  software without specific prior      de ce logiciel sans autorisation
+#  written permission.                  préalable et particulière
+#                                       par écrit.
+#
+#  This file is part of the             Ce fichier fait partie du projet
+#  OpenCADC project.                    OpenCADC.
+#
+#  OpenCADC is free software:           OpenCADC est un logiciel libre ;
+#  you can redistribute it and/or       vous pouvez le redistribuer ou le
+#  modify it under the terms of         modifier suivant les termes de
+#  the GNU Affero General Public        la “GNU Affero General Public
+#  License as published by the          License” telle que publiée
+#  Free Software Foundation,            par la Free Software Foundation
+#  either version 3 of the              : soit la version 3 de cette
+#  License, or (at your option)         licence, soit (à votre gré)
+#  any later version.                   toute version ultérieure.
+#
+#  OpenCADC is distributed in the       OpenCADC est distribué
+#  hope that it will be useful,         dans l’espoir qu’il vous
+#  but WITHOUT ANY WARRANTY;            sera utile, mais SANS AUCUNE
+#  without even the implied             GARANTIE : sans même la garantie
+#  warranty of MERCHANTABILITY          implicite de COMMERCIALISABILITÉ
+#  or FITNESS FOR A PARTICULAR          ni d’ADÉQUATION À UN OBJECTIF
+#  PURPOSE.  See the GNU Affero         PARTICULIER. Consultez la Licence
+#  General Public License for           Générale Publique GNU Affero
+#  more details.                        pour plus de détails.
+#
+#  You should have received             Vous devriez avoir reçu une
+#  a copy of the GNU Affero             copie de la Licence Générale
+#  General Public License along         Publique GNU Affero avec
+#  with OpenCADC.  If not, see          OpenCADC ; si ce n’est
+#  <http://www.gnu.org/licenses/>.      pas le cas, consultez :
+#                                       <http://www.gnu.org/licenses/>.
+#
+#  $Revision: 4 $
+#
+# ***********************************************************************
+#
+
+"""
+Remember what is known about the files on disk between pipeline invocations, so that incremental scans do not
+re-read, or re-verify, every file under the data sources every time.
+"""
+
+import logging
+import sqlite3
+import threading
+
+from datetime import datetime, timezone
+
+from cadcdata import FileInfo
+from caom2utils.data_util import get_local_file_info
+
+
+__all__ = ['FileStateIndex']
+
+
+class FileStateIndex:
+    """An sqlite-backed index of local file state, keyed by fully-qualified file name.
+
+    The index records the FileInfo (including the md5sum), the fitsverify verdict, and the last ingest outcome for
+    each file. A recorded entry is only re-used while the size, modification time, and inode of the file on disk
+    match the recorded values. Any change to that signature discards the recorded state, and the file is re-read.
+
+    Entries are moved from the MoveQueue thread, so the connection is shared between threads, behind a lock.
+    """
+
+    def __init__(self, fqn):
+        self._fqn = fqn
+        self._logger = logging.getLogger(self.__class__.__name__)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(fqn, check_same_thread=False)
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        self._connection.execute('PRAGMA synchronous=NORMAL')
+        self._connection.execute(
+            'CREATE TABLE IF NOT EXISTS file_state ('
+            'path TEXT PRIMARY KEY, '
+            'size INTEGER NOT NULL, '
+            'mtime_ns INTEGER NOT NULL, '
+            'inode INTEGER NOT NULL, '
+            'file_id TEXT, '
+            'md5sum TEXT, '
+            'file_type TEXT, '
+            'encoding TEXT, '
+            'verified INTEGER, '
+            'outcome TEXT, '
+            'last_modified TEXT)'
+        )
+        self._connection.commit()
+        self._hits = 0
+        self._misses = 0
+
+    @property
+    def fqn(self):
+        return self._fqn
+
+    @property
+    def hits(self):
+        return self._hits
+
+    @property
+    def misses(self):
+        return self._misses
+
+    def _find(self, fqn, stat_result):
+        """
+        :param fqn: str fully-qualified file name
+        :param stat_result: os.stat_result for fqn
+        :return: the recorded row for fqn, if the recorded signature matches stat_result, None otherwise
+        """
+        with self._lock:
+            row = self._connection.execute(
+                'SELECT size, mtime_ns, inode, file_id, md5sum, file_type, encoding, verified, outcome '
+                'FROM file_state WHERE path = ?',
+                (fqn,),
+            ).fetchone()
+        if (
+            row is not None
+            and row[0] == stat_result.st_size
+            and row[1] == stat_result.st_mtime_ns
+            and row[2] == stat_result.st_ino
+        ):
+            return row
+        return None
+
+    def get_file_info(self, fqn, stat_result):
+        """
+        :param fqn: str fully-qualified file name
+        :param stat_result: os.stat_result for fqn
+        :return: FileInfo for fqn, from the index if the file is unchanged, from a full read of the file otherwise
+        """
+        row = self._find(fqn, stat_result)
+        if row is not None and row[4] is not None:
+            self._hits += 1
+            self._logger.debug(f'Using recorded file info for {fqn}.')
+            return FileInfo(id=row[3], size=row[0], md5sum=row[4], file_type=row[5], encoding=row[6])
+
+        self._misses += 1
+        file_info = get_local_file_info(fqn)
+        # a changed signature means any recorded verdict or outcome no longer applies
+        self._execute(
+            'INSERT OR REPLACE INTO file_state '
+            '(path, size, mtime_ns, inode, file_id, md5sum, file_type, encoding, verified, outcome, last_modified) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?, ?, NULL, NULL, ?)',
+            (
+                fqn,
+                stat_result.st_size,
+                stat_result.st_mtime_ns,
+                stat_result.st_ino,
+                file_info.id,
+                file_info.md5sum,
+                file_info.file_type,
+                file_info.encoding,
+                FileStateIndex._now(),
+            ),
+        )
+        return file_info
+
+    def get_verdict(self, fqn, stat_result):
+        """
+        :return: True if fqn passed verification, False if it failed, None if there is no verdict for the file in its
+            current state
+        """
+        row = self._find(fqn, stat_result)
+        if row is None or row[7] is None:
+            return None
+        return bool(row[7])
+
+    def set_verdict(self, fqn, verdict):
+        self._update(fqn, 'verified', int(verdict))
+
+    def get_outcome(self, fqn, stat_result):
+        row = self._find(fqn, stat_result)
+        return None if row is None else row[8]
+
+    def set_outcome(self, fqn, outcome):
+        self._update(fqn, 'outcome', outcome)
+
+    def move(self, fqn, destination_fqn):
+        """Keep the entry, including the outcome, for a file that has been moved from fqn to destination_fqn. A
+        rename keeps the size, modification time, and inode, so the entry still applies at the new location. Called
+        after the move is done, so the entry never refers to a location where the file is not.
+        """
+        self._execute(
+            'UPDATE OR REPLACE file_state SET path = ?, last_modified = ? WHERE path = ?',
+            (destination_fqn, FileStateIndex._now(), fqn),
+        )
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+        self._logger.info(f'{self._hits} file state index hits, {self._misses} misses for {self._fqn}.')
+
+    def _update(self, fqn, column, value):
+        # only update entries that already exist, because the signature is recorded with the md5sum
+        self._execute(
+            f'UPDATE file_state SET {column} = ?, last_modified = ? WHERE path = ?', (value, FileStateIndex._now(), fqn)
+        )
+
+    def _execute(self, sql, parameters):
+        with self._lock:
+            self._connection.execute(sql, parameters)
+            self._connection.commit()
+
+    @staticmethod
+    def _now():
+        return datetime.now(tz=timezone.utc).isoformat()
@@ -0,0 +1,311 @@
+# ***********************************************************************
+# ******************  CANADIAN ASTRONOMY DATA CENTRE  *******************
+# *************  CENTRE CANADIEN DE DONNÉES ASTRONOMIQUES  **************
+#
+#  (c) 2026.                            (c) 2026.
+#  Government of Canada                 Gouvernement du Canada
+#  National Research Council            Conseil national de recherches
+#  Ottawa, Canada, K1A 0R6              Ottawa, Canada, K1A 0R6
+#  All rights reserved                  Tous droits réservés
+#
+#  NRC disclaims any warranties,        Le CNRC dénie toute garantie
+#  expressed, implied, or               énoncée, implicite ou légale,
+#  statutory, of any kind with          de quelque nature que ce
+#  respect to the software,             soit, concernant le logiciel,
+#  including without limitation         y compris sans restriction
+#  any warranty of merchantability      toute garantie de valeur
+#  or fitness for a particular          marchande ou de pertinence
+#  purpose. NRC shall not be            pour un usage particulier.
+#  liable in any event for any          Le CNRC ne pourra en aucun cas
+#  damages, whether direct or           être tenu responsable de tout
+#  indirect, special or general,        dommage, direct ou indirect,
+#  consequential or incidental,         particulier ou général,
+#  arising from the use of the          accessoire ou fortuit, résultant
+#  software.  Neither the name          de l'utilisation du logiciel. Ni
+#  of the National Research             le nom du Conseil National de
+#  Council of Canada nor the            Recherches du Canada ni les noms
+#  names of its contributors may        de ses  participants ne peuvent
+#  be used to endorse or promote        être utilisés pour approuver ou
+#  products derived from this           promouvoir les produits dérivés
+#  software without specific prior      de ce logiciel sans autorisation
+#  written permission.                  préalable et particulière
+#                                       par écrit.
+#
+#  This file is part of the             Ce fichier fait partie du projet
+#  OpenCADC project.                    OpenCADC.
+#
+#  OpenCADC is free software:           OpenCADC est un logiciel libre ;
+#  you can redistribute it and/or       vous pouvez le redistribuer ou le
+#  modify it under the terms of         modifier suivant les termes de
+#  the GNU Affero General Public        la “GNU Affero General Public
+#  License as published by the          License” telle que publiée
+#  Free Software Foundation,            par la Free Software Foundation
+#  either version 3 of the              : soit la version 3 de cette
+#  License, or (at your option)         licence, soit (à votre gré)
+#  any later version.                   toute version ultérieure.
+#
+#  OpenCADC is distributed in the       OpenCADC est distribué
+#  hope that it will be useful,         dans l’espoir qu’il vous
+#  but WITHOUT ANY WARRANTY;            sera utile, mais SANS AUCUNE
+#  without even the implied             GARANTIE : sans même la garantie
+#  warranty of MERCHANTABILITY          implicite de COMMERCIALISABILITÉ
+#  or FITNESS FOR A PARTICULAR          ni d’ADÉQUATION À UN OBJECTIF
+#  PURPOSE.  See the GNU Affero         PARTICULIER. Consultez la Licence
+#  General Public License for           Générale Publique GNU Affero
+#  more details.                        pour plus de détails.
+#
+#  You should have received             Vous devriez avoir reçu une
+#  a copy of the GNU Affero             copie de la Licence Générale
+#  General Public License along         Publique GNU Affero avec
+#  with OpenCADC.  If not, see          OpenCADC ; si ce n’est
+#  <http://www.gnu.org/licenses/>.      pas le cas, consultez :
+#                                       <http://www.gnu.org/licenses/>.
+#
+#  $Revision: 4 $
+#
+# ***********************************************************************
+#
+
+"""
+Find new files under the data_sources directories as they are written, instead of re-walking the directories on a
+schedule.
+
+InotifyFileWatcher uses the Linux inotify interface. PollingFileWatcher compares directory snapshots, and is the
+fallback where inotify is not available. Both report a file only after it has been quiet for a debounce interval, and
+both persist a cursor, so that files written while the application is not running are found on the next start.
+"""
+
+import abc
+import ctypes
+import ctypes.util
+import logging
+import os
+import select
+import struct
+import yaml
+
+from time import sleep, time
+
+
+__all__ = ['FileWatcher', 'get_file_watcher', 'InotifyFileWatcher', 'PollingFileWatcher']
+
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = os.O_CLOEXEC
+EVENT_HEADER = struct.Struct('iIII')
+
+
+class FileWatcher(abc.ABC):
+    """Common debounce and cursor handling for the watcher implementations.
+
+    A file is 'pending' from the time an event is seen for it until done() is called for it. The cursor file records
+    the pending files and the time of the last check for events, so a restart re-examines anything that was not done.
+    The cursor is written once for each batch returned by settled, and on close, not once for each file.
+    """
+
+    def __init__(self, directories, cursor_fqn, debounce=5.0):
+        self._directories = directories
+        self._cursor_fqn = cursor_fqn
+        self._debounce = debounce
+        self._logger = logging.getLogger(self.__class__.__name__)
+        # fully-qualified file name: time of the most recent event for the file
+        self._quiet_since = {}
+        # files that have been reported by settled, but not yet marked done
+        self._in_progress = set()
+        self._last_checked = None
+        self._read_cursor()
+
+    def _read_cursor(self):
+        if os.path.exists(self._cursor_fqn):
+            with open(self._cursor_fqn) as f:
+                content = yaml.safe_load(f) or {}
+            self._last_checked = content.get('last_checked')
+            for fqn in content.get('pending', []):
+                if os.path.exists(fqn):
+                    self._quiet_since[fqn] = 0.0
+            self._logger.info(
+                f'Resuming with {len(self._quiet_since)} pending files, and changes since {self._last_checked}.'
+            )
+
+    def _write_cursor(self):
+        temp_fqn = f'{self._cursor_fqn}.tmp'
+        with open(temp_fqn, 'w') as f:
+            yaml.safe_dump(
+                {'last_checked': self._last_checked, 'pending': sorted(set(self._quiet_since) | self._in_progress)}, f
+            )
+        os.replace(temp_fqn, self._cursor_fqn)
+
+    def _catch_up(self, since):
+        """Find the files that changed while no events were being collected.
+
+        :param since: float seconds since the epoch, or None to find all files
+        """
+        for directory in self._directories:
+            for dir_name, _, file_names in os.walk(directory):
+                for file_name in file_names:
+                    fqn = os.path.join(dir_name, file_name)
+                    try:
+                        if since is None or os.stat(fqn).st_mtime >= since:
+                            self._quiet_since[fqn] = 0.0
+                    except FileNotFoundError:
+                        continue
+
+    @abc.abstractmethod
+    def _collect(self, timeout):
+        """Wait up to timeout seconds for events, and record the time of each event in _quiet_since."""
+        pass
+
+    def done(self, fqn):
+        """Called when the work for a file that settled returned is finished. The cursor is written by the next call
+        to settled, or by close. A file that is done, but not yet in the cursor, is only examined again after a restart.
+        """
+        self._in_progress.discard(fqn)
+
+    def settled(self, timeout):
+        """
+        :param timeout: float maximum seconds to wait for a file to settle
+        :return: list of fully-qualified names of files with no events for the debounce interval
+        """
+        end = time() + timeout
+        result = []
+        while True:
+            checked = time()
+            self._collect(max(0.0, min(self._debounce, end - checked)))
+            # files written from now on have an mtime later than this time, so a restart will find them
+            self._last_checked = checked - self._debounce
+            now = time()
+            for fqn, last_event in list(self._quiet_since.items()):
+                if now - last_event >= self._debounce:
+                    del self._quiet_since[fqn]
+                    if os.path.isfile(fqn):
+                        result.append(fqn)
+                        self._in_progress.add(fqn)
+            if len(result) > 0 or now >= end:
+                break
+        self._write_cursor()
+        return result
+
+    def close(self):
+        self._write_cursor()
+
+
+class InotifyFileWatcher(FileWatcher):
+    """Collect IN_CLOSE_WRITE and IN_MOVED_TO events for every directory under the watched directories."""
+
+    def __init__(self, directories, cursor_fqn, debounce=5.0):
+        super().__init__(directories, cursor_fqn, debounce)
+        self._libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        self._fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 failed')
+        # watch descriptor: directory name
+        self._watches = {}
+        for directory in self._directories:
+            self._add_watches(directory)
+        # the watches are in place, so anything that changed before now is found by the catch up
+        self._catch_up(self._last_checked)
+
+    def _add_watches(self, directory):
+        for dir_name, _, _ in os.walk(directory):
+            wd = self._libc.inotify_add_watch(
+                self._fd, os.fsencode(dir_name), IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+            )
+            if wd < 0:
+                raise OSError(ctypes.get_errno(), f'inotify_add_watch failed for {dir_name}')
+            self._watches[wd] = dir_name
+
+    def _collect(self, timeout):
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        if len(readable) == 0:
+            return
+        buffer = os.read(self._fd, 1024 * 1024)
+        now = time()
+        offset = 0
+        while offset < len(buffer):
+            wd, mask, _, length = EVENT_HEADER.unpack_from(buffer, offset)
+            offset += EVENT_HEADER.size
+            name = os.fsdecode(buffer[offset:offset + length].rstrip(b'\0'))
+            offset += length
+            if mask & IN_Q_OVERFLOW:
+                self._logger.warning('inotify queue overflow. Re-scanning.')
+                self._catch_up(self._last_checked)
+            elif mask & IN_IGNORED:
+                self._watches.pop(wd, None)
+            elif wd in self._watches:
+                fqn = os.path.join(self._watches[wd], name)
+                if mask & IN_ISDIR:
+                    if mask & (IN_CREATE | IN_MOVED_TO):
+                        # files may be written to the new directory before the watch is added
+                        self._add_watches(fqn)
+                        self._catch_up_directory(fqn, now)
+                elif mask & (IN_CLOSE_WRITE | IN_MOVED_TO):
+                    self._quiet_since[fqn] = now
+
+    def _catch_up_directory(self, directory, now):
+        for dir_name, _, file_names in os.walk(directory):
+            for file_name in file_names:
+                self._quiet_since[os.path.join(dir_name, file_name)] = now
+
+    def close(self):
+        os.close(self._fd)
+        super().close()
+
+
+class PollingFileWatcher(FileWatcher):
+    """Compare the size and mtime of the files under the watched directories between polls."""
+
+    def __init__(self, directories, cursor_fqn, debounce=5.0, poll_interval=30.0):
+        super().__init__(directories, cursor_fqn, debounce)
+        self._poll_interval = poll_interval
+        self._last_poll = None
+        self._catch_up(self._last_checked)
+        self._snapshot = self._take_snapshot()
+
+    def _take_snapshot(self):
+        snapshot = {}
+        for directory in self._directories:
+            for dir_name, _, file_names in os.walk(directory):
+                for file_name in file_names:
+                    fqn = os.path.join(dir_name, file_name)
+                    try:
+                        stat_result = os.stat(fqn)
+                    except FileNotFoundError:
+                        continue
+                    snapshot[fqn] = (stat_result.st_size, stat_result.st_mtime_ns)
+        self._last_poll = time()
+        return snapshot
+
+    def _collect(self, timeout):
+        wait = self._last_poll + self._poll_interval - time()
+        if wait > timeout:
+            sleep(timeout)
+            return
+        sleep(max(0.0, wait))
+        snapshot = self._take_snapshot()
+        now = time()
+        for fqn, signature in snapshot.items():
+            if self._snapshot.get(fqn) != signature:
+                self._quiet_since[fqn] = now
+        self._snapshot = snapshot
+
+
+def get_file_watcher(directories, cursor_fqn, debounce=5.0, mode='inotify', poll_interval=30.0):
+    """
+    :param directories: list of str fully-qualified directory names
+    :param cursor_fqn: str fully-qualified name of the file that persists the watcher state between invocations
+    :param debounce: float seconds without events before a file is considered completely written
+    :param mode: str 'inotify' or 'polling'. 'inotify' falls back to 'polling' where inotify is not available.
+    :param poll_interval: float seconds between directory snapshots in 'polling' mode
+    :return: FileWatcher
+    """
+    if mode == 'inotify':
+        try:
+            return InotifyFileWatcher(directories, cursor_fqn, debounce)
+        except (AttributeError, OSError) as e:
+            logging.warning(f'inotify is not available ({e}). Polling for changes every {poll_interval} seconds.')
+    return PollingFileWatcher(directories, cursor_fqn, debounce, poll_interval)
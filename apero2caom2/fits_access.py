@@ -0,0 +1,201 @@
+# ***********************************************************************
+# ******************  CANADIAN ASTRONOMY DATA CENTRE  *******************
+# *************  CENTRE CANADIEN DE DONNÉES ASTRONOMIQUES  **************
+#
+#  (c) 2026.                            (c) 2026.
+#  Government of Canada                 Gouvernement du Canada
+#  National Research Council            Conseil national de recherches
+#  Ottawa, Canada, K1A 0R6              Ottawa, Canada, K1A 0R6
+#  All rights reserved                  Tous droits réservés
+#
+#  NRC disclaims any warranties,        Le CNRC dénie toute garantie
+#  expressed, implied, or               énoncée, implicite ou légale,
+#  statutory, of any kind with          de quelque nature que ce
+#  respect to the software,             soit, concernant le logiciel,
+#  including without limitation         y compris sans restriction
+#  any warranty of merchantability      toute garantie de valeur
+#  or fitness for a particular          marchande ou de pertinence
+#  purpose. NRC shall not be            pour un usage particulier.
+#  liable in any event for any          Le CNRC ne pourra en aucun cas
+#  damages, whether direct or           être tenu responsable de tout
+#  indirect, special or general,        dommage, direct ou indirect,
+#  consequential or incidental,         particulier ou général,
+#  arising from the use of the          accessoire ou fortuit, résultant
+#  software.  Neither the name          de l'utilisation du logiciel. Ni
+#  of the National Research             le nom du Conseil National de
+#  Council of Canada nor the            Recherches du Canada ni les noms
+#  names of its contributors may        de ses  participants ne peuvent
+#  be used to endorse or promote        être utilisés pour approuver ou
+#  products derived from this           promouvoir les produits dérivés
+#  software without specific prior      de ce logiciel sans autorisation
+#  written permission.                  préalable et particulière
+#                                       par écrit.
+#
+#  This file is part of the             Ce fichier fait partie du projet
+#  OpenCADC project.                    OpenCADC.
+#
+#  OpenCADC is free software:           OpenCADC est un logiciel libre ;
+#  you can redistribute it and/or       vous pouvez le redistribuer ou le
+#  modify it under the terms of         modifier suivant les termes de
+#  the GNU Affero General Public        la “GNU Affero General Public
+#  License as published by the          License” telle que publiée
+#  Free Software Foundation,            par la Free Software Foundation
+#  either version 3 of the              : soit la version 3 de cette
+#  License, or (at your option)         licence, soit (à votre gré)
+#  any later version.                   toute version ultérieure.
+#
+#  OpenCADC is distributed in the       OpenCADC est distribué
+#  hope that it will be useful,         dans l’espoir qu’il vous
+#  but WITHOUT ANY WARRANTY;            sera utile, mais SANS AUCUNE
+#  without even the implied             GARANTIE : sans même la garantie
+#  warranty of MERCHANTABILITY          implicite de COMMERCIALISABILITÉ
+#  or FITNESS FOR A PARTICULAR          ni d’ADÉQUATION À UN OBJECTIF
+#  PURPOSE.  See the GNU Affero         PARTICULIER. Consultez la Licence
+#  General Public License for           Générale Publique GNU Affero
+#  more details.                        pour plus de détails.
+#
+#  You should have received             Vous devriez avoir reçu une
+#  a copy of the GNU Affero             copie de la Licence Générale
+#  General Public License along         Publique GNU Affero avec
+#  with OpenCADC.  If not, see          OpenCADC ; si ce n’est
+#  <http://www.gnu.org/licenses/>.      pas le cas, consultez :
+#                                       <http://www.gnu.org/licenses/>.
+#
+#  $Revision: 4 $
+#
+# ***********************************************************************
+#
+
+"""
+Share one view of each FITS file between the visitors for a unit of work, so that a file is opened at most once, its
+headers are not read again when they are already in memory, and it is closed when the unit of work is done.
+
+Open files are held in a process-wide pool with a bounded number of entries, so files that are not released are closed
+when the pool is full, instead of accumulating open descriptors over long runs.
+"""
+
+import logging
+
+from astropy.io import fits
+from collections import OrderedDict
+
+
+__all__ = ['FitsAccess', 'FitsFilePool']
+
+# the number of FITS files that are open at the same time, for all units of work
+MAX_OPEN_FILES = 16
+
+
+class FitsFilePool:
+    """Least-recently-used pool of open astropy HDUList instances, keyed by fully-qualified file name."""
+
+    def __init__(self, max_open=MAX_OPEN_FILES):
+        self._max_open = max_open
+        self._open = OrderedDict()
+        self._opens = 0
+        self._logger = logging.getLogger(self.__class__.__name__)
+
+    @property
+    def open_count(self):
+        return len(self._open)
+
+    @property
+    def opens(self):
+        """The number of times a file was opened."""
+        return self._opens
+
+    def get(self, fqn):
+        """
+        :param fqn: str fully-qualified file name
+        :return: HDUList for fqn, with the data units memory-mapped and the HDUs loaded as they are used
+        """
+        result = self._open.get(fqn)
+        if result is None:
+            while len(self._open) >= self._max_open:
+                evicted_fqn, evicted = self._open.popitem(last=False)
+                self._logger.debug(f'Closing {evicted_fqn} to stay within {self._max_open} open files.')
+                evicted.close()
+            result = fits.open(fqn, memmap=True, lazy_load_hdus=True)
+            self._open[fqn] = result
+            self._opens += 1
+        else:
+            self._open.move_to_end(fqn)
+        return result
+
+    def release(self, fqn):
+        hdus = self._open.pop(fqn, None)
+        if hdus is not None:
+            hdus.close()
+
+
+_pool = FitsFilePool()
+
+
+class FitsAccess:
+    """The headers and table columns of one FITS file, for the visitors of one unit of work.
+
+    Headers that are already in memory, e.g. from StorageName.metadata, are used as they are. The file is only opened,
+    through the shared FitsFilePool, when headers or table data are needed that are not in memory.
+    """
+
+    def __init__(self, headers=None, fqn=None, pool=None):
+        """
+        :param headers: list of astropy Header instances that are already in memory, or None
+        :param fqn: str fully-qualified name of the FITS file, or None if it is not known yet
+        :param pool: FitsFilePool, defaults to the pool shared by the process
+        """
+        self._headers = headers if headers else None
+        self._file_headers = None
+        self._in_memory = self._headers is not None
+        self.fqn = fqn
+        self._pool = _pool if pool is None else pool
+
+    def _hdus(self):
+        if self.fqn is None:
+            raise ValueError('No file to open for FitsAccess.')
+        return self._pool.get(self.fqn)
+
+    @property
+    def in_memory(self):
+        """True if there are headers for the file that were provided at construction."""
+        return self._in_memory
+
+    @property
+    def headers(self):
+        """The headers already in memory, if there are any, otherwise the headers from the file."""
+        if self._headers is None:
+            self._headers = self.file_headers
+        return self._headers
+
+    @property
+    def file_headers(self):
+        """The complete headers from the file. In-memory headers may have been reduced to the keywords a blueprint
+        uses."""
+        if self._file_headers is None:
+            self._file_headers = [hdu.header for hdu in self._hdus()]
+        return self._file_headers
+
+    def has_hdu(self, extname):
+        """
+        :param extname: str EXTNAME value
+        :return: True if the file has an HDU with that EXTNAME. The in-memory headers are checked, when there are any,
+            instead of opening the file.
+        """
+        if self._in_memory:
+            return any(
+                str(header.get('EXTNAME', '')).strip().upper() == extname.upper() for header in self._headers
+            )
+        return extname in self._hdus()
+
+    def column(self, extname, column_name):
+        """
+        :param extname: str EXTNAME of a table HDU
+        :param column_name: str column name
+        :return: the column values, read from the memory-mapped data unit
+        """
+        return self._hdus()[extname].data[column_name]
+
+    def close(self):
+        self._file_headers = None
+        if self.fqn is not None:
+            self._pool.release(self.fqn)
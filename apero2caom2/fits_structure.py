@@ -0,0 +1,316 @@
+# ***********************************************************************
+# ******************  CANADIAN ASTRONOMY DATA CENTRE  *******************
+# *************  CENTRE CANADIEN DE DONNÉES ASTRONOMIQUES  **************
+#
+#  (c) 2026.                            (c) 2026.
+#  Government of Canada                 Gouvernement du Canada
+#  National Research Council            Conseil national de recherches
+#  Ottawa, Canada, K1A 0R6              Ottawa, Canada, K1A 0R6
+#  All rights reserved                  Tous droits réservés
+#
+#  NRC disclaims any warranties,        Le CNRC dénie toute garantie
+#  expressed, implied, or               énoncée, implicite ou légale,
+#  statutory, of any kind with          de quelque nature que ce
+#  respect to the software,             soit, concernant le logiciel,
+#  including without limitation         y compris sans restriction
+#  any warranty of merchantability      toute garantie de valeur
+#  or fitness for a particular          marchande ou de pertinence
+#  purpose. NRC shall not be            pour un usage particulier.
+#  liable in any event for any          Le CNRC ne pourra en aucun cas
+#  damages, whether direct or           être tenu responsable de tout
+#  indirect, special or general,        dommage, direct ou indirect,
+#  consequential or incidental,         particulier ou général,
+#  arising from the use of the          accessoire ou fortuit, résultant
+#  software.  Neither the name          de l'utilisation du logiciel. Ni
+#  of the National Research             le nom du Conseil National de
+#  Council of Canada nor the            Recherches du Canada ni les noms
+#  names of its contributors may        de ses  participants ne peuvent
+#  be used to endorse or promote        être utilisés pour approuver ou
+#  products derived from this           promouvoir les produits dérivés
+#  software without specific prior      de ce logiciel sans autorisation
+#  written permission.                  préalable et particulière
+#                                       par écrit.
+#
+#  This file is part of the             Ce fichier fait partie du projet
+#  OpenCADC project.                    OpenCADC.
+#
+#  OpenCADC is free software:           OpenCADC est un logiciel libre ;
+#  you can redistribute it and/or       vous pouvez le redistribuer ou le
+#  modify it under the terms of         modifier suivant les termes de
+#  the GNU Affero General Public        la “GNU Affero General Public
+#  License as published by the          License” telle que publiée
+#  Free Software Foundation,            par la Free Software Foundation
+#  either version 3 of the              : soit la version 3 de cette
+#  License, or (at your option)         licence, soit (à votre gré)
+#  any later version.                   toute version ultérieure.
+#
+#  OpenCADC is distributed in the       OpenCADC est distribué
+#  hope that it will be useful,         dans l’espoir qu’il vous
+#  but WITHOUT ANY WARRANTY;            sera utile, mais SANS AUCUNE
+#  without even the implied             GARANTIE : sans même la garantie
+#  warranty of MERCHANTABILITY          implicite de COMMERCIALISABILITÉ
+#  or FITNESS FOR A PARTICULAR          ni d’ADÉQUATION À UN OBJECTIF
+#  PURPOSE.  See the GNU Affero         PARTICULIER. Consultez la Licence
+#  General Public License for           Générale Publique GNU Affero
+#  more details.                        pour plus de détails.
+#
+#  You should have received             Vous devriez avoir reçu une
+#  a copy of the GNU Affero             copie de la Licence Générale
+#  General Public License along         Publique GNU Affero avec
+#  with OpenCADC.  If not, see          OpenCADC ; si ce n’est
+#  <http://www.gnu.org/licenses/>.      pas le cas, consultez :
+#                                       <http://www.gnu.org/licenses/>.
+#
+#  $Revision: 4 $
+#
+# ***********************************************************************
+#
+
+"""
+Check the block structure of FITS files without running fitsverify in a separate process, and read FITS headers
+without reading the data units.
+
+The checks use only the header blocks and the file size, unless the headers have CHECKSUM or DATASUM values, in which
+case the data units are read to confirm those values.
+"""
+
+import logging
+
+from astropy.io import fits
+from collections import namedtuple
+from math import prod
+from os import fstat
+
+
+__all__ = ['check_structure', 'FitsStructureError', 'iter_hdus', 'read_headers']
+
+BLOCK_SIZE = 2880
+CARD_SIZE = 80
+# read data units in chunks of this many bytes, when confirming the DATASUM and CHECKSUM values
+CHECKSUM_CHUNK_SIZE = BLOCK_SIZE * 1024
+ONES_COMPLEMENT_MODULUS = 0xFFFFFFFF
+VALID_BITPIX = [8, 16, 32, 64, -32, -64]
+# the keywords that determine the size of an HDU, or that are checked by check_structure
+STRUCTURE_KEYWORDS = ['SIMPLE', 'XTENSION', 'BITPIX', 'NAXIS', 'PCOUNT', 'GCOUNT', 'GROUPS', 'CHECKSUM', 'DATASUM']
+
+HDU = namedtuple('HDU', 'index keywords header_start data_start data_size')
+HDU.__doc__ = """The location and size of one header-data unit.
+
+index - int 0 for the primary HDU
+keywords - dict of str values for STRUCTURE_KEYWORDS and NAXISn, keyed by keyword
+header_start - int file offset of the first header block
+data_start - int file offset of the first data block
+data_size - int length of the data unit in bytes, not including the padding to a whole block
+"""
+
+
+class FitsStructureError(Exception):
+    """Raised when the structure of a file does not follow the FITS standard, or uses a FITS feature that this module
+    does not check."""
+    pass
+
+
+def _card_value(card):
+    """
+    :param card: str 80-character card
+    :return: str value of the card, without quotes for strings, without the comment
+    """
+    value = card[10:].strip()
+    if value.startswith("'"):
+        end = 1
+        while True:
+            end = value.find("'", end)
+            if end == -1:
+                raise FitsStructureError(f'Unterminated string in {card!r}')
+            if value[end + 1:end + 2] == "'":
+                # escaped quote
+                end += 2
+            else:
+                return value[1:end].replace("''", "'").rstrip()
+    return value.split('/')[0].strip()
+
+
+def _read_header(f, header_start, index):
+    """Read header blocks from header_start until the END card.
+
+    :return: tuple of dict of the structure keyword values, and int offset of the first block after the header
+    """
+    keywords = {}
+    offset = header_start
+    card_index = 0
+    while True:
+        block = f.read(BLOCK_SIZE)
+        if len(block) != BLOCK_SIZE:
+            raise FitsStructureError(f'Truncated header block at {offset} for HDU {index}')
+        offset += BLOCK_SIZE
+        try:
+            text = block.decode('ascii')
+        except UnicodeDecodeError as e:
+            raise FitsStructureError(f'Non-ASCII header content at {offset} for HDU {index}') from e
+        for start in range(0, BLOCK_SIZE, CARD_SIZE):
+            card = text[start:start + CARD_SIZE]
+            keyword = card[:8].rstrip()
+            if card_index == 0 and keyword != ('SIMPLE' if index == 0 else 'XTENSION'):
+                raise FitsStructureError(f'HDU {index} starts with {keyword!r}')
+            if card_index == 1 and keyword != 'BITPIX':
+                raise FitsStructureError(f'HDU {index} second keyword is {keyword!r}')
+            if card_index == 2 and keyword != 'NAXIS':
+                raise FitsStructureError(f'HDU {index} third keyword is {keyword!r}')
+            card_index += 1
+            if keyword == 'END':
+                return keywords, offset
+            if (
+                keyword not in keywords
+                and card[8:10] == '= '
+                and (keyword in STRUCTURE_KEYWORDS or keyword.startswith('NAXIS'))
+            ):
+                keywords[keyword] = _card_value(card)
+
+
+def _to_int(keywords, keyword, index, default=None):
+    value = keywords.get(keyword)
+    if value is None:
+        if default is None:
+            raise FitsStructureError(f'Missing {keyword} in HDU {index}')
+        return default
+    try:
+        return int(value)
+    except ValueError as e:
+        raise FitsStructureError(f'{keyword} = {value!r} is not an integer in HDU {index}') from e
+
+
+def _data_size(keywords, index):
+    """
+    :return: int length in bytes of the data unit described by keywords, not including the padding
+    """
+    if index == 0 and keywords.get('SIMPLE') != 'T':
+        raise FitsStructureError('SIMPLE is not T')
+    bitpix = _to_int(keywords, 'BITPIX', index)
+    if bitpix not in VALID_BITPIX:
+        raise FitsStructureError(f'BITPIX = {bitpix} in HDU {index}')
+    naxis = _to_int(keywords, 'NAXIS', index)
+    if naxis < 0 or naxis > 999:
+        raise FitsStructureError(f'NAXIS = {naxis} in HDU {index}')
+    if naxis == 0:
+        return 0
+    axes = [_to_int(keywords, f'NAXIS{ii}', index) for ii in range(1, naxis + 1)]
+    if index == 0 and axes[0] == 0 and keywords.get('GROUPS') == 'T':
+        raise FitsStructureError('Random groups are not checked')
+    if index == 0:
+        pcount = _to_int(keywords, 'PCOUNT', index, 0)
+        gcount = _to_int(keywords, 'GCOUNT', index, 1)
+    else:
+        pcount = _to_int(keywords, 'PCOUNT', index)
+        gcount = _to_int(keywords, 'GCOUNT', index)
+    if min(axes) < 0 or pcount < 0 or gcount < 0:
+        raise FitsStructureError(f'Negative NAXISn, PCOUNT or GCOUNT in HDU {index}')
+    return abs(bitpix) // 8 * gcount * (pcount + prod(axes))
+
+
+def _padded(size):
+    return (size + BLOCK_SIZE - 1) // BLOCK_SIZE * BLOCK_SIZE
+
+
+def iter_hdus(f):
+    """Walk the header-data units of an open FITS file, seeking over each data unit.
+
+    :param f: file object opened in binary mode, positioned at the start of the file
+    :return: generator of HDU instances
+    :raises FitsStructureError: when the structure is not consistent with the FITS standard and the file size
+    """
+    file_size = fstat(f.fileno()).st_size
+    if file_size == 0 or file_size % BLOCK_SIZE != 0:
+        raise FitsStructureError(f'File size {file_size} is not a multiple of {BLOCK_SIZE}')
+    offset = 0
+    index = 0
+    while offset < file_size:
+        f.seek(offset)
+        keywords, data_start = _read_header(f, offset, index)
+        data_size = _data_size(keywords, index)
+        next_offset = data_start + _padded(data_size)
+        if next_offset > file_size:
+            raise FitsStructureError(f'HDU {index} data unit ends at {next_offset}, beyond the file size {file_size}')
+        yield HDU(index, keywords, offset, data_start, data_size)
+        offset = next_offset
+        index += 1
+
+
+def _checksum(f, start, length, initial=0):
+    """
+    :return: int 32-bit ones' complement sum of length bytes from start, as defined for the FITS CHECKSUM keyword
+    """
+    # 2**32 is 1 modulo 2**32 - 1, so the ones' complement sum of the big-endian 32-bit words in a chunk is the chunk
+    # value, as one big integer, modulo 2**32 - 1, with the end-around carry making a non-zero multiple all ones
+    total = initial % ONES_COMPLEMENT_MODULUS
+    non_zero = initial != 0
+    f.seek(start)
+    remaining = length
+    while remaining > 0:
+        chunk = f.read(min(remaining, CHECKSUM_CHUNK_SIZE))
+        if len(chunk) == 0:
+            raise FitsStructureError(f'Unexpected end of file at {start + length - remaining}')
+        remaining -= len(chunk)
+        value = int.from_bytes(chunk, 'big')
+        non_zero = non_zero or value != 0
+        total = (total + value) % ONES_COMPLEMENT_MODULUS
+    if total == 0 and non_zero:
+        return ONES_COMPLEMENT_MODULUS
+    return total
+
+
+def _check_sums(f, hdu):
+    data_length = _padded(hdu.data_size)
+    data_sum = None
+    if 'DATASUM' in hdu.keywords:
+        data_sum = _checksum(f, hdu.data_start, data_length)
+        if str(data_sum) != hdu.keywords.get('DATASUM'):
+            raise FitsStructureError(f'DATASUM mismatch in HDU {hdu.index}')
+    if 'CHECKSUM' in hdu.keywords:
+        if data_sum is None:
+            data_sum = _checksum(f, hdu.data_start, data_length)
+        # the sum over the whole HDU, including the CHECKSUM card, is negative zero when the CHECKSUM value is correct
+        if _checksum(f, hdu.header_start, hdu.data_start - hdu.header_start, data_sum) != ONES_COMPLEMENT_MODULUS:
+            raise FitsStructureError(f'CHECKSUM mismatch in HDU {hdu.index}')
+
+
+def check_structure(fqn):
+    """Check FITS block alignment, the mandatory header keywords, the consistency of NAXISn, BITPIX, PCOUNT and GCOUNT
+    with the file size, and the CHECKSUM and DATASUM values, if present.
+
+    :param fqn: str fully-qualified file name
+    :return: None if the checks pass, a str description of the first problem otherwise. A problem does not mean the
+        file is invalid, only that a complete check with fitsverify is required.
+    """
+    if fqn.endswith('.gz'):
+        return 'Compressed files are not checked'
+    try:
+        with open(fqn, 'rb') as f:
+            for hdu in iter_hdus(f):
+                _check_sums(f, hdu)
+    except (FitsStructureError, OSError) as e:
+        logging.debug(f'check_structure for {fqn}: {e}')
+        return str(e)
+    return None
+
+
+def read_headers(fqn, max_hdus=None):
+    """Read the headers of a FITS file, seeking over each data unit, so the amount read depends only on the size of
+    the headers, not on the size of the file.
+
+    :param fqn: str fully-qualified file name
+    :param max_hdus: int stop after this many HDUs, or None to read the headers of all the HDUs
+    :return: list of astropy.io.fits.Header instances, in HDU order
+    :raises FitsStructureError: when the structure is not consistent with the FITS standard and the file size
+    """
+    result = []
+    with open(fqn, 'rb') as f:
+        for hdu in iter_hdus(f):
+            f.seek(hdu.header_start)
+            header = fits.Header.fromstring(f.read(hdu.data_start - hdu.header_start).decode('ascii'))
+            for card in header.cards:
+                # the same repairs as astropy applies when the file is opened
+                card.verify('silentfix')
+            result.append(header)
+            if max_hdus is not None and len(result) >= max_hdus:
+                break
+    return result
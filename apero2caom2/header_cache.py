@@ -0,0 +1,261 @@
+# ***********************************************************************
+# ******************  CANADIAN ASTRONOMY DATA CENTRE  *******************
+# *************  CENTRE CANADIEN DE DONNÉES ASTRONOMIQUES  **************
+#
+#  (c) 2026.                            (c) 2026.
+#  Government of Canada                 Gouvernement du Canada
+#  National Research Council            Conseil national de recherches
+#  Ottawa, Canada, K1A 0R6              Ottawa, Canada, K1A 0R6
+#  All rights reserved                  Tous droits réservés
+#
+#  NRC disclaims any warranties,        Le CNRC dénie toute garantie
+#  expressed, implied, or               énoncée, implicite ou légale,
+#  statutory, of any kind with          de quelque nature que ce
+#  respect to the software,             soit, concernant le logiciel,
+#  including without limitation         y compris sans restriction
+#  any warranty of merchantability      toute garantie de valeur
+#  or fitness for a particular          marchande ou de pertinence
+#  purpose. NRC shall not be            pour un usage particulier.
+#  liable in any event for any          Le CNRC ne pourra en aucun cas
+#  damages, whether direct or           être tenu responsable de tout
+#  indirect, special or general,        dommage, direct ou indirect,
+#  consequential or incidental,         particulier ou général,
+#  arising from the use of the          accessoire ou fortuit, résultant
+#  software.  Neither the name          de l'utilisation du logiciel. Ni
+#  of the National Research             le nom du Conseil National de
+#  Council of Canada nor the            Recherches du Canada ni les noms
+#  names of its contributors may        de ses  participants ne peuvent
+#  be used to endorse or promote        être utilisés pour approuver ou
+#  products derived from this           promouvoir les produits dérivés
+#  software without specific prior      de ce logiciel sans autorisation
+#  written permission.                  préalable et particulière
+#                                       par écrit.
+#
+#  This file is part of the             Ce fichier fait partie du projet
+#  OpenCADC project.                    OpenCADC.
+#
+#  OpenCADC is free software:           OpenCADC est un logiciel libre ;
+#  you can redistribute it and/or       vous pouvez le redistribuer ou le
+#  modify it under the terms of         modifier suivant les termes de
+#  the GNU Affero General Public        la “GNU Affero General Public
+#  License as published by the          License” telle que publiée
+#  Free Software Foundation,            par la Free Software Foundation
+#  either version 3 of the              : soit la version 3 de cette
+#  License, or (at your option)         licence, soit (à votre gré)
+#  any later version.                   toute version ultérieure.
+#
+#  OpenCADC is distributed in the       OpenCADC est distribué
+#  hope that it will be useful,         dans l’espoir qu’il vous
+#  but WITHOUT ANY WARRANTY;            sera utile, mais SANS AUCUNE
+#  without even the implied             GARANTIE : sans même la garantie
+#  warranty of MERCHANTABILITY          implicite de COMMERCIALISABILITÉ
+#  or FITNESS FOR A PARTICULAR          ni d’ADÉQUATION À UN OBJECTIF
+#  PURPOSE.  See the GNU Affero         PARTICULIER. Consultez la Licence
+#  General Public License for           Générale Publique GNU Affero
+#  more details.                        pour plus de détails.
+#
+#  You should have received             Vous devriez avoir reçu une
+#  a copy of the GNU Affero             copie de la Licence Générale
+#  General Public License along         Publique GNU Affero avec
+#  with OpenCADC.  If not, see          OpenCADC ; si ce n’est
+#  <http://www.gnu.org/licenses/>.      pas le cas, consultez :
+#                                       <http://www.gnu.org/licenses/>.
+#
+#  $Revision: 4 $
+#
+# ***********************************************************************
+#
+
+"""
+Keep the headers, and other values that are expensive to read from a file, on disk between pipeline invocations,
+keyed by the md5sum of the file content, so re-runs over files that are already stored do not parse the same headers
+again.
+
+Each entry is one file, with a fixed-size preamble, followed by the zlib-compressed JSON text of the value. Headers are
+stored as the FITS header text from Header.tostring, so loading an entry never runs code from the cache directory.
+The preamble has the format version, the astropy version the value was written with, the payload length, and the CRC32
+of the payload. An entry that does not match its preamble is discarded, and treated as a miss. Entries are written to
+a temporary file, and renamed into place, so a reader never sees a partially-written entry.
+
+The total size of the entries is bounded. When it is exceeded, the least-recently used entries are removed, where
+use is tracked by the entry file modification time.
+"""
+
+import json
+import logging
+import os
+import struct
+import zlib
+
+from astropy import __version__ as astropy_version
+from astropy.io import fits
+from tempfile import NamedTemporaryFile
+
+
+__all__ = ['HeaderCache', 'get_header_cache']
+
+MAGIC = b'APHC'
+# version 1 entries were pickles, and are discarded without being loaded
+FORMAT_VERSION = 2
+# magic, format version, astropy version, payload length, payload crc32
+PREAMBLE = struct.Struct('>4sB16sQI')
+# remove entries until the cache is this fraction of the maximum size, so eviction does not happen on every put
+EVICTION_TARGET = 0.9
+
+
+class HeaderCache:
+    """An on-disk cache of values, keyed by file md5sum and value name.
+
+    The 'headers' name holds the list of astropy Header instances for a file. Other names can hold JSON-serializable
+    values derived from the file content, e.g. the provenance inputs listed in the file. Tuples are returned as lists.
+    """
+
+    def __init__(self, directory, max_bytes):
+        """
+        :param directory: str fully-qualified name of the cache directory. Created if it does not exist.
+        :param max_bytes: int upper bound on the total size of the entries
+        """
+        self._directory = directory
+        self._max_bytes = max_bytes
+        self._logger = logging.getLogger(self.__class__.__name__)
+        self._astropy_version = astropy_version.encode()[:16]
+        # the total size of the entries is found the first time something is put in the cache
+        self._total_bytes = None
+        self._hits = 0
+        self._misses = 0
+        os.makedirs(directory, exist_ok=True)
+
+    @property
+    def hits(self):
+        return self._hits
+
+    @property
+    def misses(self):
+        return self._misses
+
+    def _entry_fqn(self, md5sum, name):
+        key = md5sum.replace('md5:', '')
+        return os.path.join(self._directory, key[:2], f'{key}.{name}')
+
+    def get(self, md5sum, name='headers'):
+        """
+        :param md5sum: str md5sum of the file content, with or without the 'md5:' prefix
+        :param name: str name of the value
+        :return: the cached value, or None if there is no valid entry
+        """
+        if not md5sum:
+            return None
+        fqn = self._entry_fqn(md5sum, name)
+        try:
+            with open(fqn, 'rb') as f:
+                preamble = f.read(PREAMBLE.size)
+                payload = f.read()
+        except FileNotFoundError:
+            self._misses += 1
+            return None
+        result = None
+        try:
+            magic, version, written_with, length, crc = PREAMBLE.unpack(preamble)
+            if (
+                magic == MAGIC
+                and version == FORMAT_VERSION
+                and written_with.rstrip(b'\0') == self._astropy_version
+                and length == len(payload)
+                and crc == zlib.crc32(payload)
+            ):
+                result = _decode(name, zlib.decompress(payload))
+        except (struct.error, zlib.error, ValueError, TypeError) as e:
+            # anything that cannot be loaded is treated as a miss
+            self._logger.debug(f'Cannot load {fqn}: {e}')
+        if result is None:
+            self._logger.warning(f'Discarding invalid header cache entry {fqn}.')
+            self._remove(fqn)
+            self._misses += 1
+        else:
+            # the modification time is the last use, for eviction
+            os.utime(fqn)
+            self._hits += 1
+        return result
+
+    def put(self, md5sum, value, name='headers'):
+        """
+        :param md5sum: str md5sum of the file content, with or without the 'md5:' prefix
+        :param value: list of astropy Header instances for the 'headers' name, a JSON-serializable value otherwise
+        :param name: str name of the value
+        """
+        if not md5sum or value is None:
+            return
+        fqn = self._entry_fqn(md5sum, name)
+        payload = zlib.compress(_encode(name, value), 1)
+        preamble = PREAMBLE.pack(MAGIC, FORMAT_VERSION, self._astropy_version, len(payload), zlib.crc32(payload))
+        os.makedirs(os.path.dirname(fqn), exist_ok=True)
+        with NamedTemporaryFile(dir=os.path.dirname(fqn), prefix='.', delete=False) as f:
+            f.write(preamble)
+            f.write(payload)
+        os.replace(f.name, fqn)
+        if self._total_bytes is None:
+            self._total_bytes = sum(entry.stat().st_size for entry in self._entries())
+        else:
+            self._total_bytes += len(preamble) + len(payload)
+        if self._total_bytes > self._max_bytes:
+            self._evict()
+
+    def _entries(self):
+        for sub_directory in os.scandir(self._directory):
+            if sub_directory.is_dir():
+                for entry in os.scandir(sub_directory.path):
+                    if entry.is_file() and not entry.name.startswith('.'):
+                        yield entry
+
+    def _remove(self, fqn):
+        try:
+            os.unlink(fqn)
+        except FileNotFoundError:
+            pass
+
+    def _evict(self):
+        entries = sorted(
+            ((entry.stat().st_mtime, entry.stat().st_size, entry.path) for entry in self._entries()),
+            key=lambda x: x[0],
+        )
+        self._total_bytes = sum(entry[1] for entry in entries)
+        target = self._max_bytes * EVICTION_TARGET
+        evicted = 0
+        for _, size, fqn in entries:
+            if self._total_bytes <= target:
+                break
+            self._remove(fqn)
+            self._total_bytes -= size
+            evicted += 1
+        self._logger.info(f'Evicted {evicted} header cache entries. {self._total_bytes} bytes remain.')
+
+
+def _encode(name, value):
+    if name == 'headers':
+        value = [header.tostring() for header in value]
+    return json.dumps(value).encode()
+
+
+def _decode(name, payload):
+    result = json.loads(payload)
+    if name == 'headers':
+        result = [fits.Header.fromstring(entry) for entry in result]
+    return result
+
+
+# one instance for each cache directory in a process
+_caches = {}
+
+
+def get_header_cache(config):
+    """
+    :param config: caom2pipe.manage_composable.Config
+    :return: HeaderCache for the header_cache lookup value, or None if it is not set
+    """
+    directory = config.lookup.get('header_cache')
+    if not directory:
+        return None
+    fqn = os.path.join(config.working_directory, directory)
+    if fqn not in _caches:
+        _caches[fqn] = HeaderCache(fqn, config.lookup.get('header_cache_max_bytes', 2 * 1024 * 1024 * 1024))
+    return _caches[fqn]
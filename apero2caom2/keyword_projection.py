@@ -0,0 +1,204 @@
+# ***********************************************************************
+# ******************  CANADIAN ASTRONOMY DATA CENTRE  *******************
+# *************  CENTRE CANADIEN DE DONNÉES ASTRONOMIQUES  **************
+#
+#  (c) 2026.                            (c) 2026.
+#  Government of Canada                 Gouvernement du Canada
+#  National Research Council            Conseil national de recherches
+#  Ottawa, Canada, K1A 0R6              Ottawa, Canada, K1A 0R6
+#  All rights reserved                  Tous droits réservés
+#
+#  NRC disclaims any warranties,        Le CNRC dénie toute garantie
+#  expressed, implied, or               énoncée, implicite ou légale,
+#  statutory, of any kind with          de quelque nature que ce
+#  respect to the software,             soit, concernant le logiciel,
+#  including without limitation         y compris sans restriction
+#  any warranty of merchantability      toute garantie de valeur
+#  or fitness for a particular          marchande ou de pertinence
+#  purpose. NRC shall not be            pour un usage particulier.
+#  liable in any event for any          Le CNRC ne pourra en aucun cas
+#  damages, whether direct or           être tenu responsable de tout
+#  indirect, special or general,        dommage, direct ou indirect,
+#  consequential or incidental,         particulier ou général,
+#  arising from the use of the          accessoire ou fortuit, résultant
+#  software.  Neither the name          de l'utilisation du logiciel. Ni
+#  of the National Research             le nom du Conseil National de
+#  Council of Canada nor the            Recherches du Canada ni les noms
+#  names of its contributors may        de ses  participants ne peuvent
+#  be used to endorse or promote        être utilisés pour approuver ou
+#  products derived from this           promouvoir les produits dérivés
+#  software without specific prior      de ce logiciel sans autorisation
+#  written permission.                  préalable et particulière
+#                                       par écrit.
+#
+#  This file is part of the             Ce fichier fait partie du projet
+#  OpenCADC project.                    OpenCADC.
+#
+#  OpenCADC is free software:           OpenCADC est un logiciel libre ;
+#  you can redistribute it and/or       vous pouvez le redistribuer ou le
+#  modify it under the terms of         modifier suivant les termes de
+#  the GNU Affero General Public        la “GNU Affero General Public
+#  License as published by the          License” telle que publiée
+#  Free Software Foundation,            par la Free Software Foundation
+#  either version 3 of the              : soit la version 3 de cette
+#  License, or (at your option)         licence, soit (à votre gré)
+#  any later version.                   toute version ultérieure.
+#
+#  OpenCADC is distributed in the       OpenCADC est distribué
+#  hope that it will be useful,         dans l’espoir qu’il vous
+#  but WITHOUT ANY WARRANTY;            sera utile, mais SANS AUCUNE
+#  without even the implied             GARANTIE : sans même la garantie
+#  warranty of MERCHANTABILITY          implicite de COMMERCIALISABILITÉ
+#  or FITNESS FOR A PARTICULAR          ni d’ADÉQUATION À UN OBJECTIF
+#  PURPOSE.  See the GNU Affero         PARTICULIER. Consultez la Licence
+#  General Public License for           Générale Publique GNU Affero
+#  more details.                        pour plus de détails.
+#
+#  You should have received             Vous devriez avoir reçu une
+#  a copy of the GNU Affero             copie de la Licence Générale
+#  General Public License along         Publique GNU Affero avec
+#  with OpenCADC.  If not, see          OpenCADC ; si ce n’est
+#  <http://www.gnu.org/licenses/>.      pas le cas, consultez :
+#                                       <http://www.gnu.org/licenses/>.
+#
+#  $Revision: 4 $
+#
+# ***********************************************************************
+#
+
+"""
+Keep only the header cards that a blueprint, its plugin module, and WCS construction use, so the headers held for
+each unit of work take a fraction of the memory of the complete headers.
+
+The keyword set is the union of:
+- the keywords named in the blueprint plan, including the extension-specific plans
+- the string constants in the plugin module source that could be FITS keywords
+- the keywords the other visitors read from the headers, in VISITOR_KEYWORDS
+- the structural and WCS keywords matched by WCS_PATTERNS, which is deliberately broader than what FitsParser reads
+"""
+
+import ast
+import logging
+import re
+
+from astropy.io import fits
+from caom2utils.blueprints import ObsBlueprint
+from os.path import exists, getmtime
+
+
+__all__ = ['get_keyword_projection', 'KeywordProjection']
+
+# a string constant in a plugin module that could be a FITS keyword
+KEYWORD_CONSTANT = re.compile('^[A-Z][A-Z0-9_-]{0,7}$')
+# always retained, for the visitors that read headers without a blueprint, e.g. provenance_augmentation
+VISITOR_KEYWORDS = frozenset(['DRSOBJN', 'PI_NAME'])
+# always retained, for HDU structure and for astropy.wcs
+WCS_PATTERNS = re.compile(
+    '^('
+    'SIMPLE|XTENSION|EXTEND|EXTNAME|EXTVER|BITPIX|NAXIS[0-9]*|PCOUNT|GCOUNT|BSCALE|BZERO|BUNIT|BLANK|'
+    'WCSAXES[A-Z]?|WCSNAME[A-Z]?|CTYPE[0-9]+[A-Z]?|CRVAL[0-9]+[A-Z]?|CRPIX[0-9]+[A-Z]?|CDELT[0-9]+[A-Z]?|'
+    'CUNIT[0-9]+[A-Z]?|CROTA[0-9]+|CD[0-9]+_[0-9]+[A-Z]?|PC[0-9]+_[0-9]+[A-Z]?|PV[0-9]+_[0-9]+[A-Z]?|'
+    'PS[0-9]+_[0-9]+[A-Z]?|CRDER[0-9]+[A-Z]?|CSYER[0-9]+[A-Z]?|LONPOLE[A-Z]?|LATPOLE[A-Z]?|EQUINOX[A-Z]?|'
+    'EPOCH|RADESYS[A-Z]?|RADECSYS|SPECSYS[A-Z]?|SSYSOBS[A-Z]?|SSYSSRC[A-Z]?|VELOSYS[A-Z]?|ZSOURCE[A-Z]?|'
+    'RESTFRQ[A-Z]?|RESTFREQ|RESTWAV[A-Z]?|VELANGL[A-Z]?|VELREF|TIMESYS|TIMEUNIT|TREFPOS|TREFDIR|PLEPHEM|'
+    'MJDREF[IF]?|JDREF[IF]?|DATEREF|MJD-OBS|MJD-BEG|MJD-AVG|MJD-END|DATE-OBS|DATE-BEG|DATE-AVG|DATE-END|DATE|'
+    'TSTART|TSTOP|XPOSURE|TELAPSE|OBSGEO-[XYZBLH]|A_ORDER|B_ORDER|AP_ORDER|BP_ORDER|A_[0-9]+_[0-9]+|'
+    'B_[0-9]+_[0-9]+|AP_[0-9]+_[0-9]+|BP_[0-9]+_[0-9]+|TFIELDS|TTYPE[0-9]+|TFORM[0-9]+|TUNIT[0-9]+|TDIM[0-9]+|'
+    'THEAP|ZIMAGE|ZBITPIX|ZNAXIS[0-9]*|ZTILE[0-9]+|ZCMPTYPE|ZNAME[0-9]+|ZVAL[0-9]+|ZQUANTIZ|ZDITHER0'
+    ')$'
+)
+
+
+class KeywordProjection:
+    """Reduce headers to the cards for a set of keywords, and the cards that match WCS_PATTERNS."""
+
+    def __init__(self, keywords):
+        """
+        :param keywords: iterable of str keywords to retain
+        """
+        self._keywords = frozenset(keyword.upper() for keyword in keywords)
+
+    @property
+    def keywords(self):
+        return self._keywords
+
+    def retains(self, keyword):
+        return keyword in self._keywords or keyword in VISITOR_KEYWORDS or WCS_PATTERNS.match(keyword) is not None
+
+    def project(self, headers):
+        """
+        :param headers: list of astropy Header instances
+        :return: list of astropy Header instances, with only the retained cards, in their original order
+        """
+        result = []
+        for header in headers:
+            result.append(fits.Header([card for card in header.cards if self.retains(card.keyword)]))
+        return result
+
+
+def _plan_keywords(plan):
+    """
+    :param plan: dict of ObsBlueprint keys and values
+    :return: generator of the keywords named in the plan values
+    """
+    for value in plan.values():
+        # keyword look-ups are (list of keywords, default)
+        if isinstance(value, tuple) and len(value) > 0 and isinstance(value[0], list):
+            for keyword in value[0]:
+                yield keyword
+
+
+def blueprint_keywords(bp_fqn):
+    """
+    :param bp_fqn: str fully-qualified blueprint file name
+    :return: set of the keywords the blueprint looks up
+    """
+    blueprint = ObsBlueprint()
+    blueprint.load_from_file(bp_fqn)
+    result = set(_plan_keywords(blueprint._plan))
+    for extension_plan in blueprint._extensions.values():
+        result.update(_plan_keywords(extension_plan))
+    return result
+
+
+def plugin_keywords(module_fqn):
+    """
+    :param module_fqn: str fully-qualified plugin module file name
+    :return: set of the str constants in the module source that could be FITS keywords
+    """
+    with open(module_fqn) as f:
+        tree = ast.parse(f.read(), filename=module_fqn)
+    return {
+        node.value
+        for node in ast.walk(tree)
+        if isinstance(node, ast.Constant) and isinstance(node.value, str) and KEYWORD_CONSTANT.match(node.value)
+    }
+
+
+# KeywordProjection instances, keyed by the blueprint and plugin file names and modification times
+_projections = {}
+
+
+def get_keyword_projection(config, blueprint_name):
+    """
+    :param config: caom2pipe.manage_composable.Config
+    :param blueprint_name: str blueprint file name, as provided by APEROName
+    :return: KeywordProjection for the blueprint and its plugin module, or None if keyword_projection is not True, or
+        if the blueprint file does not exist
+    """
+    if not config.lookup.get('keyword_projection', False):
+        return None
+    # the same file names as File2caom2Visitor._get_blueprints
+    bp_fqn = f'{config.lookup.get("blueprint_directory")}/{blueprint_name}'
+    if not exists(bp_fqn):
+        return None
+    module_fqn = f'{config.lookup.get("blueprint_directory")}/{config.lookup.get("instrument").lower()}.py'
+    module_mtime = getmtime(module_fqn) if exists(module_fqn) else None
+    key = (bp_fqn, getmtime(bp_fqn), module_fqn, module_mtime)
+    if key not in _projections:
+        keywords = blueprint_keywords(bp_fqn)
+        if module_mtime is not None:
+            keywords.update(plugin_keywords(module_fqn))
+        logging.debug(f'Retaining {len(keywords)} keywords, and WCS keywords, for {bp_fqn}.')
+        _projections[key] = KeywordProjection(keywords)
+    return _projections[key]
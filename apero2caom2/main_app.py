@@ -70,9 +70,14 @@
 This module implements the ObsBlueprint mapping.
 """
 
-from datetime import datetime, timedelta
+import numpy as np
+import re
+import traceback
+
+from collections import deque, namedtuple
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
 from os.path import basename
-from re import search
 
 from caom2 import ProductType
 from caom2pipe.execute_composable import (
@@ -87,12 +92,34 @@ from caom2pipe.manage_composable import (
 )
 from caom2utils.data_util import get_local_file_info, get_local_file_headers
 from apero2caom2.cfht_name import CFHTName
+from apero2caom2.fits_access import FitsAccess
+from apero2caom2.fits_structure import FitsStructureError, read_headers
+from apero2caom2.header_cache import get_header_cache
+from apero2caom2.keyword_projection import get_keyword_projection
+from apero2caom2.validation import get_validation_level, validate_observation
 
 
 __all__ = [
     'APEROName',
+    'APEROObservationGroup',
+    'APEROParsedName',
+    'classify_file_names',
+    'group_by_observation',
+    'observation_groups_enabled',
+    'parse_apero_name',
+]
+
+# the first run of digits is the sequence number, and the character that follows it is the suffix
+SEQUENCE_NUMBER = re.compile('[0-9]{5,7}')
+# Template_s1dw_GL699_sc1d_w_file_AB, lbl2_GL699_GL699_drift, 2399662o_pp_e2dsff_tcorr_AB_GL699_GL699_lbl
+TARGETS = [
+    re.compile('Template_(?:s1d[vw]_)?([^_.]+)_'),
+    re.compile('_lbl2?_([^_.]+)'),
+    re.compile('_([^_.]+)_[^_.]+_lbl[._]'),
 ]
 
+APEROParsedName = namedtuple('APEROParsedName', 'file_id suffix obs_id product_id blueprint_name target')
+
 
 class APEROName(CFHTName):
     """Naming rules:
@@ -107,6 +134,10 @@ class APEROName(CFHTName):
         self._object = None
         self._instrument_value = instrument
         self._blueprint_name = None
+        self._parsed_name = None
+        self._discovered_file_info = {}
+        self._discovered_headers = {}
+        self._fits_access = {}
         try:
             super().__init__(instrument=instrument, source_names=source_names)
         except ValueError as e:
@@ -119,35 +150,19 @@ class APEROName(CFHTName):
 
     @property
     def blueprint_name(self):
-        # energy in Simple
-        # time in RDB, Template
-        # position in Template
-        obs_cardinality = 'derived'
-        if self._product_id.startswith('DRS_POST_') or self._suffix == 'o':
-            obs_cardinality = 'simple'
-        if self._file_name.endswith('.png') or self._file_name.endswith('.rdb') or self._file_name.endswith('.txt'):
-            wcs_axes = 'no_wcs'
-        else:
-            if self.product_id == 'LBL_RDB_FITS':
-                wcs_axes = 'lbl_rdb_fits'
-            else:
-                wcs_axes = 'no_wcs'
-                if obs_cardinality == 'simple':
-                    if self._suffix == 'p':
-                        wcs_axes = 'polarization_spatial_spectral_temporal'
-                    elif self._suffix == 'o':
-                        wcs_axes = 'spatial_temporal'
-                    else:
-                        wcs_axes = 'spatial_spectral_temporal'
-                else:
-                    wcs_axes = 'spatial_temporal'
-        self._blueprint_name = f'{self._instrument_value.lower()}_{obs_cardinality}_{wcs_axes}.bp'
+        self._blueprint_name = self._parsed().blueprint_name
         return self._blueprint_name
 
     @property
     def instrument_value(self):
         return self._instrument_value
 
+    @property
+    def target(self):
+        """The DRS target (DRSOBJN) for Template and LBL files, as it appears in the file name, so it's available
+        without reading the file. An empty str for all other files."""
+        return self._parsed().target
+
     @property
     def prev(self):
         """The preview file name for the file."""
@@ -161,71 +176,62 @@ class APEROName(CFHTName):
     def is_valid(self):
         return True
 
+    def get_discovered_file_info(self, source_name):
+        return self._discovered_file_info.get(source_name)
+
+    def get_discovered_headers(self, source_name):
+        return self._discovered_headers.get(source_name)
+
+    def set_discovered(self, source_name, file_info, headers=None):
+        """Keep the metadata that was read from a file during work discovery, so that
+        set_storage_name_from_local_preconditions does not read the same file again.
+
+        :param source_name: str as it appears in source_names
+        :param file_info: FileInfo for source_name
+        :param headers: list of astropy Header instances for source_name, if they were read during discovery
+        """
+        self._discovered_file_info[source_name] = file_info
+        if headers is not None:
+            self._discovered_headers[source_name] = headers
+
+    def fits_access(self, uri, fqn=None):
+        """The visitors for this unit of work share one FitsAccess for each file, so that a file is opened at most
+        once, and the headers in metadata are re-used.
+
+        :param uri: str destination URI for the file
+        :param fqn: str fully-qualified name of the file, if it's known, for opening it
+        :return: FitsAccess for uri, until release_fits_access is called
+        """
+        result = self._fits_access.get(uri)
+        if result is None:
+            result = FitsAccess(self.metadata.get(uri), fqn)
+            self._fits_access[uri] = result
+        elif result.fqn is None:
+            result.fqn = fqn
+        return result
+
+    def release_fits_access(self):
+        """Close the files opened for this unit of work."""
+        for fits_access in self._fits_access.values():
+            fits_access.close()
+        self._fits_access = {}
+
+    def _parsed(self):
+        if self._parsed_name is None:
+            self._parsed_name = parse_apero_name(self._file_name, self._instrument_value)
+        return self._parsed_name
+
     def set_file_id(self):
-        self._file_id = APEROName.remove_extensions(self._file_name)
-        self._suffix = None
-        if self.sequence_number is not None:
-            # for file names that have _flag or _diag in them
-            self._suffix = self._file_id.split('_')[0][-1]
+        self._file_id = self._parsed().file_id
+        # for file names that have _flag or _diag in them, or tcorr files, where the suffix is not in the correct
+        # position
+        self._suffix = self._parsed().suffix
 
     def set_obs_id(self, **kwargs):
-        # tcorr files have suffixes, and they're not in the correct position
-        temp = search('[0-9]{5,7}', self._file_name)
-        if temp:
-            self._suffix = self._file_name[temp.end()]
-
-        temp_file_id = self._file_id
-        if self._file_name.endswith('.png'):
-            temp_file_id = self._file_id.replace('.png', '').replace('_256', '')
-        if self._suffix and temp_file_id[-1] == self._suffix:
-            self._obs_id = temp_file_id[:-1]
-        else:
-            self._obs_id = temp_file_id
+        self._obs_id = self._parsed().obs_id
 
     def set_product_id(self, **kwargs):
-        # DRS_POST_<suffix>
-        # TELLU_TEMP_S1DW
-        # TELLU_TEMP_S1DV
-        # TELLU_TEMP
-        # LBL_FITS
-        # LBL_RDB_FITS
-        # LBL_RDB
-        # LBL_RDB2
-        # LBL_RDB_DRIFT
-        # LBL_RDB2_DRIFT
-        self._logger.debug(f'Begin set_product_id {self._file_id}')
-        if '_Template_' in self._file_id:
-            if '_s1dw_' in self._file_id:
-                self._product_id = 'TELLU_TEMP_S1DW'
-            elif '_s1dv_' in self._file_id:
-                self._product_id = 'TELLU_TEMP_S1DV'
-            else:
-                self._product_id = 'TELLU_TEMP'
-        elif '_lbl2' in self._file_id:
-            if '_drift' in self._file_id:
-                self._product_id = 'LBL_RDB2_DRIFT'
-            else:
-                self._product_id = 'LBL_RDB2'
-            if self._file_name.endswith('.fits'):
-                self._product_id = self._product_id.replace('RDB2', 'FITS')
-        elif '_lbl' in self._file_id:
-            if '_drift' in self._file_id:
-                self._product_id = 'LBL_RDB_DRIFT'
-            else:
-                self._product_id = 'LBL_RDB'
-            if (
-                self._file_name.endswith('lbl.fits')
-                or self._file_name.endswith('lbl.png')
-                or self._file_name.endswith('lbl_256.png')
-            ):
-                self._product_id = 'LBL_FITS'
-            elif self._file_name.endswith('.fits') or self._file_name.endswith('.png'):
-                self._product_id = f'{self._product_id}_FITS'
-        else:
-            if self._suffix and len(self._file_name.split('_')) in [4, 5]:
-                self._product_id = f'DRS_POST_{self._suffix.upper()}'
-            else:
-                self._product_id = 'NO_GUIDANCE'
+        self._product_id = self._parsed().product_id
         self._logger.debug(f'End set_product_id {self._product_id} for {self._file_name}')
 
     @staticmethod
@@ -233,7 +239,103 @@ class APEROName(CFHTName):
         return CFHTName.remove_extensions(name).replace('.rdb', '').replace('.png', '').replace('.txt', '')
 
 
-class APERONoFheadVisitRunnerMeta(NoFheadVisitRunnerMeta):
+class APEROObservationGroup(APEROName):
+    """All the pending files for one observation, as a single unit of work, so that the observation is read from, and
+    written to, the CAOM2 repository once for the whole family of files, instead of once for each file.
+
+    The naming attributes are those of the first member. source_names has the source names of all the members, so that
+    data source clean up applies to every file in the group.
+    """
+
+    def __init__(self, members):
+        """
+        :param members: list of APEROName instances with the same obs_id
+        """
+        self._members = members
+        # set by APEROObservationGroupExecute, so the outcome is reported for every member
+        self.completed = False
+        self.failure = None
+        super().__init__(
+            instrument=members[0].instrument_value,
+            source_names=[source_name for member in members for source_name in member.source_names],
+        )
+
+    @property
+    def members(self):
+        return self._members
+
+    def release_fits_access(self):
+        super().release_fits_access()
+        for member in self._members:
+            member.release_fits_access()
+
+
+class APEROObservationGroupExecute:
+    """Executor behaviour for APEROObservationGroup work: one CAOM2 read, all the visitors for every member, then one
+    CAOM2 write. Any other StorageName is handled by the executor's usual execute.
+
+    This replaces the steps of the local executors' execute, so it is only used with use_local_files."""
+
+    def _store_group_member(self):
+        pass
+
+    def execute(self, context):
+        group = context.get('storage_name')
+        if not isinstance(group, APEROObservationGroup):
+            return super().execute(context)
+
+        try:
+            self._execute_group(group)
+        except Exception as e:
+            # the reporter only hears about the first member from OrganizeExecutes, so keep the failure for the rest
+            group.failure = (e, traceback.format_exc())
+            raise
+        group.completed = True
+
+    def _execute_group(self, group):
+        self._logger.debug(f'begin execute for the {len(group.members)} files of {group.obs_id}')
+        for member in group.members:
+            self.storage_name = member
+            self._logger.debug(f'set the preconditions for {member.file_name}')
+            self._set_preconditions()
+            self._store_group_member()
+
+        self._logger.debug('get the observation for the existing model')
+        self._caom2_read()
+
+        for member in group.members:
+            self.storage_name = member
+            self._logger.debug(f'execute the meta visitors for {member.file_name}')
+            self._visit_meta()
+            if self._observation is None:
+                # the visitors report their own failures and return None, so nothing is stored for any member
+                raise CadcException(f'No observation after the meta visitors for {member.file_name}.')
+            self._logger.debug(f'execute the data visitors for {member.file_name}')
+            self._visit_data()
+
+        self._logger.debug('write the observation to disk for debugging')
+        self._write_model()
+
+        self._logger.debug('store the updated xml')
+        self._caom2_store()
+
+        self._logger.debug('End execute.')
+
+
+class APEROValidateExecute:
+    """Executor behaviour that validates the observation once, after all the visitors have run, as the step before it
+    is stored. An observation that is not valid is not stored."""
+
+    def _validate(self):
+        self._logger.debug('validate the observation')
+        validate_observation(self._observation, get_validation_level(self._config))
+
+    def _caom2_store(self):
+        self._validate()
+        super()._caom2_store()
+
+
+class APERONoFheadVisitRunnerMeta(APEROValidateExecute, NoFheadVisitRunnerMeta):
     """Defines a pipeline step for all the operations that require access to the file on disk for metdata and data
     operations.
     """
@@ -242,11 +344,11 @@ class APERONoFheadVisitRunnerMeta(NoFheadVisitRunnerMeta):
         """This is probably not the best approach, but I want to think about where the optimal location for the
         retrieve_file_info and retrieve_headers methods will be long-term. So, for the moment, use them here."""
         self._logger.debug(f'Begin _set_preconditions for {self._storage_name.file_name}')
-        set_storage_name_from_local_preconditions(self._storage_name, self._config.working_directory, self._logger)
+        set_storage_name_from_config(self._storage_name, self._config, self._logger)
         self._logger.debug('End _set_preconditions')
 
 
-class APERONoFheadLocalVisitRunnerMeta(CaomExecuteRunnerMeta):
+class APERONoFheadLocalVisitRunnerMeta(APEROValidateExecute, CaomExecuteRunnerMeta):
 
     def __init__(self, clients, config, data_visitors, meta_visitors, reporter):
         super().__init__(clients, config, meta_visitors, reporter)
@@ -256,7 +358,7 @@ class APERONoFheadLocalVisitRunnerMeta(CaomExecuteRunnerMeta):
         """This is probably not the best approach, but I want to think about where the optimal location for the
         retrieve_file_info and retrieve_headers methods will be long-term. So, for the moment, use them here."""
         self._logger.debug(f'Begin _set_preconditions for {self._storage_name.file_name}')
-        set_storage_name_from_local_preconditions(self._storage_name, self._config.working_directory, self._logger)
+        set_storage_name_from_config(self._storage_name, self._config, self._logger)
         self._logger.debug('End _set_preconditions')
 
     def execute(self, context):
@@ -284,17 +386,22 @@ class APERONoFheadLocalVisitRunnerMeta(CaomExecuteRunnerMeta):
         self._logger.debug('End execute.')
 
 
-class APERONoFheadScrapeVisitRunnerMeta(NoFheadScrapeRunnerMeta):
+class APERONoFheadScrapeVisitRunnerMeta(APEROValidateExecute, NoFheadScrapeRunnerMeta):
+
+    def _write_model(self):
+        # scraping does not store the observation, so writing it to disk is the step after validation
+        self._validate()
+        super()._write_model()
 
     def _set_preconditions(self):
         """This is probably not the best approach, but I want to think about where the optimal location for the
         retrieve_file_info and retrieve_headers methods will be long-term. So, for the moment, use them here."""
         self._logger.debug(f'Begin _set_preconditions for {self._storage_name.file_name}')
-        set_storage_name_from_local_preconditions(self._storage_name, self._config.working_directory, self._logger)
+        set_storage_name_from_config(self._storage_name, self._config, self._logger)
         self._logger.debug('End _set_preconditions')
 
 
-class APERONoFheadStoreVisitRunnerMeta(NoFheadStoreVisitRunnerMeta):
+class APERONoFheadStoreVisitRunnerMeta(APEROValidateExecute, NoFheadStoreVisitRunnerMeta):
 
     def __init__(self, clients, config, data_visitors, meta_visitors, reporter, store_transferrer):
         super().__init__(config, clients, store_transferrer, meta_visitors, data_visitors, reporter)
@@ -303,10 +410,21 @@ class APERONoFheadStoreVisitRunnerMeta(NoFheadStoreVisitRunnerMeta):
         """This is probably not the best approach, but I want to think about where the optimal location for the
         retrieve_file_info and retrieve_headers methods will be long-term. So, for the moment, use them here."""
         self._logger.debug(f'Begin _set_preconditions for {self._storage_name.file_name}')
-        set_storage_name_from_local_preconditions(self._storage_name, self._config.working_directory, self._logger)
+        set_storage_name_from_config(self._storage_name, self._config, self._logger)
         self._logger.debug('End _set_preconditions')
 
 
+class APEROGroupedLocalVisitRunnerMeta(APEROObservationGroupExecute, APERONoFheadLocalVisitRunnerMeta):
+    pass
+
+
+class APEROGroupedStoreVisitRunnerMeta(APEROObservationGroupExecute, APERONoFheadStoreVisitRunnerMeta):
+
+    def _store_group_member(self):
+        self._logger.debug(f'store the input file {self._storage_name.file_name}')
+        self._store_data()
+
+
 class APEROOrganizeExecutesRunnerMeta(OrganizeExecutesRunnerMeta):
     """A class that extends OrganizeExecutes to handle the choosing of the correct executors based on the config.yml.
     Attributes:
@@ -325,6 +443,7 @@ class APEROOrganizeExecutesRunnerMeta(OrganizeExecutesRunnerMeta):
         super()._choose()
         if self._needs_delete:
             raise CadcException('No need identified for this yet.')
+        grouped = observation_groups_enabled(self.config)
 
         if TaskType.SCRAPE in self.task_types:
             self._logger.debug(
@@ -338,12 +457,11 @@ class APEROOrganizeExecutesRunnerMeta(OrganizeExecutesRunnerMeta):
             )
         elif TaskType.STORE in self.task_types:
             if self.config.use_local_files:
-                self._logger.debug(
-                    f'Over-riding with executor APERONoFheadStoreVisitRunnerMeta for tasks {self.task_types}.'
-                )
+                executor_class = APEROGroupedStoreVisitRunnerMeta if grouped else APERONoFheadStoreVisitRunnerMeta
+                self._logger.debug(f'Over-riding with executor {executor_class.__name__} for tasks {self.task_types}.')
                 self._executors = []
                 self._executors.append(
-                    APERONoFheadStoreVisitRunnerMeta(
+                    executor_class(
                         self._clients,
                         self.config,
                         self._data_visitors,
@@ -356,12 +474,11 @@ class APEROOrganizeExecutesRunnerMeta(OrganizeExecutesRunnerMeta):
                 raise CadcException('Cannot store files without use_local_files set.')
         elif TaskType.MODIFY in self.task_types:
             if self.config.use_local_files:
-                self._logger.debug(
-                    f'Over-riding with executor APERONoFheadLocalVisitRunnerMeta for tasks {self.task_types}.'
-                )
+                executor_class = APEROGroupedLocalVisitRunnerMeta if grouped else APERONoFheadLocalVisitRunnerMeta
+                self._logger.debug(f'Over-riding with executor {executor_class.__name__} for tasks {self.task_types}.')
                 self._executors = []
                 self._executors.append(
-                    APERONoFheadLocalVisitRunnerMeta(
+                    executor_class(
                         self._clients,
                         self.config,
                         self._data_visitors,
@@ -385,10 +502,45 @@ class APEROOrganizeExecutesRunnerMeta(OrganizeExecutesRunnerMeta):
                     )
                 )
 
-
-def set_storage_name_from_local_preconditions(storage_name, working_directory, logger):
+    def do_one(self, storage_name):
+        """OrganizeExecutes reports the outcome of an APEROObservationGroup once, for the first member, so report the
+        same outcome for the rest of the members, and the reporter counts files, not groups."""
+        start_s = datetime.now(tz=timezone.utc).timestamp()
+        result = super().do_one(storage_name)
+        if isinstance(storage_name, APEROObservationGroup):
+            for member in storage_name.members[1:]:
+                if storage_name.completed:
+                    self._reporter.capture_success(member.obs_id, member.file_name, start_s)
+                elif storage_name.failure is not None:
+                    self._reporter.capture_failure(member, *storage_name.failure)
+        return result
+
+
+def set_storage_name_from_config(storage_name, config, logger):
+    """set_storage_name_from_local_preconditions, with the header handling chosen by the config.yml lookup values."""
+    set_storage_name_from_local_preconditions(
+        storage_name,
+        config.working_directory,
+        logger,
+        config.lookup.get('header_reader', 'astropy'),
+        get_header_cache(config),
+        get_keyword_projection(config, storage_name.blueprint_name),
+    )
+
+
+def set_storage_name_from_local_preconditions(
+    storage_name, working_directory, logger, header_reader='astropy', header_cache=None, keyword_projection=None
+):
     """Retrieve FileInfo and header metadata into memory from files on disk. These files have extension names and
-    compression as expected and support by CADC's Storage Inventory system."""
+    compression as expected and support by CADC's Storage Inventory system.
+
+    FileInfo and headers that were already read during work discovery are re-used, instead of being read again.
+
+    :param header_reader: str 'astropy' to read headers with astropy, 'seek' to read only the header blocks of
+        uncompressed FITS files
+    :param header_cache: HeaderCache consulted, by md5sum, before headers are read from the file
+    :param keyword_projection: KeywordProjection that reduces the headers that are kept to the cards the blueprint
+        needs"""
     logger.debug(f'Begin set_storage_name_from_local_preconditions in {working_directory}')
 
     if len(storage_name.metadata) == 0:
@@ -398,9 +550,19 @@ def set_storage_name_from_local_preconditions(storage_name, working_directory, l
         target = None
         for source_name in storage_name.source_names:
             local_fqn = search_for_source_name(storage_name.obs_id, source_name, working_directory)
-            file_info[source_name] = get_local_file_info(local_fqn)
+            file_info[source_name] = storage_name.get_discovered_file_info(source_name)
+            if file_info[source_name] is None:
+                file_info[source_name] = get_local_file_info(local_fqn)
             if '.fits' in source_name:
-                headers[source_name] = get_local_file_headers(local_fqn)
+                headers[source_name] = storage_name.get_discovered_headers(source_name)
+                if headers[source_name] is None and header_cache is not None:
+                    headers[source_name] = header_cache.get(file_info[source_name].md5sum)
+                if headers[source_name] is None:
+                    headers[source_name] = _read_local_headers(local_fqn, header_reader, logger)
+                    if header_cache is not None:
+                        header_cache.put(file_info[source_name].md5sum, headers[source_name])
+                if keyword_projection is not None:
+                    headers[source_name] = keyword_projection.project(headers[source_name])
                 target = get_keyword(headers[source_name], 'DRSOBJN')
             else:
                 headers[source_name] = []
@@ -417,3 +579,174 @@ def set_storage_name_from_local_preconditions(storage_name, working_directory, l
             storage_name.file_info[uri] = file_info.get(source_name)
             storage_name.metadata[uri] = headers.get(source_name)
     logger.debug('End set_storage_name_from_local_preconditions')
+
+
+def _read_local_headers(local_fqn, header_reader, logger):
+    """
+    :return: list of astropy Header instances for local_fqn
+    """
+    if header_reader == 'seek' and local_fqn.endswith('.fits'):
+        try:
+            return read_headers(local_fqn)
+        except FitsStructureError as e:
+            logger.info(f'Reading {local_fqn} with astropy, because {e}')
+    return get_local_file_headers(local_fqn)
+
+
+def group_by_observation(work):
+    """
+    :param work: iterable of APEROName instances
+    :return: deque with an APEROObservationGroup for each obs_id with more than one entry, and the APEROName instance
+        otherwise, in the order in which each obs_id first occurs in work
+    """
+    groups = {}
+    for entry in work:
+        groups.setdefault(entry.obs_id, []).append(entry)
+    result = deque()
+    for members in groups.values():
+        result.append(members[0] if len(members) == 1 else APEROObservationGroup(members))
+    return result
+
+
+def observation_groups_enabled(config):
+    """Work is grouped by observation when the group_by_observation lookup value is True, and the files are local.
+    Scraping is always done one file at a time."""
+    return (
+        config.lookup.get('group_by_observation', False)
+        and config.use_local_files
+        and TaskType.SCRAPE not in config.task_types
+    )
+
+
+@lru_cache(maxsize=65536)
+def parse_apero_name(file_name, instrument):
+    """Everything APEROName derives from a file name, worked out once per file name.
+
+    :param file_name: str file name, with extensions
+    :param instrument: str instrument value, as configured
+    :return: APEROParsedName. blueprint_name is None if there's no instrument value.
+    """
+    file_id = APEROName.remove_extensions(file_name)
+    suffix = None
+    temp = SEQUENCE_NUMBER.search(file_name)
+    if temp:
+        suffix = file_name[temp.end()]
+
+    temp_file_id = file_id
+    if file_name.endswith('.png'):
+        temp_file_id = file_id.replace('.png', '').replace('_256', '')
+    if suffix and temp_file_id[-1] == suffix:
+        obs_id = temp_file_id[:-1]
+    else:
+        obs_id = temp_file_id
+
+    product_id = _get_product_id(file_name, file_id, suffix)
+    blueprint_name = None
+    if instrument is not None:
+        blueprint_name = f'{instrument.lower()}_{_get_blueprint_axes(file_name, suffix, product_id)}.bp'
+
+    target = ''
+    if 'Template_' in file_name or '_lbl' in file_name:
+        for pattern in TARGETS:
+            temp = pattern.search(file_name)
+            if temp:
+                target = temp.group(1)
+                break
+    return APEROParsedName(file_id, suffix, obs_id, product_id, blueprint_name, target)
+
+
+def _get_product_id(file_name, file_id, suffix):
+    # DRS_POST_<suffix>
+    # TELLU_TEMP_S1DW
+    # TELLU_TEMP_S1DV
+    # TELLU_TEMP
+    # LBL_FITS
+    # LBL_RDB_FITS
+    # LBL_RDB
+    # LBL_RDB2
+    # LBL_RDB_DRIFT
+    # LBL_RDB2_DRIFT
+    if '_Template_' in file_id:
+        if '_s1dw_' in file_id:
+            result = 'TELLU_TEMP_S1DW'
+        elif '_s1dv_' in file_id:
+            result = 'TELLU_TEMP_S1DV'
+        else:
+            result = 'TELLU_TEMP'
+    elif '_lbl2' in file_id:
+        if '_drift' in file_id:
+            result = 'LBL_RDB2_DRIFT'
+        else:
+            result = 'LBL_RDB2'
+        if file_name.endswith('.fits'):
+            result = result.replace('RDB2', 'FITS')
+    elif '_lbl' in file_id:
+        if '_drift' in file_id:
+            result = 'LBL_RDB_DRIFT'
+        else:
+            result = 'LBL_RDB'
+        if file_name.endswith('lbl.fits') or file_name.endswith('lbl.png') or file_name.endswith('lbl_256.png'):
+            result = 'LBL_FITS'
+        elif file_name.endswith('.fits') or file_name.endswith('.png'):
+            result = f'{result}_FITS'
+    else:
+        if suffix and len(file_name.split('_')) in [4, 5]:
+            result = f'DRS_POST_{suffix.upper()}'
+        else:
+            result = 'NO_GUIDANCE'
+    return result
+
+
+def _get_blueprint_axes(file_name, suffix, product_id):
+    # energy in Simple
+    # time in RDB, Template
+    # position in Template
+    obs_cardinality = 'derived'
+    if product_id.startswith('DRS_POST_') or suffix == 'o':
+        obs_cardinality = 'simple'
+    if file_name.endswith('.png') or file_name.endswith('.rdb') or file_name.endswith('.txt'):
+        wcs_axes = 'no_wcs'
+    else:
+        if product_id == 'LBL_RDB_FITS':
+            wcs_axes = 'lbl_rdb_fits'
+        else:
+            wcs_axes = 'no_wcs'
+            if obs_cardinality == 'simple':
+                if suffix == 'p':
+                    wcs_axes = 'polarization_spatial_spectral_temporal'
+                elif suffix == 'o':
+                    wcs_axes = 'spatial_temporal'
+                else:
+                    wcs_axes = 'spatial_spectral_temporal'
+            else:
+                wcs_axes = 'spatial_temporal'
+    return f'{obs_cardinality}_{wcs_axes}'
+
+
+def classify_file_names(file_names, instrument):
+    """The APEROName naming values for many file names at once, e.g. for re-ingest planning, without constructing an
+    APEROName for each.
+
+    Names are de-duplicated with numpy.unique, each unique name is classified once, and the result columns are
+    gathered back into input order with the inverse index.
+
+    :param file_names: sequence, numpy array, or pyarrow Array/ChunkedArray of str file names, URIs, or
+        fully-qualified names
+    :param instrument: str instrument value, as configured
+    :return: dict of column name: numpy object array, with columns file_id, obs_id, suffix, product_id, and
+        blueprint_name, in the same order as file_names
+    """
+    if hasattr(file_names, 'to_pylist'):
+        # pyarrow, without requiring it
+        file_names = file_names.to_pylist()
+    names = np.asarray(file_names, dtype=str)
+    columns = ['file_id', 'suffix', 'obs_id', 'product_id', 'blueprint_name']
+    if names.size == 0:
+        return {key: np.empty(0, dtype=object) for key in columns}
+    # the StorageName file_name is the last path element
+    names = np.char.rpartition(names, '/')[..., 2]
+    unique_names, inverse = np.unique(names, return_inverse=True)
+    parsed = np.empty((len(unique_names), len(columns)), dtype=object)
+    for row, entry in enumerate(unique_names):
+        parsed[row] = parse_apero_name(str(entry), instrument)[:len(columns)]
+    return {key: parsed[:, index][inverse.reshape(-1)] for index, key in enumerate(columns)}
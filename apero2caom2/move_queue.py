@@ -0,0 +1,248 @@
+# ***********************************************************************
+# ******************  CANADIAN ASTRONOMY DATA CENTRE  *******************
+# *************  CENTRE CANADIEN DE DONNÉES ASTRONOMIQUES  **************
+#
+#  (c) 2026.                            (c) 2026.
+#  Government of Canada                 Gouvernement du Canada
+#  National Research Council            Conseil national de recherches
+#  Ottawa, Canada, K1A 0R6              Ottawa, Canada, K1A 0R6
+#  All rights reserved                  Tous droits réservés
+#
+#  NRC disclaims any warranties,        Le CNRC dénie toute garantie
+#  expressed, implied, or               énoncée, implicite ou légale,
+#  statutory, of any kind with          de quelque nature que ce
+#  respect to the software,             soit, concernant le logiciel,
+#  including without limitation         y compris sans restriction
+#  any warranty of merchantability      toute garantie de valeur
+#  or fitness for a particular          marchande ou de pertinence
+#  purpose. NRC shall not be            pour un usage particulier.
+#  liable in any event for any          Le CNRC ne pourra en aucun cas
+#  damages, whether direct or           être tenu responsable de tout
+#  indirect, special or general,        dommage, direct ou indirect,
+#  consequential or incidental,         particulier ou général,
+#  arising from the use of the          accessoire ou fortuit, résultant
+#  software.  Neither the name          de l'utilisation du logiciel. Ni
+#  of the National Research             le nom du Conseil National de
+#  Council of Canada nor the            Recherches du Canada ni les noms
+#  names of its contributors may        de ses  participants ne peuvent
+#  be used to endorse or promote        être utilisés pour approuver ou
+#  products derived from this           promouvoir les produits dérivés
+#  software without specific prior      de ce logiciel sans autorisation
+#  written permission.                  préalable et particulière
+#                                       par écrit.
+#
+#  This file is part of the             Ce fichier fait partie du projet
+#  OpenCADC project.                    OpenCADC.
+#
+#  OpenCADC is free software:           OpenCADC est un logiciel libre ;
+#  you can redistribute it and/or       vous pouvez le redistribuer ou le
+#  modify it under the terms of         modifier suivant les termes de
+#  the GNU Affero General Public        la “GNU Affero General Public
+#  License as published by the          License” telle que publiée
+#  Free Software Foundation,            par la Free Software Foundation
+#  either version 3 of the              : soit la version 3 de cette
+#  License, or (at your option)         licence, soit (à votre gré)
+#  any later version.                   toute version ultérieure.
+#
+#  OpenCADC is distributed in the       OpenCADC est distribué
+#  hope that it will be useful,         dans l’espoir qu’il vous
+#  but WITHOUT ANY WARRANTY;            sera utile, mais SANS AUCUNE
+#  without even the implied             GARANTIE : sans même la garantie
+#  warranty of MERCHANTABILITY          implicite de COMMERCIALISABILITÉ
+#  or FITNESS FOR A PARTICULAR          ni d’ADÉQUATION À UN OBJECTIF
+#  PURPOSE.  See the GNU Affero         PARTICULIER. Consultez la Licence
+#  General Public License for           Générale Publique GNU Affero
+#  more details.                        pour plus de détails.
+#
+#  You should have received             Vous devriez avoir reçu une
+#  a copy of the GNU Affero             copie de la Licence Générale
+#  General Public License along         Publique GNU Affero avec
+#  with OpenCADC.  If not, see          OpenCADC ; si ce n’est
+#  <http://www.gnu.org/licenses/>.      pas le cas, consultez :
+#                                       <http://www.gnu.org/licenses/>.
+#
+#  $Revision: 4 $
+#
+# ***********************************************************************
+#
+
+"""
+Move files to the success and failure directories on a background thread, so that slow file systems do not hold up
+work discovery and ingestion.
+
+Every requested move is recorded in a journal before it is queued, and marked as done after it happens, so moves that
+were requested, but not done, when an application stops, are done on the next start. The journal is re-written with
+only the outstanding moves on start, and after every COMPACT_RECORDS records, so it does not grow for the life of a
+long-running application, and a queue that drains often does not re-write it each time.
+"""
+
+import logging
+import os
+import threading
+
+from collections import OrderedDict
+
+
+__all__ = ['MoveQueue']
+
+
+class MoveQueue:
+    """A journalled queue of file moves, done by a single worker thread.
+
+    The worker takes everything that is queued at once, and does the moves grouped by destination directory. The
+    move itself is delegated to move_function, which is expected to rename the file when the source and destination
+    are on the same file system.
+    """
+
+    MOVE = 'M'
+    DONE = 'D'
+    COMPACT_RECORDS = 10000
+
+    def __init__(self, journal_fqn, move_function, compact_records=COMPACT_RECORDS):
+        """
+        :param journal_fqn: str fully-qualified name of the journal file
+        :param move_function: callable(fqn, destination) that moves one file
+        :param compact_records: int number of records written to the journal between compactions
+        """
+        self._journal_fqn = journal_fqn
+        self._move_function = move_function
+        self._compact_records = compact_records
+        self._logger = logging.getLogger(self.__class__.__name__)
+        self._condition = threading.Condition()
+        self._pending = OrderedDict()
+        self._in_progress = 0
+        self._closed = False
+        self._moved = 0
+        self._failed = 0
+        self._journal = None
+        self._records = 0
+        recovered = self._replay()
+        # the moves that are in the journal, and not marked as done - queued, in progress, or failed
+        self._outstanding = OrderedDict(recovered)
+        self._compact()
+        self._pending.update(recovered)
+        if len(recovered) > 0:
+            self._logger.info(f'Recovered {len(recovered)} outstanding moves from {self._journal_fqn}.')
+        self._worker = threading.Thread(target=self._run, name='MoveQueue', daemon=True)
+        self._worker.start()
+
+    @property
+    def failed(self):
+        return self._failed
+
+    @property
+    def moved(self):
+        return self._moved
+
+    @staticmethod
+    def _record(action, fqn, destination=''):
+        return f'{action}\t{fqn}\t{destination}\n'
+
+    def _replay(self):
+        """
+        :return: OrderedDict of fqn: destination for the moves in the journal that are not marked as done, and for
+            which the file is still in place
+        """
+        result = OrderedDict()
+        if os.path.exists(self._journal_fqn):
+            with open(self._journal_fqn) as f:
+                for line in f:
+                    if not line.endswith('\n'):
+                        # a record that was being written when the application stopped
+                        continue
+                    action, fqn, destination = line.rstrip('\n').split('\t')
+                    if action == MoveQueue.MOVE:
+                        result[fqn] = destination
+                    else:
+                        result.pop(fqn, None)
+        for fqn in list(result.keys()):
+            if not os.path.exists(fqn):
+                result.pop(fqn)
+        return result
+
+    def _compact(self):
+        """Re-write the journal with only the outstanding moves. The new journal replaces the old one atomically, so
+        an application that stops part-way through a compaction recovers from one or the other.
+
+        Called with the condition held, or before the worker starts.
+        """
+        temp_fqn = f'{self._journal_fqn}.tmp'
+        with open(temp_fqn, 'w') as f:
+            for fqn, destination in self._outstanding.items():
+                f.write(self._record(MoveQueue.MOVE, fqn, destination))
+            f.flush()
+            os.fsync(f.fileno())
+        if self._journal is not None:
+            self._journal.close()
+        os.replace(temp_fqn, self._journal_fqn)
+        self._journal = open(self._journal_fqn, 'a')
+        self._records = len(self._outstanding)
+
+    def _write(self, record):
+        self._journal.write(record)
+        self._journal.flush()
+        os.fsync(self._journal.fileno())
+        self._records += 1
+        if self._records >= self._compact_records + len(self._outstanding):
+            self._compact()
+
+    def put(self, fqn, destination):
+        """Queue a move. The move is in the journal when this returns.
+
+        :param fqn: str fully-qualified name of the file to move
+        :param destination: str directory name to move it to
+        """
+        with self._condition:
+            if self._closed:
+                raise RuntimeError('put on a closed MoveQueue')
+            self._outstanding[fqn] = destination
+            self._write(self._record(MoveQueue.MOVE, fqn, destination))
+            self._pending[fqn] = destination
+            self._condition.notify_all()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while len(self._pending) == 0 and not self._closed:
+                    self._condition.wait()
+                if len(self._pending) == 0:
+                    return
+                batch = self._pending
+                self._pending = OrderedDict()
+                self._in_progress = len(batch)
+            by_destination = {}
+            for fqn, destination in batch.items():
+                by_destination.setdefault(destination, []).append(fqn)
+            for destination, fqns in by_destination.items():
+                self._logger.debug(f'Moving {len(fqns)} files to {destination}.')
+                for fqn in fqns:
+                    try:
+                        self._move_function(fqn, destination)
+                        with self._condition:
+                            self._outstanding.pop(fqn, None)
+                            self._write(self._record(MoveQueue.DONE, fqn))
+                        self._moved += 1
+                    except Exception as e:
+                        # leave the move in the journal, so it is tried again on the next start
+                        self._failed += 1
+                        self._logger.error(f'Failed to move {fqn} to {destination}: {e}')
+            with self._condition:
+                self._in_progress = 0
+                self._condition.notify_all()
+
+    def flush(self):
+        """Wait until every queued move has been tried."""
+        with self._condition:
+            while (len(self._pending) > 0 or self._in_progress > 0) and self._worker.is_alive():
+                self._condition.wait()
+
+    def close(self):
+        """Do every queued move, then stop the worker."""
+        with self._condition:
+            if self._closed:
+                return
+            self._closed = True
+            self._condition.notify_all()
+        self._worker.join()
+        self._journal.close()
+        self._logger.info(f'Moved {self._moved} files. {self._failed} moves failed.')
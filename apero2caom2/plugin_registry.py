@@ -0,0 +1,146 @@
+# ***********************************************************************
+# ******************  CANADIAN ASTRONOMY DATA CENTRE  *******************
+# *************  CENTRE CANADIEN DE DONNÉES ASTRONOMIQUES  **************
+#
+#  (c) 2026.                            (c) 2026.
+#  Government of Canada                 Gouvernement du Canada
+#  National Research Council            Conseil national de recherches
+#  Ottawa, Canada, K1A 0R6              Ottawa, Canada, K1A 0R6
+#  All rights reserved                  Tous droits réservés
+#
+#  NRC disclaims any warranties,        Le CNRC dénie toute garantie
+#  expressed, implied, or               énoncée, implicite ou légale,
+#  statutory, of any kind with          de quelque nature que ce
+#  respect to the software,             soit, concernant le logiciel,
+#  including without limitation         y compris sans restriction
+#  any warranty of merchantability      toute garantie de valeur
+#  or fitness for a particular          marchande ou de pertinence
+#  purpose. NRC shall not be            pour un usage particulier.
+#  liable in any event for any          Le CNRC ne pourra en aucun cas
+#  damages, whether direct or           être tenu responsable de tout
+#  indirect, special or general,        dommage, direct ou indirect,
+#  consequential or incidental,         particulier ou général,
+#  arising from the use of the          accessoire ou fortuit, résultant
+#  software.  Neither the name          de l'utilisation du logiciel. Ni
+#  of the National Research             le nom du Conseil National de
+#  Council of Canada nor the            Recherches du Canada ni les noms
+#  names of its contributors may        de ses  participants ne peuvent
+#  be used to endorse or promote        être utilisés pour approuver ou
+#  products derived from this           promouvoir les produits dérivés
+#  software without specific prior      de ce logiciel sans autorisation
+#  written permission.                  préalable et particulière
+#                                       par écrit.
+#
+#  This file is part of the             Ce fichier fait partie du projet
+#  OpenCADC project.                    OpenCADC.
+#
+#  OpenCADC is free software:           OpenCADC est un logiciel libre ;
+#  you can redistribute it and/or       vous pouvez le redistribuer ou le
+#  modify it under the terms of         modifier suivant les termes de
+#  the GNU Affero General Public        la “GNU Affero General Public
+#  License as published by the          License” telle que publiée
+#  Free Software Foundation,            par la Free Software Foundation
+#  either version 3 of the              : soit la version 3 de cette
+#  License, or (at your option)         licence, soit (à votre gré)
+#  any later version.                   toute version ultérieure.
+#
+#  OpenCADC is distributed in the       OpenCADC est distribué
+#  hope that it will be useful,         dans l’espoir qu’il vous
+#  but WITHOUT ANY WARRANTY;            sera utile, mais SANS AUCUNE
+#  without even the implied             GARANTIE : sans même la garantie
+#  warranty of MERCHANTABILITY          implicite de COMMERCIALISABILITÉ
+#  or FITNESS FOR A PARTICULAR          ni d’ADÉQUATION À UN OBJECTIF
+#  PURPOSE.  See the GNU Affero         PARTICULIER. Consultez la Licence
+#  General Public License for           Générale Publique GNU Affero
+#  more details.                        pour plus de détails.
+#
+#  You should have received             Vous devriez avoir reçu une
+#  a copy of the GNU Affero             copie de la Licence Générale
+#  General Public License along         Publique GNU Affero avec
+#  with OpenCADC.  If not, see          OpenCADC ; si ce n’est
+#  <http://www.gnu.org/licenses/>.      pas le cas, consultez :
+#                                       <http://www.gnu.org/licenses/>.
+#
+#  $Revision: 4 $
+#
+# ***********************************************************************
+#
+
+"""
+Load the blueprint plugin modules (e.g. spirou.py) once per process.
+
+The plugin is loaded from its file location, without adding its directory to sys.path, and without adding it to
+sys.modules, so plugins with the same module name, in different directories, do not collide. The update entry point is
+resolved when the module is loaded, and the module is loaded again only when the modification time of its file
+changes.
+"""
+
+import importlib.util
+import logging
+
+from collections import namedtuple
+from os import stat
+from os.path import basename
+
+
+__all__ = ['Plugin', 'PluginRegistry']
+
+
+# mtime is the st_mtime_ns of the file when the module was loaded. update_method_module is the object with the
+# update method, or None.
+Plugin = namedtuple('Plugin', 'mtime module update_method_module')
+
+
+class PluginRegistry:
+    """Plugin modules, by fully-qualified file name."""
+
+    def __init__(self):
+        self._plugins = {}
+        self._loads = 0
+        self._logger = logging.getLogger(self.__class__.__name__)
+
+    @property
+    def loads(self):
+        """The number of times a module file was loaded."""
+        return self._loads
+
+    def get(self, module_fqn):
+        """
+        :param module_fqn: str fully-qualified name of the plugin source file
+        :return: Plugin for module_fqn. The module and update_method_module are None if the file cannot be imported.
+        """
+        try:
+            mtime = stat(module_fqn).st_mtime_ns
+        except FileNotFoundError:
+            mtime = None
+        result = self._plugins.get(module_fqn)
+        if result is None or result.mtime != mtime:
+            result = self._load(module_fqn, mtime)
+            self._plugins[module_fqn] = result
+        return result
+
+    def _load(self, module_fqn, mtime):
+        mname = basename(module_fqn)
+        if '.' in mname:
+            # remove extension from the provided name
+            mname = mname.split('.')[0]
+        module = None
+        update_method_module = None
+        if mtime is None:
+            self._logger.warning(f'Could not find module {mname!r} at {module_fqn!r}')
+        else:
+            try:
+                spec = importlib.util.spec_from_file_location(mname, module_fqn)
+                module = importlib.util.module_from_spec(spec)
+                spec.loader.exec_module(module)
+                self._loads += 1
+                self._logger.debug(f'Loaded module {mname!r} from {module_fqn!r}')
+            except ImportError as e:
+                self._logger.warning(f'Could not import module {mname!r} from {module_fqn!r}: {e}')
+                module = None
+        if hasattr(module, 'update'):
+            update_method_module = module
+        elif hasattr(module, 'ObservationUpdater'):
+            # for backwards compatibility with caom2repo
+            update_method_module = getattr(module, 'ObservationUpdater')()
+        return Plugin(mtime, module, update_method_module)
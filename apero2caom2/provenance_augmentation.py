@@ -67,14 +67,14 @@
 #
 
 import logging
-
-from astropy.io import fits
+import numpy as np
 
 from caom2 import Proposal, SimpleObservation
 from caom2pipe.caom_composable import make_plane_uri
 from caom2pipe.client_composable import query_tap_client
 from caom2pipe.manage_composable import CadcException, make_datetime, search_for_file
-from apero2caom2.cfht_name import CFHTName
+from apero2caom2.cfht_name import resolve_prefixes
+from apero2caom2.header_cache import get_header_cache
 
 
 __all__ = ['APEROFits2caom2Visitor']
@@ -132,19 +132,11 @@ class APEROProvenanceVisitor:
             if 'fits' in source_name:
                 fqn = search_for_file(self.storage_name, self.config.working_directory).replace('.header', '')
                 self.logger.debug(f'Begin visit for {fqn}')
-                hdus = fits.open(fqn)
-                for hdu in hdus:
-                    if 'PI_NAME' in hdu.header.keys():
-                        pi_name = hdu.header.get('PI_NAME')
-
-                temp1 = self.find_file_names(hdus, 'TEMPLATE_TABLE', ['Filename', 'DARKFILE'])
-                temp2 = self.find_file_names(hdus, 'RDB', ['FILENAME'])
-                f_name_prefixes = list(set(temp1 + temp2))
+                pi_name, prefixes = self._read_provenance(fqn)
+                # obs_id and product_id are all that's needed from the names, so don't build a CFHTName for each
+                f_name_prefixes = resolve_prefixes(prefixes)
                 self.logger.info(f'Found {len(f_name_prefixes)} provenance entries in {fqn}.')
-                for f_name_prefix in f_name_prefixes:
-                    temp_storage_name = CFHTName(
-                        instrument=self.storage_name.instrument, source_names=[f_name_prefix]
-                    )
+                for temp_storage_name in f_name_prefixes.values():
                     obs_member_uri, prov_plane_uri = make_plane_uri(
                         temp_storage_name.obs_id, temp_storage_name.product_id, self.config.collection
                     )
@@ -226,17 +218,64 @@ class APEROProvenanceVisitor:
                 self.observation.proposal = Proposal(id=temp_proposal_id, pi_name=pi_name)
         return self.observation
 
+    def _read_provenance(self, fqn):
+        """
+        :param fqn: str fully-qualified name of the FITS file
+        :return: tuple of the PI_NAME value, and the list of CFHT file name prefixes from the TEMPLATE_TABLE and RDB
+            extensions
+        """
+        header_cache = get_header_cache(self.config)
+        file_info = self.storage_name.file_info.get(self.storage_name.file_uri)
+        md5sum = file_info.md5sum if file_info is not None else None
+        if header_cache is not None:
+            result = header_cache.get(md5sum, 'provenance')
+            if result is not None:
+                return result
 
-    def find_file_names(self, hdus, hdu_key, column_keys):
-        temp = []
-        if hdu_key in hdus:
-            provenance = hdus[hdu_key].data
+        # the headers come from StorageName.metadata, and the file is only opened for the table columns. It is opened
+        # once for all the source names of the unit of work, and closed by the data source clean up
+        fits_access = self.storage_name.fits_access(self.storage_name.file_uri, fqn)
+        pi_name = None
+        for header in fits_access.headers:
+            if 'PI_NAME' in header.keys():
+                pi_name = header.get('PI_NAME')
+
+        columns = self.find_file_names(fits_access, 'TEMPLATE_TABLE', ['Filename', 'DARKFILE'])
+        columns += self.find_file_names(fits_access, 'RDB', ['FILENAME'])
+        result = (pi_name, unique_prefixes(columns))
+        if header_cache is not None:
+            header_cache.put(md5sum, result, 'provenance')
+        return result
 
+    def find_file_names(self, fits_access, hdu_key, column_keys):
+        """
+        :param fits_access: FitsAccess for the file
+        :param hdu_key: str EXTNAME of the table HDU
+        :param column_keys: list of str column names
+        :return: list of the memory-mapped file name columns, without reading the other columns of the table
+        """
+        temp = []
+        if fits_access.has_hdu(hdu_key):
             for column in column_keys:
-                for f_name in provenance[column]:
-                    temp.append(f_name.split('_')[0])
+                temp.append(fits_access.column(hdu_key, column))
         return temp
 
 
+def unique_prefixes(columns):
+    """
+    :param columns: list of file name arrays
+    :return: list of the distinct CFHT file name prefixes (the text before the first '_') in the columns, in the order
+        they first occur
+    """
+    if len(columns) == 0:
+        return []
+    file_names = np.concatenate([np.asarray(column) for column in columns])
+    if file_names.dtype.kind == 'S':
+        file_names = np.char.decode(file_names, 'ascii')
+    prefixes = np.char.partition(file_names, '_')[:, 0]
+    unique, first_index = np.unique(prefixes, return_index=True)
+    return unique[np.argsort(first_index)].tolist()
+
+
 def visit(observation, **kwargs):
     return APEROProvenanceVisitor(observation, **kwargs).visit()
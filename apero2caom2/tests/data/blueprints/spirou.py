@@ -68,6 +68,7 @@
 
 import logging
 
+from functools import lru_cache
 from caom2 import Chunk, DerivedObservation, Part, ProductType, SimpleObservation
 from caom2utils.caom2blueprint import update_artifact_meta
 from caom2utils.wcs_parsers import FitsWcsParser
@@ -75,6 +76,13 @@ from caom2pipe.astro_composable import build_ra_dec_as_deg
 from caom2pipe.manage_composable import to_float, to_int
 
 
+@lru_cache(maxsize=1024)
+def _build_ra_dec(objra, objdec):
+    """The Observation-level and the Chunk-level blueprint values use the same OBJRA and OBJDEC, so the SkyCoord
+    parsing is done once for each pair of values. The cache holds only the header values, not the headers."""
+    return build_ra_dec_as_deg(objra, objdec, frame='fk5')
+
+
 def _get_algorithm_name(parameter):
     """
     We would like to propose to use the static algorithm name as follow:
@@ -159,7 +167,7 @@ def _get_spatial(parameter):
     objra = header.get('OBJRA')
     objdec = header.get('OBJDEC')
     if objra and objdec:
-        ra, dec = build_ra_dec_as_deg(objra, objdec, frame='fk5')
+        ra, dec = _build_ra_dec(objra, objdec)
     else:
         ra = header.get('PP_RA')
         dec = header.get('PP_DEC')
@@ -233,6 +241,8 @@ def _update_artifact_rename_parts(artifact, headers, observation):
     SCIENCE_PARTS = ['TELLU_TEMP_S1DW', 'TELLU_TEMP_S1DV', 'TELLU_TEMP']
     new_parts = []
     old_parts = []
+    # the primary header WCS is the same for every science Part
+    wcs_parser = None
     for part in artifact.parts.values():
         try:
             idx = to_int(part.name)
@@ -274,8 +284,8 @@ def _update_artifact_rename_parts(artifact, headers, observation):
         if new_part.name in SCIENCE_PARTS:
             logging.info(f'Adding Chunk to {new_part.name} Part')
             primary_chunk = Chunk()
-            primary_header = headers[0]
-            wcs_parser = FitsWcsParser(primary_header, observation.observation_id, 0)
+            if wcs_parser is None:
+                wcs_parser = FitsWcsParser(headers[0], observation.observation_id, 0)
             wcs_parser.augment_temporal(primary_chunk)
             wcs_parser.augment_position(primary_chunk)
             primary_chunk.position_axis_1 = None
@@ -0,0 +1,154 @@
+# ***********************************************************************
+# ******************  CANADIAN ASTRONOMY DATA CENTRE  *******************
+# *************  CENTRE CANADIEN DE DONNÉES ASTRONOMIQUES  **************
+#
+#  (c) 2026.                            (c) 2026.
+#  Government of Canada                 Gouvernement du Canada
+#  National Research Council            Conseil national de recherches
+#  Ottawa, Canada, K1A 0R6              Ottawa, Canada, K1A 0R6
+#  All rights reserved                  Tous droits réservés
+#
+#  NRC disclaims any warranties,        Le CNRC dénie toute garantie
+#  expressed, implied, or               énoncée, implicite ou légale,
+#  statutory, of any kind with          de quelque nature que ce
+#  respect to the software,             soit, concernant le logiciel,
+#  including without limitation         y compris sans restriction
+#  any warranty of merchantability      toute garantie de valeur
+#  or fitness for a particular          marchande ou de pertinence
+#  purpose. NRC shall not be            pour un usage particulier.
+#  liable in any event for any          Le CNRC ne pourra en aucun cas
+#  damages, whether direct or           être tenu responsable de tout
+#  indirect, special or general,        dommage, direct ou indirect,
+#  consequential or incidental,         particulier ou général,
+#  arising from the use of the          accessoire ou fortuit, résultant
+#  software.  Neither the name          de l'utilisation du logiciel. Ni
+#  of the National Research             le nom du Conseil National de
+#  Council of Canada nor the            Recherches du Canada ni les noms
+#  names of its contributors may        de ses  participants ne peuvent
+#  be used to endorse or promote        être utilisés pour approuver ou
+#  products derived from this           promouvoir les produits dérivés
+#  software without specific prior      de ce logiciel sans autorisation
+#  written permission.                  préalable et particulière
+#                                       par écrit.
+#
+#  This file is part of the             Ce fichier fait partie du projet
+#  OpenCADC project.                    OpenCADC.
+#
+#  OpenCADC is free software:           OpenCADC est un logiciel libre ;
+#  you can redistribute it and/or       vous pouvez le redistribuer ou le
+#  modify it under the terms of         modifier suivant les termes de
+#  the GNU Affero General Public        la “GNU Affero General Public
+#  License as published by the          License” telle que publiée
+#  Free Software Foundation,            par la Free Software Foundation
+#  either version 3 of the              : soit la version 3 de cette
+#  License, or (at your option)         licence, soit (à votre gré)
+#  any later version.                   toute version ultérieure.
+#
+#  OpenCADC is distributed in the       OpenCADC est distribué
+#  hope that it will be useful,         dans l’espoir qu’il vous
+#  but WITHOUT ANY WARRANTY;            sera utile, mais SANS AUCUNE
+#  without even the implied             GARANTIE : sans même la garantie
+#  warranty of MERCHANTABILITY          implicite de COMMERCIALISABILITÉ
+#  or FITNESS FOR A PARTICULAR          ni d’ADÉQUATION À UN OBJECTIF
+#  PURPOSE.  See the GNU Affero         PARTICULIER. Consultez la Licence
+#  General Public License for           Générale Publique GNU Affero
+#  more details.                        pour plus de détails.
+#
+#  You should have received             Vous devriez avoir reçu une
+#  a copy of the GNU Affero             copie de la Licence Générale
+#  General Public License along         Publique GNU Affero avec
+#  with OpenCADC.  If not, see          OpenCADC ; si ce n’est
+#  <http://www.gnu.org/licenses/>.      pas le cas, consultez :
+#                                       <http://www.gnu.org/licenses/>.
+#
+#  $Revision: 4 $
+#
+# ***********************************************************************
+#
+
+import logging
+import os
+import shutil
+import types
+
+from caom2utils.blueprints import ObsBlueprint
+
+from apero2caom2.blueprint_cache import BlueprintCache, BlueprintPlan
+
+
+def test_blueprint_cache(test_data_dir, tmp_path):
+    bp_fqn = f'{tmp_path}/spirou_simple_spatial_temporal.bp'
+    shutil.copy(f'{test_data_dir}/blueprints/spirou_simple_spatial_temporal.bp', bp_fqn)
+    module_fqn = f'{test_data_dir}/blueprints/spirou.py'
+    test_subject = BlueprintCache()
+    first = test_subject.get(bp_fqn, module_fqn, None)
+    second = test_subject.get(bp_fqn, module_fqn, None)
+    assert test_subject.misses == 1, 'one load'
+    assert test_subject.hits == 1, 'one hit'
+    assert first is not second, 'each use gets its own blueprint'
+    assert first._plan == second._plan, 'same content'
+
+    # a change to one copy is not seen by the others
+    first.set('Observation.intent', 'calibration')
+    assert first._get('Observation.intent') == 'calibration', 'changed copy'
+    assert test_subject.get(bp_fqn, module_fqn, None)._get('Observation.intent') != 'calibration', 'template unchanged'
+
+    # a different plugin module, or a newer blueprint file, means a new load
+    reloaded = types.ModuleType('spirou')
+    test_subject.get(bp_fqn, module_fqn, reloaded)
+    assert test_subject.misses == 2, 'plugin module change'
+    stat_result = os.stat(bp_fqn)
+    os.utime(bp_fqn, ns=(stat_result.st_atime_ns, stat_result.st_mtime_ns + 1000000000))
+    test_subject.get(bp_fqn, module_fqn, reloaded)
+    assert test_subject.misses == 3, 'blueprint file change'
+    test_subject.get(bp_fqn, module_fqn, reloaded)
+    assert test_subject.hits == 3, 'cached again'
+
+
+def test_blueprint_plan(test_data_dir):
+    template = ObsBlueprint()
+    template.load_from_file(f'{test_data_dir}/blueprints/spirou_simple_spatial_temporal.bp')
+    original = ObsBlueprint()
+    original.load_from_file(f'{test_data_dir}/blueprints/spirou_simple_spatial_temporal.bp')
+    test_subject = BlueprintPlan(template)
+
+    first = test_subject.instantiate()
+    assert first is not template, 'copy'
+    assert first._plan == template._plan, 'same plan'
+    assert first._extensions == template._extensions, 'same extensions'
+    # the changes a parser makes are not seen by the template, or by the other copies
+    first.set('Observation.target.name', 'GL699')
+    first.set('Observation.telescope.name', 'other')
+    first._plan['Observation.instrument.name'][0].append('DETECTOR')
+    second = test_subject.instantiate()
+    assert second._plan == original._plan, 'template unchanged'
+    assert template._plan == original._plan, 'template unchanged, directly'
+
+
+def test_blueprint_plan_functions(test_data_dir, caplog):
+    bp_fqn = f'{test_data_dir}/blueprints/spirou_simple_spatial_temporal.bp'
+    plugin = types.ModuleType('spirou')
+    names = set()
+    with open(bp_fqn) as f:
+        for line in f:
+            if '=' in line and ObsBlueprint.is_function(line.split('=', 1)[1].strip()):
+                names.add(line.split('=', 1)[1].strip().split('(')[0])
+    assert '_get_time_function_delta' in names, 'test blueprint has the function'
+    for name in names - {'_get_time_function_delta'}:
+        setattr(plugin, name, lambda header: None)
+
+    test_subject = BlueprintCache()
+    with caplog.at_level(logging.WARNING):
+        test_subject.get(bp_fqn, 'spirou.py', plugin)
+        test_subject.get(bp_fqn, 'spirou.py', plugin)
+    warnings = [record.getMessage() for record in caplog.records if '_get_time_function_delta' in record.getMessage()]
+    assert len(warnings) == 1, 'reported once, when the blueprint is loaded'
+    assert 'Chunk.time.axis.function.delta' in warnings[0], 'blueprint key'
+
+    plan = test_subject._templates[(bp_fqn, 'spirou.py')][2]
+    assert plan.missing_functions == {
+        (None, 'Chunk.time.axis.function.delta'): '_get_time_function_delta(header)'
+    }, 'missing'
+    assert len(plan.functions) == len(names) - 1, 'resolved'
+    assert all(callable(function) for function in plan.functions.values()), 'functions'
+    assert len(plan.look_ups) > 0 and len(plan.constants) > 0, 'sorted'
@@ -69,6 +69,7 @@
 import glob
 import logging
 import os
+import pytest
 
 from mock import Mock, patch
 
@@ -76,7 +77,8 @@ from astropy.table import Table
 from apero2caom2 import file2caom2_augmentation, main_app, provenance_augmentation
 from caom2.diff import get_differences
 from caom2pipe.manage_composable import ExecutionReporter2, read_obs_from_file, write_obs_to_file
-from apero2caom2.main_app import set_storage_name_from_local_preconditions
+from apero2caom2.main_app import set_storage_name_from_config
+from apero2caom2.validation import validate_observation
 
 
 def pytest_generate_tests(metafunc):
@@ -84,8 +86,10 @@ def pytest_generate_tests(metafunc):
     metafunc.parametrize('test_name', obs_id_list)
 
 
+# the observations are the same when only the header cards used by the blueprints and the plugin are kept
+@pytest.mark.parametrize('keyword_projection', [False, True])
 @patch('apero2caom2.provenance_augmentation.query_tap_client')
-def test_main_app(query_mock, test_name, test_config, test_data_dir, tmp_path, change_test_dir):
+def test_main_app(query_mock, keyword_projection, test_name, test_config, test_data_dir, tmp_path, change_test_dir):
     logger = logging.getLogger()
     logger.setLevel(logging.INFO)
 
@@ -93,6 +97,7 @@ def test_main_app(query_mock, test_name, test_config, test_data_dir, tmp_path, c
     test_config.change_working_directory(tmp_path.as_posix())
     test_config.dump_blueprint = True
     test_config.lookup['blueprint_directory'] = f'{test_data_dir}/blueprints'
+    test_config.lookup['keyword_projection'] = keyword_projection
 
     replace_str = '.expected.xml'
     in_fqn = test_name.replace(replace_str, '.in.xml')
@@ -111,7 +116,7 @@ def test_main_app(query_mock, test_name, test_config, test_data_dir, tmp_path, c
         instrument=test_config.lookup.get('instrument'), source_names=[test_file_name.replace('.header', '')]
     )
     storage_name._source_names = [test_file_name]
-    set_storage_name_from_local_preconditions(storage_name, test_config.working_directory, logger)
+    set_storage_name_from_config(storage_name, test_config, logger)
     test_reporter = ExecutionReporter2(test_config)
     kwargs = {
         'storage_name': storage_name,
@@ -121,6 +126,7 @@ def test_main_app(query_mock, test_name, test_config, test_data_dir, tmp_path, c
     }
     observation = file2caom2_augmentation.visit(observation, **kwargs)
     observation = provenance_augmentation.visit(observation, **kwargs)
+    validate_observation(observation)
 
     if observation is None:
         assert False, f'Did not create observation for {test_name}'
@@ -0,0 +1,331 @@
+# ***********************************************************************
+# ******************  CANADIAN ASTRONOMY DATA CENTRE  *******************
+# *************  CENTRE CANADIEN DE DONNÉES ASTRONOMIQUES  **************
+#
+#  (c) 2026.                            (c) 2026.
+#  Government of Canada                 Gouvernement du Canada
+#  National Research Council            Conseil national de recherches
+#  Ottawa, Canada, K1A 0R6              Ottawa, Canada, K1A 0R6
+#  All rights reserved                  Tous droits réservés
+#
+#  NRC disclaims any warranties,        Le CNRC dénie toute garantie
+#  expressed, implied, or               énoncée, implicite ou légale,
+#  statutory, of any kind with          de quelque nature que ce
+#  respect to the software,             soit, concernant le logiciel,
+#  including without limitation         y compris sans restriction
+#  any warranty of merchantability      toute garantie de valeur
+#  or fitness for a particular          marchande ou de pertinence
+#  purpose. NRC shall not be            pour un usage particulier.
+#  liable in any event for any          Le CNRC ne pourra en aucun cas
+#  damages, whether direct or           être tenu responsable de tout
+#  indirect, special or general,        dommage, direct ou indirect,
+#  consequential or incidental,         particulier ou général,
+#  arising from the use of the          accessoire ou fortuit, résultant
+#  software.  Neither the name          de l'utilisation du logiciel. Ni
+#  of the National Research             le nom du Conseil National de
+#  Council of Canada nor the            Recherches du Canada ni les noms
+#  names of its contributors may        de ses  participants ne peuvent
+#  be used to endorse or promote        être utilisés pour approuver ou
+#  products derived from this           promouvoir les produits dérivés
+#  software without specific prior      de ce logiciel sans autorisation
+#  written permission.                  préalable et particulière
+#                                       par écrit.
+#
+#  This file is part of the             Ce fichier fait partie du projet
+#  OpenCADC project.                    OpenCADC.
+#
+#  OpenCADC is free software:           OpenCADC est un logiciel libre ;
+#  you can redistribute it and/or       vous pouvez le redistribuer ou le
+#  modify it under the terms of         modifier suivant les termes de
+#  the GNU Affero General Public        la “GNU Affero General Public
+#  License as published by the          License” telle que publiée
+#  Free Software Foundation,            par la Free Software Foundation
+#  either version 3 of the              : soit la version 3 de cette
+#  License, or (at your option)         licence, soit (à votre gré)
+#  any later version.                   toute version ultérieure.
+#
+#  OpenCADC is distributed in the       OpenCADC est distribué
+#  hope that it will be useful,         dans l’espoir qu’il vous
+#  but WITHOUT ANY WARRANTY;            sera utile, mais SANS AUCUNE
+#  without even the implied             GARANTIE : sans même la garantie
+#  warranty of MERCHANTABILITY          implicite de COMMERCIALISABILITÉ
+#  or FITNESS FOR A PARTICULAR          ni d’ADÉQUATION À UN OBJECTIF
+#  PURPOSE.  See the GNU Affero         PARTICULIER. Consultez la Licence
+#  General Public License for           Générale Publique GNU Affero
+#  more details.                        pour plus de détails.
+#
+#  You should have received             Vous devriez avoir reçu une
+#  a copy of the GNU Affero             copie de la Licence Générale
+#  General Public License along         Publique GNU Affero avec
+#  with OpenCADC.  If not, see          OpenCADC ; si ce n’est
+#  <http://www.gnu.org/licenses/>.      pas le cas, consultez :
+#                                       <http://www.gnu.org/licenses/>.
+#
+#  $Revision: 4 $
+#
+# ***********************************************************************
+#
+
+import os
+import re
+import yaml
+
+from collections import deque
+
+from mock import Mock, patch
+
+from apero2caom2 import data_source, file_state
+from apero2caom2.main_app import APEROObservationGroup
+
+
+class FakeStorageInventoryTap:
+    """Stands in for the luskan TAP service, by answering uri IN (...) queries from a dict."""
+
+    def __init__(self, content):
+        self.content = content
+        self.queries = []
+
+    def query(self, query_string, _):
+        self.queries.append(query_string)
+        uris = re.findall(r"'([^']*)'", query_string.split(' IN ')[1])
+        return [{'uri': uri, 'contentChecksum': self.content[uri]} for uri in uris if uri in self.content]
+
+
+def test_query_remote_md5sums():
+    test_uris = [f'cadc:APERO/SPIRou/APERO_v0.7_SPIROU_{ii}e.fits' for ii in range(2510300, 2510307)]
+    test_tap = FakeStorageInventoryTap({test_uris[0]: 'md5:abc', test_uris[5]: 'md5:def'})
+    with patch('apero2caom2.data_source.query_tap_client', side_effect=test_tap.query):
+        test_result = data_source.query_remote_md5sums(test_uris, Mock(), chunk_size=3)
+    assert len(test_tap.queries) == 3, 'one query per chunk'
+    assert test_result == {test_uris[0]: 'abc', test_uris[5]: 'def'}, 'md5sums'
+
+
+@patch('apero2caom2.data_source.subprocess.run')
+def test_fitsverify_batch(run_mock):
+    test_fqns = ['/data/a/APERO_v0.7_SPIROU_2510301e.fits', '/data/a/APERO_v0.7_SPIROU_2510301p.fits']
+    run_mock.return_value.stdout = (
+        f'verification OK: {test_fqns[0]}\n'
+        f'verification FAILED: {test_fqns[1]}, 0 warnings and 1 errors\n'
+    )
+    test_result = data_source.fitsverify_batch(test_fqns)
+    assert run_mock.call_args.args[0] == ['fitsverify', '-q', '-e'] + test_fqns, 'one invocation'
+    assert test_result == {test_fqns[0]: True}, 'only OK files'
+
+    run_mock.side_effect = FileNotFoundError('fitsverify')
+    assert data_source.fitsverify_batch(test_fqns) == {}, 'missing executable'
+
+
+def test_todo_file_work(tmp_path):
+    test_fqn = f'{tmp_path}/todo.txt'
+    with open(test_fqn, 'w') as f:
+        f.write(
+            'APERO_v0.7_SPIROU_2510301e.fits\n'
+            '\n'
+            'APERO_v0.7_SPIROU_2510301p.fits\n'
+            '  APERO_v0.7_SPIROU_2510301e.fits  \n'
+            'APERO_v0.7_SPIROU_2510301s.fits'
+        )
+    test_ctor = Mock(side_effect=lambda entry: entry.upper())
+    test_subject = data_source.TodoFileWork(test_fqn, test_ctor)
+    assert len(test_subject) == 3, 'unique, non-empty entries'
+    assert not test_ctor.called, 'nothing built before it is needed'
+    assert test_subject.popleft() == 'APERO_V0.7_SPIROU_2510301E.FITS', 'first entry'
+    assert test_ctor.call_count == 1, 'built just in time'
+    test_subject.append('retry')
+    assert list(test_subject) == ['APERO_V0.7_SPIROU_2510301P.FITS', 'APERO_V0.7_SPIROU_2510301S.FITS', 'retry']
+    assert len(test_subject) == 0 and not test_subject, 'empty'
+
+    # lines with the same digest are compared, so a collision does not drop an entry
+    with patch('apero2caom2.data_source.blake2b') as digest_mock:
+        digest_mock.return_value.digest.return_value = b'collides'
+        test_subject = data_source.TodoFileWork(test_fqn, test_ctor)
+    assert len(test_subject) == 3, 'unique entries, when every digest is the same'
+
+
+def test_windowed_work_locality(test_config):
+    instrument = test_config.lookup.get('instrument')
+    test_names = [
+        'APERO_v0.7_SPIROU_lbl_GL699_GL699.rdb',
+        'APERO_v0.7_SPIROU_2510301e.fits',
+        'APERO_v0.7_SPIROU_Template_s1dw_GL699_sc1d_w_file_AB.fits',
+        'APERO_v0.7_SPIROU_2426458p.fits',
+        'APERO_v0.7_SPIROU_2510301p.fits',
+        'APERO_v0.7_SPIROU_2426458e.fits',
+    ]
+    test_work = deque([data_source.APEROName(instrument, [entry]) for entry in test_names])
+    test_subject = data_source.WindowedWork(test_work, data_source.locality_key, window=4)
+    assert len(test_subject) == 6, 'length before'
+    test_result = [entry.file_name for entry in test_subject]
+    assert test_result == [
+        # the first window of 4, sorted
+        'APERO_v0.7_SPIROU_2426458p.fits',
+        'APERO_v0.7_SPIROU_2510301e.fits',
+        'APERO_v0.7_SPIROU_Template_s1dw_GL699_sc1d_w_file_AB.fits',
+        'APERO_v0.7_SPIROU_lbl_GL699_GL699.rdb',
+        # the remainder
+        'APERO_v0.7_SPIROU_2426458e.fits',
+        'APERO_v0.7_SPIROU_2510301p.fits',
+    ], 'wrong order'
+    assert len(test_subject) == 0, 'length after'
+
+
+def test_grouped_work(test_config):
+    instrument = test_config.lookup.get('instrument')
+    test_names = [
+        'APERO_v0.7_SPIROU_2510301e.fits',
+        'APERO_v0.7_SPIROU_2510301p.fits',
+        'APERO_v0.7_SPIROU_2426458e.fits',
+        'APERO_v0.7_SPIROU_2510301v.fits',
+        'APERO_v0.7_SPIROU_2426458p.fits',
+    ]
+    test_work = deque([data_source.APEROName(instrument, [entry]) for entry in test_names])
+    test_subject = data_source.GroupedWork(test_work, window=3)
+    test_result = test_subject.popleft()
+    assert isinstance(test_result, APEROObservationGroup), 'first window group'
+    assert [entry.file_name for entry in test_result.members] == test_names[:2], 'first window members'
+    assert len(test_work) == 2, 'only one window is read from the underlying work'
+    test_result = [entry.file_name for entry in test_subject]
+    # files for the same observation in different windows are not grouped together
+    assert test_result == test_names[2:], 'remaining entries'
+    assert len(test_subject) == 0, 'length after'
+
+
+@patch('apero2caom2.data_source.APEROLocalFilesDataSource._verify_file', return_value=True)
+def test_local_files_unchanged_file(verify_mock, test_config, tmp_path):
+    test_config.change_working_directory(tmp_path.as_posix())
+    test_config.data_sources = [tmp_path.as_posix()]
+    test_config.data_source_extensions = ['.fits']
+    test_config.cleanup_files_when_storing = False
+    test_config.lookup['file_state_index'] = 'file_state.db'
+    test_fqn = f'{tmp_path}/APERO_v0.7_SPIROU_2510301e.fits'
+    with open(test_fqn, 'w') as f:
+        f.write('test content')
+
+    for ii in range(2):
+        # a data source per pipeline invocation
+        test_subject = data_source.APEROLocalFilesDataSource(test_config, Mock())
+        with patch('apero2caom2.file_state.get_local_file_info', wraps=file_state.get_local_file_info) as info_mock:
+            (test_entry,) = [entry for entry in os.scandir(tmp_path) if entry.name.endswith('.fits')]
+            assert test_subject.default_filter(test_entry), f'work with the file {ii}'
+        test_subject.close()
+        # the file is only read, and verified, by the first invocation
+        assert info_mock.call_count == (1 if ii == 0 else 0), f'md5sum {ii}'
+        assert verify_mock.call_count == 1, f'verification {ii}'
+
+
+@patch('apero2caom2.data_source.APEROLocalFilesDataSource._verify_file', return_value=True)
+def test_local_files_move_index(verify_mock, test_config, tmp_path):
+    source_dir = tmp_path / 'source'
+    success_dir = tmp_path / 'success'
+    failure_dir = tmp_path / 'failure'
+    for entry in [source_dir, success_dir, failure_dir]:
+        entry.mkdir()
+    test_config.change_working_directory(tmp_path.as_posix())
+    test_config.data_sources = [source_dir.as_posix()]
+    test_config.data_source_extensions = ['.fits']
+    test_config.cleanup_files_when_storing = True
+    test_config.cleanup_success_destination = success_dir.as_posix()
+    test_config.cleanup_failure_destination = failure_dir.as_posix()
+    test_config.store_modified_files_only = False
+    test_config.lookup['file_state_index'] = 'file_state.db'
+    test_config.lookup['move_journal'] = 'move_journal.log'
+    test_fqn = (source_dir / 'APERO_v0.7_SPIROU_2510301e.fits').as_posix()
+    moved_fqn = (success_dir / 'APERO_v0.7_SPIROU_2510301e.fits').as_posix()
+    with open(test_fqn, 'w') as f:
+        f.write('test content')
+
+    test_subject = data_source.APEROLocalFilesDataSource(test_config, Mock())
+    (test_entry,) = list(os.scandir(source_dir))
+    assert test_subject.default_filter(test_entry), 'work with the file'
+    index = test_subject._file_state
+    # a move that is queued, but not done, e.g. because the application stops, leaves the entry where the file is
+    with patch.object(test_subject._move_queue, 'put'):
+        test_subject._move_action(test_fqn, success_dir.as_posix())
+    assert index.get_verdict(test_fqn, os.stat(test_fqn)), 'entry stays with the file before the move'
+
+    test_subject._move_action(test_fqn, success_dir.as_posix())
+    test_subject._move_queue.flush()
+    assert not os.path.exists(test_fqn), 'moved'
+    assert index.get_verdict(moved_fqn, os.stat(moved_fqn)), 'entry follows the file after the move'
+    test_subject.close()
+
+
+@patch('apero2caom2.data_source.check_fitsverify', return_value=False)
+@patch('apero2caom2.data_source.fitsverify_batch')
+def test_local_files_fitsverify_pool(batch_mock, check_mock, test_config, tmp_path):
+    test_config.change_working_directory(tmp_path.as_posix())
+    test_config.data_sources = [tmp_path.as_posix()]
+    test_config.data_source_extensions = ['.fits']
+    test_config.cleanup_files_when_storing = False
+    test_config.lookup['fitsverify_workers'] = 2
+    test_config.lookup['fitsverify_batch_size'] = 2
+    test_fqns = [f'{tmp_path}/APERO_v0.7_SPIROU_251030{ii}e.fits' for ii in range(3)]
+    for test_fqn in test_fqns:
+        with open(test_fqn, 'w') as f:
+            f.write('test content')
+    # the last file is not reported as OK by its batch
+    batch_mock.side_effect = lambda fqns: {fqn: True for fqn in fqns if fqn != test_fqns[2]}
+
+    test_subject = data_source.APEROLocalFilesDataSource(test_config, Mock())
+    test_subject._reporter = Mock()
+    test_result = test_subject.get_work()
+    assert sorted(entry.file_name for entry in test_result) == [os.path.basename(fqn) for fqn in test_fqns[:2]], 'work'
+    assert batch_mock.call_count == 2, 'one fitsverify invocation per batch'
+    check_mock.assert_called_once_with(test_fqns[2]), 'files a batch does not report as OK are checked individually'
+    assert test_subject._pending_verdicts == {}, 'no verdicts are kept after the scan'
+    test_subject.close()
+    assert test_subject._fitsverify_pool is None, 'pool shut down'
+
+
+def test_watched_work():
+    batches = deque([deque(), deque(['a', 'b']), deque(), deque(['c'])])
+    test_subject = data_source.WatchedWork(batches.popleft)
+    assert test_subject and len(test_subject) == 1, 'never empty'
+    assert test_subject.popleft() == 'a', 'waits through empty batches'
+    test_subject.append('retry')
+    assert [test_subject.popleft() for _ in range(3)] == ['b', 'retry', 'c'], 'batch order'
+    assert len(batches) == 0, 'each batch requested once'
+
+
+@patch('apero2caom2.data_source.APEROLocalFilesDataSource._verify_file', return_value=True)
+def test_watched_files_data_source(verify_mock, test_config, tmp_path):
+    data_dir = tmp_path / 'data'
+    data_dir.mkdir()
+    test_config.change_working_directory(tmp_path.as_posix())
+    test_config.data_sources = [data_dir.as_posix()]
+    test_config.data_source_extensions = ['.fits']
+    test_config.cleanup_files_when_storing = False
+    test_config.lookup['watch_mode'] = 'polling'
+    test_config.lookup['watch_debounce'] = 0.1
+    test_config.lookup['watch_poll_interval'] = 0.05
+    test_config.lookup['watch_timeout'] = 2
+    cursor_fqn = f'{tmp_path}/watch_cursor.yml'
+    test_fqns = [f'{data_dir}/APERO_v0.7_SPIROU_251030{ii}e.fits' for ii in range(3)]
+    for test_fqn in test_fqns[:2] + [f'{data_dir}/notes.txt']:
+        with open(test_fqn, 'w') as f:
+            f.write('test content')
+
+    def _cursor():
+        with open(cursor_fqn) as f:
+            return yaml.safe_load(f)
+
+    test_subject = data_source.APEROWatchedFilesDataSource(test_config, Mock())
+    test_subject._reporter = Mock()
+    test_work = test_subject.get_work()
+    first = test_work.popleft()
+    second = test_work.popleft()
+    assert sorted([first.source_names[0], second.source_names[0]]) == test_fqns[:2], 'existing files, not notes.txt'
+    first_cursor = _cursor()
+    # the cursor is written once per batch, so it has every file the batch reported
+    assert first_cursor['pending'] == test_fqns[:2] + [f'{data_dir}/notes.txt'], 'files in progress'
+
+    test_subject.clean_up(first, 0, 1)
+    test_subject.clean_up(second, 0, 2)
+    with open(test_fqns[2], 'w') as f:
+        f.write('test content')
+    third = test_work.popleft()
+    assert third.source_names == [test_fqns[2]], 'new file'
+    second_cursor = _cursor()
+    assert second_cursor['pending'] == [test_fqns[2]], 'done files leave the cursor'
+    assert second_cursor['last_checked'] > first_cursor['last_checked'], 'cursor advances'
+    test_subject.close()
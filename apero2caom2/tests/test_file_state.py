@@ -0,0 +1,117 @@
+# ***********************************************************************
+# ******************  CANADIAN ASTRONOMY DATA CENTRE  *******************
+# *************  CENTRE CANADIEN DE DONNÉES ASTRONOMIQUES  **************
+#
+#  (c) 2026.                            (c) 2026.
+#  Government of Canada                 Gouvernement du Canada
+#  National Research Council            Conseil national de recherches
+#  Ottawa, Canada, K1A 0R6              Ottawa, Canada, K1A 0R6
+#  All rights reserved                  Tous droits réservés
+#
+#  NRC disclaims any warranties,        Le CNRC dénie toute garantie
+#  expressed, implied, or               énoncée, implicite ou légale,
+#  statutory, of any kind with          de quelque nature que ce
+#  respect to the software,             soit, concernant le logiciel,
+#  including without limitation         y compris sans restriction
+#  any warranty of merchantability      toute garantie de valeur
+#  or fitness for a particular          marchande ou de pertinence
+#  purpose. NRC shall not be            pour un usage particulier.
+#  liable in any event for any          Le CNRC ne pourra en aucun cas
+#  damages, whether direct or           être tenu responsable de tout
+#  indirect, special or general,        dommage, direct ou indirect,
+#  consequential or incidental,         particulier ou général,
+#  arising from the use of the          accessoire ou fortuit, résultant
+#  software.  Neither the name          de l'utilisation du logiciel. Ni
+#  of the National Research             le nom du Conseil National de
+#  Council of Canada nor the            Recherches du Canada ni les noms
+#  names of its contributors may        de ses  participants ne peuvent
+#  be used to endorse or promote        être utilisés pour approuver ou
+#  products derived from this           promouvoir les produits dérivés
+#  software without specific prior      de ce logiciel sans autorisation
+#  written permission.                  préalable et particulière
+#                                       par écrit.
+#
+#  This file is part of the             Ce fichier fait partie du projet
+#  OpenCADC project.                    OpenCADC.
+#
+#  OpenCADC is free software:           OpenCADC est un logiciel libre ;
+#  you can redistribute it and/or       vous pouvez le redistribuer ou le
+#  modify it under the terms of         modifier suivant les termes de
+#  the GNU Affero General Public        la “GNU Affero General Public
+#  License as published by the          License” telle que publiée
+#  Free Software Foundation,            par la Free Software Foundation
+#  either version 3 of the              : soit la version 3 de cette
+#  License, or (at your option)         licence, soit (à votre gré)
+#  any later version.                   toute version ultérieure.
+#
+#  OpenCADC is distributed in the       OpenCADC est distribué
+#  hope that it will be useful,         dans l’espoir qu’il vous
+#  but WITHOUT ANY WARRANTY;            sera utile, mais SANS AUCUNE
+#  without even the implied             GARANTIE : sans même la garantie
+#  warranty of MERCHANTABILITY          implicite de COMMERCIALISABILITÉ
+#  or FITNESS FOR A PARTICULAR          ni d’ADÉQUATION À UN OBJECTIF
+#  PURPOSE.  See the GNU Affero         PARTICULIER. Consultez la Licence
+#  General Public License for           Générale Publique GNU Affero
+#  more details.                        pour plus de détails.
+#
+#  You should have received             Vous devriez avoir reçu une
+#  a copy of the GNU Affero             copie de la Licence Générale
+#  General Public License along         Publique GNU Affero avec
+#  with OpenCADC.  If not, see          OpenCADC ; si ce n’est
+#  <http://www.gnu.org/licenses/>.      pas le cas, consultez :
+#                                       <http://www.gnu.org/licenses/>.
+#
+#  $Revision: 4 $
+#
+# ***********************************************************************
+#
+
+import os
+
+from mock import patch
+
+from apero2caom2.file_state import FileStateIndex
+
+
+def test_file_state_index(tmp_path):
+    test_fqn = f'{tmp_path}/test_file.fits'
+    with open(test_fqn, 'w') as f:
+        f.write('test content')
+
+    test_subject = FileStateIndex(f'{tmp_path}/file_state.db')
+    first = test_subject.get_file_info(test_fqn, os.stat(test_fqn))
+    assert first.md5sum is not None, 'md5sum'
+    assert test_subject.misses == 1 and test_subject.hits == 0, 'first read'
+    assert test_subject.get_verdict(test_fqn, os.stat(test_fqn)) is None, 'no verdict yet'
+    test_subject.set_verdict(test_fqn, True)
+    test_subject.set_outcome(test_fqn, 'succeeded')
+
+    with patch('apero2caom2.file_state.get_local_file_info') as info_mock:
+        second = test_subject.get_file_info(test_fqn, os.stat(test_fqn))
+        assert not info_mock.called, 'unchanged file should not be re-read'
+    assert second.md5sum == first.md5sum, 'recorded md5sum'
+    assert second.size == first.size, 'recorded size'
+    assert test_subject.get_verdict(test_fqn, os.stat(test_fqn)), 'recorded verdict'
+    assert test_subject.get_outcome(test_fqn, os.stat(test_fqn)) == 'succeeded', 'recorded outcome'
+    test_subject.close()
+
+    # the index persists between invocations, and a changed file is re-read, with the verdict and outcome discarded
+    with open(test_fqn, 'w') as f:
+        f.write('different, longer test content')
+    test_subject = FileStateIndex(f'{tmp_path}/file_state.db')
+    third = test_subject.get_file_info(test_fqn, os.stat(test_fqn))
+    assert third.md5sum != first.md5sum, 'changed md5sum'
+    assert test_subject.misses == 1, 'changed file'
+    assert test_subject.get_verdict(test_fqn, os.stat(test_fqn)) is None, 'discarded verdict'
+    assert test_subject.get_outcome(test_fqn, os.stat(test_fqn)) is None, 'discarded outcome'
+
+    # the entry, and the outcome, follow a moved file
+    test_subject.set_verdict(test_fqn, False)
+    test_subject.set_outcome(test_fqn, 'rejected')
+    os.mkdir(f'{tmp_path}/failure')
+    moved_fqn = f'{tmp_path}/failure/test_file.fits'
+    os.rename(test_fqn, moved_fqn)
+    test_subject.move(test_fqn, moved_fqn)
+    assert test_subject.get_outcome(moved_fqn, os.stat(moved_fqn)) == 'rejected', 'moved outcome'
+    assert test_subject.get_verdict(moved_fqn, os.stat(moved_fqn)) is False, 'moved verdict'
+    test_subject.close()
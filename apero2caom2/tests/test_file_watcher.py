@@ -0,0 +1,118 @@
+# ***********************************************************************
+# ******************  CANADIAN ASTRONOMY DATA CENTRE  *******************
+# *************  CENTRE CANADIEN DE DONNÉES ASTRONOMIQUES  **************
+#
+#  (c) 2026.                            (c) 2026.
+#  Government of Canada                 Gouvernement du Canada
+#  National Research Council            Conseil national de recherches
+#  Ottawa, Canada, K1A 0R6              Ottawa, Canada, K1A 0R6
+#  All rights reserved                  Tous droits réservés
+#
+#  NRC disclaims any warranties,        Le CNRC dénie toute garantie
+#  expressed, implied, or               énoncée, implicite ou légale,
+#  statutory, of any kind with          de quelque nature que ce
+#  respect to the software,             soit, concernant le logiciel,
+#  including without limitation         y compris sans restriction
+#  any warranty of merchantability      toute garantie de valeur
+#  or fitness for a particular          marchande ou de pertinence
+#  purpose. NRC shall not be            pour un usage particulier.
+#  liable in any event for any          Le CNRC ne pourra en aucun cas
+#  damages, whether direct or           être tenu responsable de tout
+#  indirect, special or general,        dommage, direct ou indirect,
+#  consequential or incidental,         particulier ou général,
+#  arising from the use of the          accessoire ou fortuit, résultant
+#  software.  Neither the name          de l'utilisation du logiciel. Ni
+#  of the National Research             le nom du Conseil National de
+#  Council of Canada nor the            Recherches du Canada ni les noms
+#  names of its contributors may        de ses  participants ne peuvent
+#  be used to endorse or promote        être utilisés pour approuver ou
+#  products derived from this           promouvoir les produits dérivés
+#  software without specific prior      de ce logiciel sans autorisation
+#  written permission.                  préalable et particulière
+#                                       par écrit.
+#
+#  This file is part of the             Ce fichier fait partie du projet
+#  OpenCADC project.                    OpenCADC.
+#
+#  OpenCADC is free software:           OpenCADC est un logiciel libre ;
+#  you can redistribute it and/or       vous pouvez le redistribuer ou le
+#  modify it under the terms of         modifier suivant les termes de
+#  the GNU Affero General Public        la “GNU Affero General Public
+#  License as published by the          License” telle que publiée
+#  Free Software Foundation,            par la Free Software Foundation
+#  either version 3 of the              : soit la version 3 de cette
+#  License, or (at your option)         licence, soit (à votre gré)
+#  any later version.                   toute version ultérieure.
+#
+#  OpenCADC is distributed in the       OpenCADC est distribué
+#  hope that it will be useful,         dans l’espoir qu’il vous
+#  but WITHOUT ANY WARRANTY;            sera utile, mais SANS AUCUNE
+#  without even the implied             GARANTIE : sans même la garantie
+#  warranty of MERCHANTABILITY          implicite de COMMERCIALISABILITÉ
+#  or FITNESS FOR A PARTICULAR          ni d’ADÉQUATION À UN OBJECTIF
+#  PURPOSE.  See the GNU Affero         PARTICULIER. Consultez la Licence
+#  General Public License for           Générale Publique GNU Affero
+#  more details.                        pour plus de détails.
+#
+#  You should have received             Vous devriez avoir reçu une
+#  a copy of the GNU Affero             copie de la Licence Générale
+#  General Public License along         Publique GNU Affero avec
+#  with OpenCADC.  If not, see          OpenCADC ; si ce n’est
+#  <http://www.gnu.org/licenses/>.      pas le cas, consultez :
+#                                       <http://www.gnu.org/licenses/>.
+#
+#  $Revision: 4 $
+#
+# ***********************************************************************
+#
+
+import os
+import pytest
+
+from time import sleep
+
+from apero2caom2.file_watcher import FileWatcher, get_file_watcher
+
+
+def _write(fqn):
+    with open(fqn, 'w') as f:
+        f.write('test content')
+
+
+def _watch(tmp_path, mode):
+    data_dir = f'{tmp_path}/data'
+    os.makedirs(f'{data_dir}/2510301', exist_ok=True)
+    cursor_fqn = f'{tmp_path}/watch_cursor.yml'
+    existing_fqn = f'{data_dir}/APERO_v0.7_SPIROU_2510300e.fits'
+    _write(existing_fqn)
+
+    test_subject = get_file_watcher([data_dir], cursor_fqn, debounce=0.1, mode=mode, poll_interval=0.05)
+    assert test_subject.settled(1.0) == [existing_fqn], 'existing file on the first invocation'
+    test_subject.done(existing_fqn)
+
+    new_fqn = f'{data_dir}/2510301/APERO_v0.7_SPIROU_2510301e.fits'
+    _write(new_fqn)
+    assert test_subject.settled(2.0) == [new_fqn], 'new file'
+    test_subject.close()
+
+    # new_fqn was never marked done, and down_fqn is written while nothing is watching
+    sleep(0.2)
+    down_fqn = f'{data_dir}/APERO_v0.7_SPIROU_2510301p.fits'
+    _write(down_fqn)
+    test_subject = get_file_watcher([data_dir], cursor_fqn, debounce=0.1, mode=mode, poll_interval=0.05)
+    assert sorted(test_subject.settled(1.0)) == [new_fqn, down_fqn], 'restart'
+    test_subject.close()
+
+
+def test_inotify_file_watcher(tmp_path):
+    # falls back to polling where inotify is not available
+    _watch(tmp_path, 'inotify')
+
+
+def test_polling_file_watcher(tmp_path):
+    _watch(tmp_path, 'polling')
+
+
+def test_file_watcher_is_abstract(tmp_path):
+    with pytest.raises(TypeError):
+        FileWatcher([tmp_path.as_posix()], f'{tmp_path}/watch_cursor.yml')
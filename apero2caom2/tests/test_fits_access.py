@@ -0,0 +1,144 @@
+# ***********************************************************************
+# ******************  CANADIAN ASTRONOMY DATA CENTRE  *******************
+# *************  CENTRE CANADIEN DE DONNÉES ASTRONOMIQUES  **************
+#
+#  (c) 2026.                            (c) 2026.
+#  Government of Canada                 Gouvernement du Canada
+#  National Research Council            Conseil national de recherches
+#  Ottawa, Canada, K1A 0R6              Ottawa, Canada, K1A 0R6
+#  All rights reserved                  Tous droits réservés
+#
+#  NRC disclaims any warranties,        Le CNRC dénie toute garantie
+#  expressed, implied, or               énoncée, implicite ou légale,
+#  statutory, of any kind with          de quelque nature que ce
+#  respect to the software,             soit, concernant le logiciel,
+#  including without limitation         y compris sans restriction
+#  any warranty of merchantability      toute garantie de valeur
+#  or fitness for a particular          marchande ou de pertinence
+#  purpose. NRC shall not be            pour un usage particulier.
+#  liable in any event for any          Le CNRC ne pourra en aucun cas
+#  damages, whether direct or           être tenu responsable de tout
+#  indirect, special or general,        dommage, direct ou indirect,
+#  consequential or incidental,         particulier ou général,
+#  arising from the use of the          accessoire ou fortuit, résultant
+#  software.  Neither the name          de l'utilisation du logiciel. Ni
+#  of the National Research             le nom du Conseil National de
+#  Council of Canada nor the            Recherches du Canada ni les noms
+#  names of its contributors may        de ses  participants ne peuvent
+#  be used to endorse or promote        être utilisés pour approuver ou
+#  products derived from this           promouvoir les produits dérivés
+#  software without specific prior      de ce logiciel sans autorisation
+#  written permission.                  préalable et particulière
+#                                       par écrit.
+#
+#  This file is part of the             Ce fichier fait partie du projet
+#  OpenCADC project.                    OpenCADC.
+#
+#  OpenCADC is free software:           OpenCADC est un logiciel libre ;
+#  you can redistribute it and/or       vous pouvez le redistribuer ou le
+#  modify it under the terms of         modifier suivant les termes de
+#  the GNU Affero General Public        la “GNU Affero General Public
+#  License as published by the          License” telle que publiée
+#  Free Software Foundation,            par la Free Software Foundation
+#  either version 3 of the              : soit la version 3 de cette
+#  License, or (at your option)         licence, soit (à votre gré)
+#  any later version.                   toute version ultérieure.
+#
+#  OpenCADC is distributed in the       OpenCADC est distribué
+#  hope that it will be useful,         dans l’espoir qu’il vous
+#  but WITHOUT ANY WARRANTY;            sera utile, mais SANS AUCUNE
+#  without even the implied             GARANTIE : sans même la garantie
+#  warranty of MERCHANTABILITY          implicite de COMMERCIALISABILITÉ
+#  or FITNESS FOR A PARTICULAR          ni d’ADÉQUATION À UN OBJECTIF
+#  PURPOSE.  See the GNU Affero         PARTICULIER. Consultez la Licence
+#  General Public License for           Générale Publique GNU Affero
+#  more details.                        pour plus de détails.
+#
+#  You should have received             Vous devriez avoir reçu une
+#  a copy of the GNU Affero             copie de la Licence Générale
+#  General Public License along         Publique GNU Affero avec
+#  with OpenCADC.  If not, see          OpenCADC ; si ce n’est
+#  <http://www.gnu.org/licenses/>.      pas le cas, consultez :
+#                                       <http://www.gnu.org/licenses/>.
+#
+#  $Revision: 4 $
+#
+# ***********************************************************************
+#
+
+import numpy as np
+
+from astropy.io import fits
+
+from apero2caom2.fits_access import FitsAccess, FitsFilePool
+from apero2caom2.provenance_augmentation import unique_prefixes
+
+
+def _write_test_file(fqn):
+    primary = fits.PrimaryHDU()
+    primary.header['PI_NAME'] = 'Test PI'
+    table = fits.BinTableHDU.from_columns(
+        [
+            fits.Column(name='Filename', format='40A', array=['2510301o_pp_e2dsff_AB.fits', '2510302o_pp.fits']),
+            fits.Column(name='DARKFILE', format='40A', array=['2510303d_pp.fits', '2510303d_pp.fits']),
+        ],
+        name='TEMPLATE_TABLE',
+    )
+    fits.HDUList([primary, table]).writeto(fqn, overwrite=True)
+
+
+def test_fits_access(tmp_path):
+    pool = FitsFilePool(max_open=2)
+    test_fqns = [f'{tmp_path}/APERO_v0.7_SPIROU_Template_s1d_GL699_sc1d_v_file_AB_{ii}.fits' for ii in range(3)]
+    for test_fqn in test_fqns:
+        _write_test_file(test_fqn)
+
+    # headers in memory are used without opening the file
+    in_memory = [fits.Header({'PI_NAME': 'Test PI'}), fits.Header({'EXTNAME': 'TEMPLATE_TABLE'})]
+    test_subject = FitsAccess(in_memory, test_fqns[0], pool)
+    assert test_subject.in_memory, 'in memory'
+    assert test_subject.headers is in_memory, 'in memory headers'
+    assert test_subject.has_hdu('TEMPLATE_TABLE'), 'has table, from memory'
+    assert not test_subject.has_hdu('RDB'), 'no rdb, from memory'
+    assert pool.opens == 0, 'no open for in memory headers'
+
+    # the file is opened once for the headers and the table columns
+    assert test_subject.file_headers[0].get('PI_NAME') == 'Test PI', 'file headers'
+    assert list(test_subject.column('TEMPLATE_TABLE', 'DARKFILE')) == ['2510303d_pp.fits', '2510303d_pp.fits']
+    assert pool.opens == 1, 'one open'
+    assert pool.open_count == 1, 'one open file'
+
+    # no headers in memory means the headers come from the file
+    test_subject_2 = FitsAccess(None, test_fqns[1], pool)
+    assert not test_subject_2.in_memory, 'not in memory'
+    assert test_subject_2.headers[0].get('PI_NAME') == 'Test PI', 'headers from file'
+    assert test_subject_2.has_hdu('TEMPLATE_TABLE'), 'has table, from file'
+
+    # the pool stays within its bound by closing the least-recently-used file
+    test_subject_3 = FitsAccess(None, test_fqns[2], pool)
+    assert test_subject_3.column('TEMPLATE_TABLE', 'Filename')[0] == '2510301o_pp_e2dsff_AB.fits', 'column'
+    assert pool.open_count == 2, 'bounded'
+    assert pool.opens == 3, 'three opens'
+
+    # release is deterministic, and a released file is re-opened when it's used again
+    test_subject_3.close()
+    assert pool.open_count == 1, 'released'
+    np.testing.assert_array_equal(
+        test_subject.column('TEMPLATE_TABLE', 'Filename'), ['2510301o_pp_e2dsff_AB.fits', '2510302o_pp.fits']
+    )
+    assert pool.opens == 4, 're-opened after eviction'
+    test_subject.close()
+    test_subject_2.close()
+    assert pool.open_count == 0, 'all released'
+
+
+def test_unique_prefixes(tmp_path):
+    test_fqn = f'{tmp_path}/APERO_v0.7_SPIROU_Template_s1d_GL699_sc1d_v_file_AB.fits'
+    _write_test_file(test_fqn)
+    test_subject = FitsAccess(None, test_fqn, FitsFilePool())
+    columns = [test_subject.column('TEMPLATE_TABLE', 'Filename'), test_subject.column('TEMPLATE_TABLE', 'DARKFILE')]
+    assert unique_prefixes(columns) == ['2510301o', '2510302o', '2510303d'], 'first-seen order, no duplicates'
+    test_subject.close()
+    assert unique_prefixes([]) == [], 'no tables'
+    test_result = unique_prefixes([np.array([b'2510303d_pp.fits', b'2510301o.fits'])])
+    assert test_result == ['2510303d', '2510301o.fits'], 'bytes'
@@ -0,0 +1,127 @@
+# ***********************************************************************
+# ******************  CANADIAN ASTRONOMY DATA CENTRE  *******************
+# *************  CENTRE CANADIEN DE DONNÉES ASTRONOMIQUES  **************
+#
+#  (c) 2026.                            (c) 2026.
+#  Government of Canada                 Gouvernement du Canada
+#  National Research Council            Conseil national de recherches
+#  Ottawa, Canada, K1A 0R6              Ottawa, Canada, K1A 0R6
+#  All rights reserved                  Tous droits réservés
+#
+#  NRC disclaims any warranties,        Le CNRC dénie toute garantie
+#  expressed, implied, or               énoncée, implicite ou légale,
+#  statutory, of any kind with          de quelque nature que ce
+#  respect to the software,             soit, concernant le logiciel,
+#  including without limitation         y compris sans restriction
+#  any warranty of merchantability      toute garantie de valeur
+#  or fitness for a particular          marchande ou de pertinence
+#  purpose. NRC shall not be            pour un usage particulier.
+#  liable in any event for any          Le CNRC ne pourra en aucun cas
+#  damages, whether direct or           être tenu responsable de tout
+#  indirect, special or general,        dommage, direct ou indirect,
+#  consequential or incidental,         particulier ou général,
+#  arising from the use of the          accessoire ou fortuit, résultant
+#  software.  Neither the name          de l'utilisation du logiciel. Ni
+#  of the National Research             le nom du Conseil National de
+#  Council of Canada nor the            Recherches du Canada ni les noms
+#  names of its contributors may        de ses  participants ne peuvent
+#  be used to endorse or promote        être utilisés pour approuver ou
+#  products derived from this           promouvoir les produits dérivés
+#  software without specific prior      de ce logiciel sans autorisation
+#  written permission.                  préalable et particulière
+#                                       par écrit.
+#
+#  This file is part of the             Ce fichier fait partie du projet
+#  OpenCADC project.                    OpenCADC.
+#
+#  OpenCADC is free software:           OpenCADC est un logiciel libre ;
+#  you can redistribute it and/or       vous pouvez le redistribuer ou le
+#  modify it under the terms of         modifier suivant les termes de
+#  the GNU Affero General Public        la “GNU Affero General Public
+#  License as published by the          License” telle que publiée
+#  Free Software Foundation,            par la Free Software Foundation
+#  either version 3 of the              : soit la version 3 de cette
+#  License, or (at your option)         licence, soit (à votre gré)
+#  any later version.                   toute version ultérieure.
+#
+#  OpenCADC is distributed in the       OpenCADC est distribué
+#  hope that it will be useful,         dans l’espoir qu’il vous
+#  but WITHOUT ANY WARRANTY;            sera utile, mais SANS AUCUNE
+#  without even the implied             GARANTIE : sans même la garantie
+#  warranty of MERCHANTABILITY          implicite de COMMERCIALISABILITÉ
+#  or FITNESS FOR A PARTICULAR          ni d’ADÉQUATION À UN OBJECTIF
+#  PURPOSE.  See the GNU Affero         PARTICULIER. Consultez la Licence
+#  General Public License for           Générale Publique GNU Affero
+#  more details.                        pour plus de détails.
+#
+#  You should have received             Vous devriez avoir reçu une
+#  a copy of the GNU Affero             copie de la Licence Générale
+#  General Public License along         Publique GNU Affero avec
+#  with OpenCADC.  If not, see          OpenCADC ; si ce n’est
+#  <http://www.gnu.org/licenses/>.      pas le cas, consultez :
+#                                       <http://www.gnu.org/licenses/>.
+#
+#  $Revision: 4 $
+#
+# ***********************************************************************
+#
+
+import numpy as np
+
+from astropy.io import fits
+
+from apero2caom2.fits_structure import check_structure, iter_hdus, read_headers
+
+
+def _write_test_file(fqn, checksum=False):
+    primary = fits.PrimaryHDU()
+    primary.header['DRSOBJN'] = 'GL699'
+    image = fits.ImageHDU(data=np.arange(4088 * 7, dtype=np.float64).reshape(7, 4088), name='FluxAB')
+    table = fits.BinTableHDU.from_columns(
+        [fits.Column(name='Filename', format='40A', array=['2510301o_pp_e2dsff_AB.fits', '2510302o_pp.fits'])],
+        name='TEMPLATE_TABLE',
+    )
+    fits.HDUList([primary, image, table]).writeto(fqn, checksum=checksum, overwrite=True)
+
+
+def test_check_structure(tmp_path):
+    test_fqn = f'{tmp_path}/APERO_v0.7_SPIROU_2510301e.fits'
+    _write_test_file(test_fqn, checksum=True)
+    assert check_structure(test_fqn) is None, 'valid file'
+    with open(test_fqn, 'rb') as f:
+        hdus = list(iter_hdus(f))
+    assert len(hdus) == 3, 'HDU count'
+    assert hdus[1].data_size == 4088 * 7 * 8, 'image data size'
+    assert hdus[2].keywords.get('XTENSION') == 'BINTABLE', 'table extension'
+
+    # change one data byte, so the DATASUM no longer matches
+    with open(test_fqn, 'r+b') as f:
+        f.seek(hdus[1].data_start + 100)
+        f.write(b'\x01')
+    assert 'DATASUM' in check_structure(test_fqn), 'datasum'
+
+    # truncated files are not consistent with the NAXISn values
+    _write_test_file(test_fqn)
+    with open(test_fqn, 'r+b') as f:
+        f.truncate(hdus[1].data_start + 2880)
+    assert check_structure(test_fqn) is not None, 'truncated'
+
+    # text headers, as used for testing, always require fitsverify
+    test_fqn = f'{tmp_path}/test.fits.header'
+    with open(test_fqn, 'w') as f:
+        f.write('SIMPLE  =                    T\n')
+    assert check_structure(test_fqn) is not None, 'not FITS'
+
+
+def test_read_headers(tmp_path):
+    test_fqn = f'{tmp_path}/APERO_v0.7_SPIROU_2510301e.fits'
+    _write_test_file(test_fqn)
+    with fits.open(test_fqn) as hdus:
+        expected = [hdu.header for hdu in hdus]
+    test_result = read_headers(test_fqn)
+    assert len(test_result) == 3, 'HDU count'
+    for index, header in enumerate(test_result):
+        assert header == expected[index], f'header {index}'
+    test_result = read_headers(test_fqn, max_hdus=1)
+    assert len(test_result) == 1, 'stop after the primary HDU'
+    assert test_result[0].get('DRSOBJN') == 'GL699', 'primary header'
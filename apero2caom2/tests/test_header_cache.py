@@ -0,0 +1,123 @@
+# ***********************************************************************
+# ******************  CANADIAN ASTRONOMY DATA CENTRE  *******************
+# *************  CENTRE CANADIEN DE DONNÉES ASTRONOMIQUES  **************
+#
+#  (c) 2026.                            (c) 2026.
+#  Government of Canada                 Gouvernement du Canada
+#  National Research Council            Conseil national de recherches
+#  Ottawa, Canada, K1A 0R6              Ottawa, Canada, K1A 0R6
+#  All rights reserved                  Tous droits réservés
+#
+#  NRC disclaims any warranties,        Le CNRC dénie toute garantie
+#  expressed, implied, or               énoncée, implicite ou légale,
+#  statutory, of any kind with          de quelque nature que ce
+#  respect to the software,             soit, concernant le logiciel,
+#  including without limitation         y compris sans restriction
+#  any warranty of merchantability      toute garantie de valeur
+#  or fitness for a particular          marchande ou de pertinence
+#  purpose. NRC shall not be            pour un usage particulier.
+#  liable in any event for any          Le CNRC ne pourra en aucun cas
+#  damages, whether direct or           être tenu responsable de tout
+#  indirect, special or general,        dommage, direct ou indirect,
+#  consequential or incidental,         particulier ou général,
+#  arising from the use of the          accessoire ou fortuit, résultant
+#  software.  Neither the name          de l'utilisation du logiciel. Ni
+#  of the National Research             le nom du Conseil National de
+#  Council of Canada nor the            Recherches du Canada ni les noms
+#  names of its contributors may        de ses  participants ne peuvent
+#  be used to endorse or promote        être utilisés pour approuver ou
+#  products derived from this           promouvoir les produits dérivés
+#  software without specific prior      de ce logiciel sans autorisation
+#  written permission.                  préalable et particulière
+#                                       par écrit.
+#
+#  This file is part of the             Ce fichier fait partie du projet
+#  OpenCADC project.                    OpenCADC.
+#
+#  OpenCADC is free software:           OpenCADC est un logiciel libre ;
+#  you can redistribute it and/or       vous pouvez le redistribuer ou le
+#  modify it under the terms of         modifier suivant les termes de
+#  the GNU Affero General Public        la “GNU Affero General Public
+#  License as published by the          License” telle que publiée
+#  Free Software Foundation,            par la Free Software Foundation
+#  either version 3 of the              : soit la version 3 de cette
+#  License, or (at your option)         licence, soit (à votre gré)
+#  any later version.                   toute version ultérieure.
+#
+#  OpenCADC is distributed in the       OpenCADC est distribué
+#  hope that it will be useful,         dans l’espoir qu’il vous
+#  but WITHOUT ANY WARRANTY;            sera utile, mais SANS AUCUNE
+#  without even the implied             GARANTIE : sans même la garantie
+#  warranty of MERCHANTABILITY          implicite de COMMERCIALISABILITÉ
+#  or FITNESS FOR A PARTICULAR          ni d’ADÉQUATION À UN OBJECTIF
+#  PURPOSE.  See the GNU Affero         PARTICULIER. Consultez la Licence
+#  General Public License for           Générale Publique GNU Affero
+#  more details.                        pour plus de détails.
+#
+#  You should have received             Vous devriez avoir reçu une
+#  a copy of the GNU Affero             copie de la Licence Générale
+#  General Public License along         Publique GNU Affero avec
+#  with OpenCADC.  If not, see          OpenCADC ; si ce n’est
+#  <http://www.gnu.org/licenses/>.      pas le cas, consultez :
+#                                       <http://www.gnu.org/licenses/>.
+#
+#  $Revision: 4 $
+#
+# ***********************************************************************
+#
+
+import os
+import pickle
+import zlib
+
+from astropy import __version__ as astropy_version
+from astropy.io import fits
+from mock import patch
+
+from apero2caom2.header_cache import FORMAT_VERSION, HeaderCache, MAGIC, PREAMBLE
+
+
+def test_header_cache(tmp_path):
+    test_headers = [fits.Header([('SIMPLE', True), ('DRSOBJN', 'GL699')]), fits.Header([('EXTNAME', 'FluxAB')])]
+    test_subject = HeaderCache(f'{tmp_path}/cache', max_bytes=1024 * 1024)
+    assert test_subject.get('md5:0123456789abcdef') is None, 'empty cache'
+    test_subject.put('md5:0123456789abcdef', test_headers)
+    test_result = test_subject.get('0123456789abcdef')
+    assert test_result == test_headers, 'round trip'
+    assert test_result[0].get('DRSOBJN') == 'GL699', 'values'
+    assert test_subject.get('0123456789abcdef', 'provenance') is None, 'names are separate'
+    assert test_subject.hits == 1 and test_subject.misses == 2, 'counts'
+
+    # a damaged entry is a miss, and is removed
+    entry_fqn = f'{tmp_path}/cache/01/0123456789abcdef.headers'
+    with open(entry_fqn, 'r+b') as f:
+        f.seek(-2, os.SEEK_END)
+        f.write(b'xx')
+    assert test_subject.get('0123456789abcdef') is None, 'corrupt'
+    assert not os.path.exists(entry_fqn), 'corrupt entry removed'
+
+    # an entry with a valid preamble, but a payload that is not JSON, is a miss too
+    for version, payload in [(FORMAT_VERSION, b'\x80\x7f'), (1, pickle.dumps(test_headers))]:
+        payload = zlib.compress(payload, 1)
+        with open(entry_fqn, 'wb') as f:
+            f.write(PREAMBLE.pack(MAGIC, version, astropy_version.encode(), len(payload), zlib.crc32(payload)))
+            f.write(payload)
+        with patch('pickle.loads') as loads_mock:
+            assert test_subject.get('0123456789abcdef') is None, f'unloadable version {version}'
+            assert not loads_mock.called, 'never unpickled'
+        assert not os.path.exists(entry_fqn), 'unloadable entry removed'
+
+    # other values are JSON
+    test_subject.put('0123456789abcdef', ('Ariane Deguise', ['2510301', '2510302']), 'provenance')
+    assert test_subject.get('0123456789abcdef', 'provenance') == ['Ariane Deguise', ['2510301', '2510302']], 'json'
+
+    # the least-recently used entries are evicted first
+    test_subject = HeaderCache(f'{tmp_path}/small', max_bytes=3500)
+    for index, md5sum in enumerate(['aa01', 'aa02', 'aa03']):
+        test_subject.put(md5sum, os.urandom(900).hex(), 'test')
+        os.utime(f'{tmp_path}/small/aa/{md5sum}.test', (index, index))
+    test_subject.get('aa01', 'test')
+    test_subject.put('aa04', os.urandom(900).hex(), 'test')
+    assert test_subject.get('aa01', 'test') is not None, 'recently used'
+    assert test_subject.get('aa02', 'test') is None, 'least recently used'
+    assert test_subject.get('aa04', 'test') is not None, 'newest'
@@ -0,0 +1,151 @@
+# ***********************************************************************
+# ******************  CANADIAN ASTRONOMY DATA CENTRE  *******************
+# *************  CENTRE CANADIEN DE DONNÉES ASTRONOMIQUES  **************
+#
+#  (c) 2026.                            (c) 2026.
+#  Government of Canada                 Gouvernement du Canada
+#  National Research Council            Conseil national de recherches
+#  Ottawa, Canada, K1A 0R6              Ottawa, Canada, K1A 0R6
+#  All rights reserved                  Tous droits réservés
+#
+#  NRC disclaims any warranties,        Le CNRC dénie toute garantie
+#  expressed, implied, or               énoncée, implicite ou légale,
+#  statutory, of any kind with          de quelque nature que ce
+#  respect to the software,             soit, concernant le logiciel,
+#  including without limitation         y compris sans restriction
+#  any warranty of merchantability      toute garantie de valeur
+#  or fitness for a particular          marchande ou de pertinence
+#  purpose. NRC shall not be            pour un usage particulier.
+#  liable in any event for any          Le CNRC ne pourra en aucun cas
+#  damages, whether direct or           être tenu responsable de tout
+#  indirect, special or general,        dommage, direct ou indirect,
+#  consequential or incidental,         particulier ou général,
+#  arising from the use of the          accessoire ou fortuit, résultant
+#  software.  Neither the name          de l'utilisation du logiciel. Ni
+#  of the National Research             le nom du Conseil National de
+#  Council of Canada nor the            Recherches du Canada ni les noms
+#  names of its contributors may        de ses  participants ne peuvent
+#  be used to endorse or promote        être utilisés pour approuver ou
+#  products derived from this           promouvoir les produits dérivés
+#  software without specific prior      de ce logiciel sans autorisation
+#  written permission.                  préalable et particulière
+#                                       par écrit.
+#
+#  This file is part of the             Ce fichier fait partie du projet
+#  OpenCADC project.                    OpenCADC.
+#
+#  OpenCADC is free software:           OpenCADC est un logiciel libre ;
+#  you can redistribute it and/or       vous pouvez le redistribuer ou le
+#  modify it under the terms of         modifier suivant les termes de
+#  the GNU Affero General Public        la “GNU Affero General Public
+#  License as published by the          License” telle que publiée
+#  Free Software Foundation,            par la Free Software Foundation
+#  either version 3 of the              : soit la version 3 de cette
+#  License, or (at your option)         licence, soit (à votre gré)
+#  any later version.                   toute version ultérieure.
+#
+#  OpenCADC is distributed in the       OpenCADC est distribué
+#  hope that it will be useful,         dans l’espoir qu’il vous
+#  but WITHOUT ANY WARRANTY;            sera utile, mais SANS AUCUNE
+#  without even the implied             GARANTIE : sans même la garantie
+#  warranty of MERCHANTABILITY          implicite de COMMERCIALISABILITÉ
+#  or FITNESS FOR A PARTICULAR          ni d’ADÉQUATION À UN OBJECTIF
+#  PURPOSE.  See the GNU Affero         PARTICULIER. Consultez la Licence
+#  General Public License for           Générale Publique GNU Affero
+#  more details.                        pour plus de détails.
+#
+#  You should have received             Vous devriez avoir reçu une
+#  a copy of the GNU Affero             copie de la Licence Générale
+#  General Public License along         Publique GNU Affero avec
+#  with OpenCADC.  If not, see          OpenCADC ; si ce n’est
+#  <http://www.gnu.org/licenses/>.      pas le cas, consultez :
+#                                       <http://www.gnu.org/licenses/>.
+#
+#  $Revision: 4 $
+#
+# ***********************************************************************
+#
+
+import shutil
+
+from apero2caom2.move_queue import MoveQueue
+
+
+def test_move_queue(tmp_path):
+    source_dir = tmp_path / 'source'
+    success_dir = tmp_path / 'success'
+    failure_dir = tmp_path / 'failure'
+    for entry in [source_dir, success_dir, failure_dir]:
+        entry.mkdir()
+    for f_name in ['a.fits', 'b.fits', 'c.fits']:
+        (source_dir / f_name).write_text(f_name)
+    journal_fqn = (tmp_path / 'move_journal.log').as_posix()
+
+    test_subject = MoveQueue(journal_fqn, shutil.move)
+    test_subject.put((source_dir / 'a.fits').as_posix(), success_dir.as_posix())
+    test_subject.put((source_dir / 'b.fits').as_posix(), failure_dir.as_posix())
+    test_subject.flush()
+    assert (success_dir / 'a.fits').exists(), 'moved to success'
+    assert (failure_dir / 'b.fits').exists(), 'moved to failure'
+    assert test_subject.moved == 2, 'moved count'
+    test_subject.close()
+
+    # a move that is in the journal, but not marked as done, is done on the next start
+    with open(journal_fqn, 'a') as f:
+        f.write(MoveQueue._record(MoveQueue.MOVE, (source_dir / 'c.fits').as_posix(), success_dir.as_posix()))
+        f.write(MoveQueue._record(MoveQueue.MOVE, (source_dir / 'gone.fits').as_posix(), success_dir.as_posix()))
+    test_subject = MoveQueue(journal_fqn, shutil.move)
+    test_subject.close()
+    assert (success_dir / 'c.fits').exists(), 'recovered move'
+    assert test_subject.moved == 1, 'files that are no longer in place are not moved'
+    assert test_subject.failed == 0, 'failed count'
+
+
+def test_move_queue_compaction(tmp_path):
+    source_dir = tmp_path / 'source'
+    success_dir = tmp_path / 'success'
+    for entry in [source_dir, success_dir]:
+        entry.mkdir()
+    journal_fqn = (tmp_path / 'move_journal.log').as_posix()
+
+    def _move(fqn, destination):
+        if fqn.endswith('bad.fits'):
+            raise OSError('broken file system')
+        shutil.move(fqn, destination)
+
+    test_subject = MoveQueue(journal_fqn, _move, compact_records=4)
+    for f_name in ['a.fits', 'b.fits', 'c.fits', 'bad.fits']:
+        (source_dir / f_name).write_text(f_name)
+        test_subject.put((source_dir / f_name).as_posix(), success_dir.as_posix())
+        test_subject.flush()
+        with open(journal_fqn) as f:
+            assert len(f.readlines()) < 4 + 4, 'compacted after compact_records records'
+    test_subject.close()
+    assert test_subject.moved == 3, 'moved count'
+    assert test_subject.failed == 1, 'failed count'
+
+    # the next start keeps only the failed move
+    test_subject = MoveQueue(journal_fqn, _move, compact_records=4)
+    test_subject.close()
+    with open(journal_fqn) as f:
+        records = f.readlines()
+    assert records[0] == MoveQueue._record(
+        MoveQueue.MOVE, (source_dir / 'bad.fits').as_posix(), success_dir.as_posix()
+    ), 'only the failed move is outstanding'
+
+
+def test_move_queue_drain(tmp_path):
+    source_dir = tmp_path / 'source'
+    success_dir = tmp_path / 'success'
+    for entry in [source_dir, success_dir]:
+        entry.mkdir()
+    journal_fqn = (tmp_path / 'move_journal.log').as_posix()
+
+    test_subject = MoveQueue(journal_fqn, shutil.move)
+    for f_name in ['a.fits', 'b.fits']:
+        (source_dir / f_name).write_text(f_name)
+        test_subject.put((source_dir / f_name).as_posix(), success_dir.as_posix())
+        test_subject.flush()
+    with open(journal_fqn) as f:
+        assert len(f.readlines()) == 4, 'a drained queue does not re-write the journal below compact_records'
+    test_subject.close()
@@ -0,0 +1,107 @@
+# ***********************************************************************
+# ******************  CANADIAN ASTRONOMY DATA CENTRE  *******************
+# *************  CENTRE CANADIEN DE DONNÉES ASTRONOMIQUES  **************
+#
+#  (c) 2026.                            (c) 2026.
+#  Government of Canada                 Gouvernement du Canada
+#  National Research Council            Conseil national de recherches
+#  Ottawa, Canada, K1A 0R6              Ottawa, Canada, K1A 0R6
+#  All rights reserved                  Tous droits réservés
+#
+#  NRC disclaims any warranties,        Le CNRC dénie toute garantie
+#  expressed, implied, or               énoncée, implicite ou légale,
+#  statutory, of any kind with          de quelque nature que ce
+#  respect to the software,             soit, concernant le logiciel,
+#  including without limitation         y compris sans restriction
+#  any warranty of merchantability      toute garantie de valeur
+#  or fitness for a particular          marchande ou de pertinence
+#  purpose. NRC shall not be            pour un usage particulier.
+#  liable in any event for any          Le CNRC ne pourra en aucun cas
+#  damages, whether direct or           être tenu responsable de tout
+#  indirect, special or general,        dommage, direct ou indirect,
+#  consequential or incidental,         particulier ou général,
+#  arising from the use of the          accessoire ou fortuit, résultant
+#  software.  Neither the name          de l'utilisation du logiciel. Ni
+#  of the National Research             le nom du Conseil National de
+#  Council of Canada nor the            Recherches du Canada ni les noms
+#  names of its contributors may        de ses  participants ne peuvent
+#  be used to endorse or promote        être utilisés pour approuver ou
+#  products derived from this           promouvoir les produits dérivés
+#  software without specific prior      de ce logiciel sans autorisation
+#  written permission.                  préalable et particulière
+#                                       par écrit.
+#
+#  This file is part of the             Ce fichier fait partie du projet
+#  OpenCADC project.                    OpenCADC.
+#
+#  OpenCADC is free software:           OpenCADC est un logiciel libre ;
+#  you can redistribute it and/or       vous pouvez le redistribuer ou le
+#  modify it under the terms of         modifier suivant les termes de
+#  the GNU Affero General Public        la “GNU Affero General Public
+#  License as published by the          License” telle que publiée
+#  Free Software Foundation,            par la Free Software Foundation
+#  either version 3 of the              : soit la version 3 de cette
+#  License, or (at your option)         licence, soit (à votre gré)
+#  any later version.                   toute version ultérieure.
+#
+#  OpenCADC is distributed in the       OpenCADC est distribué
+#  hope that it will be useful,         dans l’espoir qu’il vous
+#  but WITHOUT ANY WARRANTY;            sera utile, mais SANS AUCUNE
+#  without even the implied             GARANTIE : sans même la garantie
+#  warranty of MERCHANTABILITY          implicite de COMMERCIALISABILITÉ
+#  or FITNESS FOR A PARTICULAR          ni d’ADÉQUATION À UN OBJECTIF
+#  PURPOSE.  See the GNU Affero         PARTICULIER. Consultez la Licence
+#  General Public License for           Générale Publique GNU Affero
+#  more details.                        pour plus de détails.
+#
+#  You should have received             Vous devriez avoir reçu une
+#  a copy of the GNU Affero             copie de la Licence Générale
+#  General Public License along         Publique GNU Affero avec
+#  with OpenCADC.  If not, see          OpenCADC ; si ce n’est
+#  <http://www.gnu.org/licenses/>.      pas le cas, consultez :
+#                                       <http://www.gnu.org/licenses/>.
+#
+#  $Revision: 4 $
+#
+# ***********************************************************************
+#
+
+import os
+import sys
+
+from apero2caom2.plugin_registry import PluginRegistry
+
+
+def _write_plugin(fqn, content, mtime_ns):
+    with open(fqn, 'w') as f:
+        f.write(content)
+    os.utime(fqn, ns=(mtime_ns, mtime_ns))
+
+
+def test_plugin_registry(tmp_path):
+    module_fqn = f'{tmp_path}/registry_test_plugin.py'
+    _write_plugin(module_fqn, 'def update(observation, **kwargs):\n    return 1\n', 1000000000)
+    sys_path_length = len(sys.path)
+    test_subject = PluginRegistry()
+    first = test_subject.get(module_fqn)
+    second = test_subject.get(module_fqn)
+    assert test_subject.loads == 1, 'loaded once'
+    assert first is second, 'same plugin'
+    assert first.update_method_module is first.module, 'update function'
+    assert first.update_method_module.update(observation=None) == 1, 'update result'
+    assert len(sys.path) == sys_path_length, 'sys.path unchanged'
+    assert 'registry_test_plugin' not in sys.modules, 'sys.modules unchanged'
+
+    # a changed file is loaded again, and the backwards-compatible entry point is resolved
+    _write_plugin(
+        module_fqn,
+        'class ObservationUpdater:\n    def update(self, observation, **kwargs):\n        return 2\n',
+        2000000000,
+    )
+    third = test_subject.get(module_fqn)
+    assert test_subject.loads == 2, 'reloaded'
+    assert third.update_method_module.update(observation=None) == 2, 'ObservationUpdater result'
+    assert test_subject.get(module_fqn).update_method_module is third.update_method_module, 'one instance'
+
+    missing = test_subject.get(f'{tmp_path}/not_there.py')
+    assert missing.module is None and missing.update_method_module is None, 'missing plugin'
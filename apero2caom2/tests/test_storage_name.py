@@ -66,8 +66,23 @@
 # ***********************************************************************
 #
 
+import glob
+import logging
+import pytest
+
+from mock import Mock, patch
 from re import search
+from caom2 import Algorithm, Plane, SimpleObservation
+from caom2pipe.manage_composable import CadcException
 from apero2caom2 import APEROName
+from apero2caom2.main_app import (
+    APEROGroupedLocalVisitRunnerMeta,
+    APEROObservationGroup,
+    APEROOrganizeExecutesRunnerMeta,
+    classify_file_names,
+    group_by_observation,
+    set_storage_name_from_local_preconditions,
+)
 
 
 def test_is_valid(test_config):
@@ -223,3 +238,141 @@ def test_product_id(test_config):
         assert test_subject.obs_id == value[0], f'obs_id key {key} value {value[0]}'
         assert test_subject.product_id == value[1], f'product_id key {key} value {value[1]}'
         assert test_subject.blueprint_name == value[2], f'blueprint name key {key} value {value[2]}'
+
+
+@patch('apero2caom2.main_app.get_local_file_headers')
+@patch('apero2caom2.main_app.get_local_file_info')
+def test_discovered_metadata_reused(file_info_mock, headers_mock, test_config, test_data_dir, tmp_path):
+    test_fqn = f'{test_data_dir}/Template_s1dw_GL699_sc1d_w_file_AB/Template_s1dw_GL699_sc1d_w_file_AB.fits.header'
+    test_file_info = Mock()
+    test_headers = [{'DRSOBJN': 'GL699'}]
+    test_subject = APEROName(test_config.lookup.get('instrument'), [test_fqn])
+    test_subject.set_discovered(test_fqn, test_file_info, test_headers)
+    set_storage_name_from_local_preconditions(test_subject, tmp_path.as_posix(), logging.getLogger())
+    assert not file_info_mock.called, 'file info should be re-used'
+    assert not headers_mock.called, 'headers should be re-used'
+    test_uri = 'cadc:APERO/SPIRou/Template_s1dw_GL699_sc1d_w_file_AB.fits'
+    assert test_subject.file_info.get(test_uri) is test_file_info, 'file info'
+    assert test_subject.metadata.get(test_uri) is test_headers, 'headers'
+
+
+def test_group_by_observation(test_config):
+    instrument = test_config.lookup.get('instrument')
+    test_work = [
+        APEROName(instrument, [f'/tmp/{entry}'])
+        for entry in [
+            'APERO_v0.7_SPIROU_2426458e.fits',
+            'Template_s1dw_GL699_sc1d_w_file_AB.fits',
+            'APERO_v0.7_SPIROU_2426458p.fits',
+            'APERO_v0.7_SPIROU_2426458e_256.png',
+        ]
+    ]
+    test_result = group_by_observation(test_work)
+    assert len(test_result) == 2, 'one entry per observation'
+    test_group = test_result.popleft()
+    assert isinstance(test_group, APEROObservationGroup), 'group type'
+    assert test_group.obs_id == 'APERO_v0.7_SPIROU_2426458', 'group obs_id'
+    assert test_group.members == [test_work[0], test_work[2], test_work[3]], 'members, in order'
+    assert test_group.source_names == [
+        '/tmp/APERO_v0.7_SPIROU_2426458e.fits',
+        '/tmp/APERO_v0.7_SPIROU_2426458p.fits',
+        '/tmp/APERO_v0.7_SPIROU_2426458e_256.png',
+    ], 'all the source names for clean up'
+    assert test_result.popleft() is test_work[1], 'single file observations are not grouped'
+
+
+def test_classify_file_names(test_config, test_data_dir):
+    instrument = test_config.lookup.get('instrument')
+    test_names = [
+        entry
+        for entry in glob.glob(f'{test_data_dir}/**/*', recursive=True)
+        if '.' in entry.split('/')[-1] and not entry.endswith('.xml') and not entry.endswith('.py')
+    ]
+    # duplicates are classified once, and returned in place
+    test_names = test_names + test_names[:3]
+    test_result = classify_file_names(test_names, instrument)
+    for index, entry in enumerate(test_names):
+        expected = APEROName(instrument, [entry])
+        for key in ['file_id', 'suffix', 'obs_id', 'product_id', 'blueprint_name']:
+            assert test_result[key][index] == getattr(expected, key), f'{key} for {entry}'
+
+
+def _group_executor(test_config):
+    test_config.use_local_files = True
+    test_subject = APEROGroupedLocalVisitRunnerMeta(Mock(), test_config, [], [], Mock())
+    test_subject._set_preconditions = Mock()
+    test_subject._visit_data = Mock()
+    test_subject._write_model = Mock()
+
+    def _read_mock():
+        test_subject._observation = SimpleObservation(
+            collection=test_config.collection,
+            observation_id='APERO_v0.7_SPIROU_2426458',
+            algorithm=Algorithm('exposure'),
+        )
+
+    test_subject._caom2_read = Mock(side_effect=_read_mock)
+    return test_subject
+
+
+def _test_group(test_config):
+    instrument = test_config.lookup.get('instrument')
+    return APEROObservationGroup(
+        [APEROName(instrument, [f'/tmp/APERO_v0.7_SPIROU_2426458{entry}.fits']) for entry in ['e', 'p', 'v']]
+    )
+
+
+def test_group_execute(test_config):
+    test_subject = _group_executor(test_config)
+    test_group = _test_group(test_config)
+
+    def _visit_meta_mock():
+        test_subject._observation.planes.add(Plane(test_subject._storage_name.product_id))
+
+    stored = []
+    test_subject._visit_meta = Mock(side_effect=_visit_meta_mock)
+    test_subject._caom2_store = Mock(side_effect=lambda: stored.append(sorted(test_subject._observation.planes.keys())))
+    test_subject.execute({'storage_name': test_group})
+    assert test_subject._caom2_read.call_count == 1, 'one read for the group'
+    assert test_subject._visit_meta.call_count == 3, 'visitors for every member'
+    assert stored == [sorted(member.product_id for member in test_group.members)], 'one store with every plane'
+    assert test_group.completed and test_group.failure is None, 'outcome'
+
+
+def test_group_execute_visit_failure(test_config):
+    test_subject = _group_executor(test_config)
+    test_group = _test_group(test_config)
+
+    def _visit_meta_mock():
+        # File2caom2Visitor reports the failure and returns None
+        if test_subject._storage_name is test_group.members[1]:
+            test_subject._observation = None
+
+    test_subject._visit_meta = Mock(side_effect=_visit_meta_mock)
+    test_subject._caom2_store = Mock()
+    with pytest.raises(CadcException):
+        test_subject.execute({'storage_name': test_group})
+    assert test_subject._visit_meta.call_count == 2, 'stops at the failed member'
+    assert not test_subject._caom2_store.called, 'nothing stored for the group'
+    assert not test_group.completed and isinstance(test_group.failure[0], CadcException), 'failure kept'
+
+
+@patch('caom2pipe.execute_composable.OrganizeExecutesRunnerMeta.do_one')
+def test_group_reporting(do_one_mock, test_config):
+    do_one_mock.return_value = (0, None)
+    test_subject = APEROOrganizeExecutesRunnerMeta.__new__(APEROOrganizeExecutesRunnerMeta)
+    test_subject._reporter = Mock()
+    test_group = _test_group(test_config)
+    test_group.completed = True
+    assert test_subject.do_one(test_group) == (0, None), 'result'
+    assert [entry.args[1] for entry in test_subject._reporter.capture_success.call_args_list] == [
+        'APERO_v0.7_SPIROU_2426458p.fits',
+        'APERO_v0.7_SPIROU_2426458v.fits',
+    ], 'the first member is reported by OrganizeExecutes'
+
+    test_subject._reporter = Mock()
+    test_group = _test_group(test_config)
+    test_group.failure = (CadcException('test'), 'stack trace')
+    test_subject.do_one(test_group)
+    assert not test_subject._reporter.capture_success.called, 'no success'
+    assert test_subject._reporter.capture_failure.call_count == 2, 'failure for the rest of the members'
@@ -0,0 +1,221 @@
+# ***********************************************************************
+# ******************  CANADIAN ASTRONOMY DATA CENTRE  *******************
+# *************  CENTRE CANADIEN DE DONNÉES ASTRONOMIQUES  **************
+#
+#  (c) 2026.                            (c) 2026.
+#  Government of Canada                 Gouvernement du Canada
+#  National Research Council            Conseil national de recherches
+#  Ottawa, Canada, K1A 0R6              Ottawa, Canada, K1A 0R6
+#  All rights reserved                  Tous droits réservés
+#
+#  NRC disclaims any warranties,        Le CNRC dénie toute garantie
+#  expressed, implied, or               énoncée, implicite ou légale,
+#  statutory, of any kind with          de quelque nature que ce
+#  respect to the software,             soit, concernant le logiciel,
+#  including without limitation         y compris sans restriction
+#  any warranty of merchantability      toute garantie de valeur
+#  or fitness for a particular          marchande ou de pertinence
+#  purpose. NRC shall not be            pour un usage particulier.
+#  liable in any event for any          Le CNRC ne pourra en aucun cas
+#  damages, whether direct or           être tenu responsable de tout
+#  indirect, special or general,        dommage, direct ou indirect,
+#  consequential or incidental,         particulier ou général,
+#  arising from the use of the          accessoire ou fortuit, résultant
+#  software.  Neither the name          de l'utilisation du logiciel. Ni
+#  of the National Research             le nom du Conseil National de
+#  Council of Canada nor the            Recherches du Canada ni les noms
+#  names of its contributors may        de ses  participants ne peuvent
+#  be used to endorse or promote        être utilisés pour approuver ou
+#  products derived from this           promouvoir les produits dérivés
+#  software without specific prior      de ce logiciel sans autorisation
+#  written permission.                  préalable et particulière
+#                                       par écrit.
+#
+#  This file is part of the             Ce fichier fait partie du projet
+#  OpenCADC project.                    OpenCADC.
+#
+#  OpenCADC is free software:           OpenCADC est un logiciel libre ;
+#  you can redistribute it and/or       vous pouvez le redistribuer ou le
+#  modify it under the terms of         modifier suivant les termes de
+#  the GNU Affero General Public        la “GNU Affero General Public
+#  License as published by the          License” telle que publiée
+#  Free Software Foundation,            par la Free Software Foundation
+#  either version 3 of the              : soit la version 3 de cette
+#  License, or (at your option)         licence, soit (à votre gré)
+#  any later version.                   toute version ultérieure.
+#
+#  OpenCADC is distributed in the       OpenCADC est distribué
+#  hope that it will be useful,         dans l’espoir qu’il vous
+#  but WITHOUT ANY WARRANTY;            sera utile, mais SANS AUCUNE
+#  without even the implied             GARANTIE : sans même la garantie
+#  warranty of MERCHANTABILITY          implicite de COMMERCIALISABILITÉ
+#  or FITNESS FOR A PARTICULAR          ni d’ADÉQUATION À UN OBJECTIF
+#  PURPOSE.  See the GNU Affero         PARTICULIER. Consultez la Licence
+#  General Public License for           Générale Publique GNU Affero
+#  more details.                        pour plus de détails.
+#
+#  You should have received             Vous devriez avoir reçu une
+#  a copy of the GNU Affero             copie de la Licence Générale
+#  General Public License along         Publique GNU Affero avec
+#  with OpenCADC.  If not, see          OpenCADC ; si ce n’est
+#  <http://www.gnu.org/licenses/>.      pas le cas, consultez :
+#                                       <http://www.gnu.org/licenses/>.
+#
+#  $Revision: 4 $
+#
+# ***********************************************************************
+#
+
+import logging
+import pytest
+
+from mock import Mock, patch
+
+from caom2 import (
+    Algorithm,
+    Artifact,
+    Axis,
+    Chunk,
+    CoordAxis1D,
+    CoordFunction1D,
+    Part,
+    Plane,
+    ProductType,
+    RefCoord,
+    ReleaseType,
+    SimpleObservation,
+    SpectralWCS,
+)
+from caom2pipe.manage_composable import CadcException
+from caom2utils.wcsvalidator import InvalidWCSError
+from apero2caom2.main_app import APEROValidateExecute
+from apero2caom2.validation import get_validation_level, validate_observation, WcsValidationMemo
+
+
+class _Axis:
+    def __init__(self, ctype, crval):
+        self.ctype = ctype
+        self.crval = crval
+
+
+class _Chunk:
+    def __init__(self, crval, chunk_id):
+        self._id = chunk_id
+        self.naxis = 2
+        self.energy = _Axis('WAVE', crval)
+        self.position = [_Axis('RA---TAN', 10.0), _Axis('DEC--TAN', 20.0)]
+
+
+def _observation(crvals):
+    planes = {}
+    for index, crval in enumerate(crvals):
+        uri = f'cadc:APERO/SPIRou/APERO_v0.7_SPIROU_251030{index}e.fits'
+        part = Mock(chunks=[_Chunk(crval, index)])
+        artifact = Mock(uri=uri, parts={'0': part})
+        planes[f'DRS_POST_{index}'] = Mock(artifacts={uri: artifact})
+    return Mock(planes=planes)
+
+
+def _chunk_validate(entity, deep):
+    # the caomvalidator checks, for entities that are not chunks, and for the chunks, which include the WCS checks
+    if isinstance(entity, _Chunk):
+        if entity.naxis is None:
+            raise AssertionError('chunk without naxis')
+        if entity.energy.crval < 0:
+            raise InvalidWCSError('bad energy')
+
+
+@patch('apero2caom2.validation.validate', side_effect=_chunk_validate)
+def test_validate_observation(validate_mock, test_config):
+    assert get_validation_level(test_config) == 'full', 'default'
+    test_config.lookup['validation_level'] = 'wrong'
+    with pytest.raises(CadcException):
+        get_validation_level(test_config)
+
+    observation = _observation([1.0, 1.0])
+    validate_observation(observation, 'off')
+    validate_observation(None, 'full')
+    assert not validate_mock.called, 'off, or no observation'
+
+    validate_observation(observation, 'structural')
+    validate_mock.assert_called_once_with(observation, deep=False)
+
+    with patch('apero2caom2.validation._wcs_memo', WcsValidationMemo()) as memo:
+        validate_mock.reset_mock()
+        validate_observation(observation, 'full')
+        # observation, 2 x (plane, artifact, part), and identical chunks are checked once
+        assert validate_mock.call_count == 1 + 6 + 1, 'entity checks'
+        assert memo.hits == 1 and memo.misses == 1, 'memo'
+
+        # the artifact with the invalid WCS is reported
+        with pytest.raises(InvalidWCSError, match='cadc:APERO/SPIRou/APERO_v0.7_SPIROU_2510301e.fits: bad energy'):
+            validate_observation(_observation([1.0, -1.0]), 'full')
+        # the outcome for an identical invalid chunk is remembered
+        validate_mock.reset_mock()
+        with pytest.raises(InvalidWCSError, match='cadc:APERO/SPIRou/APERO_v0.7_SPIROU_2510300e.fits: bad energy'):
+            validate_observation(_observation([-1.0]), 'full')
+        assert validate_mock.call_count == 1 + 3, 'invalid chunk checked once'
+
+        # a chunk with valid WCS, that fails the other caomvalidator checks, is rejected too
+        observation = _observation([1.0])
+        next(iter(observation.planes['DRS_POST_0'].artifacts.values())).parts['0'].chunks[0].naxis = None
+        with pytest.raises(AssertionError, match='APERO_v0.7_SPIROU_2510300e.fits: chunk without naxis'):
+            validate_observation(observation, 'full')
+
+
+@patch('apero2caom2.validation.validate')
+def test_wcs_validation_memo(validate_mock):
+    test_subject = WcsValidationMemo(max_size=1)
+    assert WcsValidationMemo.key(_Chunk(1.0, 0)) == WcsValidationMemo.key(_Chunk(1.0, 1)), 'ids are not WCS'
+    assert WcsValidationMemo.key(_Chunk(1.0, 0)) != WcsValidationMemo.key(_Chunk(2.0, 0)), 'different WCS'
+    test_subject.validate(_Chunk(1.0, 0))
+    test_subject.validate(_Chunk(2.0, 0))
+    test_subject.validate(_Chunk(1.0, 0))
+    assert test_subject.misses == 3, 'bounded'
+    assert validate_mock.call_count == 3, 'evicted outcomes are checked again'
+
+
+class _Store:
+    def __init__(self):
+        self.stored = False
+
+    def _caom2_store(self):
+        self.stored = True
+
+
+class _ValidateStore(APEROValidateExecute, _Store):
+    def __init__(self, observation, config):
+        super().__init__()
+        self._observation = observation
+        self._config = config
+        self._logger = logging.getLogger(self.__class__.__name__)
+
+
+def _energy_observation(**chunk_kwargs):
+    # a complete CAOM2 Observation, checked by the real caomvalidator and wcsvalidator
+    observation = SimpleObservation(collection='APERO', observation_id='2510300', algorithm=Algorithm('exposure'))
+    plane = Plane(product_id='2510300e')
+    artifact = Artifact('cadc:APERO/SPIRou/APERO_v0.7_SPIROU_2510300e.fits', ProductType.SCIENCE, ReleaseType.DATA)
+    part = Part('0')
+    for _ in range(2):
+        axis = CoordAxis1D(Axis('WAVE', 'um'), function=CoordFunction1D(4088, 0.001, RefCoord(0.5, 0.96)))
+        part.chunks.append(Chunk(energy=SpectralWCS(axis, 'TOPOCENT'), **chunk_kwargs))
+    artifact.parts.add(part)
+    plane.artifacts.add(artifact)
+    observation.planes.add(plane)
+    return observation
+
+
+def test_validate_execute(test_config):
+    test_subject = _ValidateStore(_energy_observation(), test_config)
+    with patch('apero2caom2.validation._wcs_memo', WcsValidationMemo()) as memo:
+        test_subject._caom2_store()
+        assert memo.misses == 1 and memo.hits == 1, 'chunk WCS checked once'
+    assert test_subject.stored, 'stored after validation'
+
+    # an observation that is not valid is not stored
+    test_subject = _ValidateStore(_energy_observation(energy_axis=3, naxis=2), test_config)
+    with patch('apero2caom2.validation._wcs_memo', WcsValidationMemo()):
+        with pytest.raises(InvalidWCSError, match='APERO_v0.7_SPIROU_2510300e.fits: Invalid Axes'):
+            test_subject._caom2_store()
+    assert not test_subject.stored, 'not stored'
@@ -0,0 +1,217 @@
+# ***********************************************************************
+# ******************  CANADIAN ASTRONOMY DATA CENTRE  *******************
+# *************  CENTRE CANADIEN DE DONNÉES ASTRONOMIQUES  **************
+#
+#  (c) 2026.                            (c) 2026.
+#  Government of Canada                 Gouvernement du Canada
+#  National Research Council            Conseil national de recherches
+#  Ottawa, Canada, K1A 0R6              Ottawa, Canada, K1A 0R6
+#  All rights reserved                  Tous droits réservés
+#
+#  NRC disclaims any warranties,        Le CNRC dénie toute garantie
+#  expressed, implied, or               énoncée, implicite ou légale,
+#  statutory, of any kind with          de quelque nature que ce
+#  respect to the software,             soit, concernant le logiciel,
+#  including without limitation         y compris sans restriction
+#  any warranty of merchantability      toute garantie de valeur
+#  or fitness for a particular          marchande ou de pertinence
+#  purpose. NRC shall not be            pour un usage particulier.
+#  liable in any event for any          Le CNRC ne pourra en aucun cas
+#  damages, whether direct or           être tenu responsable de tout
+#  indirect, special or general,        dommage, direct ou indirect,
+#  consequential or incidental,         particulier ou général,
+#  arising from the use of the          accessoire ou fortuit, résultant
+#  software.  Neither the name          de l'utilisation du logiciel. Ni
+#  of the National Research             le nom du Conseil National de
+#  Council of Canada nor the            Recherches du Canada ni les noms
+#  names of its contributors may        de ses  participants ne peuvent
+#  be used to endorse or promote        être utilisés pour approuver ou
+#  products derived from this           promouvoir les produits dérivés
+#  software without specific prior      de ce logiciel sans autorisation
+#  written permission.                  préalable et particulière
+#                                       par écrit.
+#
+#  This file is part of the             Ce fichier fait partie du projet
+#  OpenCADC project.                    OpenCADC.
+#
+#  OpenCADC is free software:           OpenCADC est un logiciel libre ;
+#  you can redistribute it and/or       vous pouvez le redistribuer ou le
+#  modify it under the terms of         modifier suivant les termes de
+#  the GNU Affero General Public        la “GNU Affero General Public
+#  License as published by the          License” telle que publiée
+#  Free Software Foundation,            par la Free Software Foundation
+#  either version 3 of the              : soit la version 3 de cette
+#  License, or (at your option)         licence, soit (à votre gré)
+#  any later version.                   toute version ultérieure.
+#
+#  OpenCADC is distributed in the       OpenCADC est distribué
+#  hope that it will be useful,         dans l’espoir qu’il vous
+#  but WITHOUT ANY WARRANTY;            sera utile, mais SANS AUCUNE
+#  without even the implied             GARANTIE : sans même la garantie
+#  warranty of MERCHANTABILITY          implicite de COMMERCIALISABILITÉ
+#  or FITNESS FOR A PARTICULAR          ni d’ADÉQUATION À UN OBJECTIF
+#  PURPOSE.  See the GNU Affero         PARTICULIER. Consultez la Licence
+#  General Public License for           Générale Publique GNU Affero
+#  more details.                        pour plus de détails.
+#
+#  You should have received             Vous devriez avoir reçu une
+#  a copy of the GNU Affero             copie de la Licence Générale
+#  General Public License along         Publique GNU Affero avec
+#  with OpenCADC.  If not, see          OpenCADC ; si ce n’est
+#  <http://www.gnu.org/licenses/>.      pas le cas, consultez :
+#                                       <http://www.gnu.org/licenses/>.
+#
+#  $Revision: 4 $
+#
+# ***********************************************************************
+#
+
+"""
+Validate each CAOM2 Observation once, after all the visitors have run for its unit of work, instead of after every
+blueprint of every file.
+
+The validation_level lookup value chooses the checks:
+- off: no validation
+- structural: the Observation-level checks, without the checks of the planes, artifacts, and chunk WCS
+- full: the caomvalidator checks of every entity, including every chunk. The chunk checks include the wcsvalidator
+  checks. The URI of the artifact with the invalid chunk is reported.
+
+Many APERO chunks have the same WCS, e.g. the energy axis and the CD matrix, so the outcome of a chunk check is kept
+in a bounded, process-wide memo, keyed by a hash of the chunk values. The check of an identical chunk is then a dict
+look-up.
+"""
+
+import hashlib
+
+from collections import OrderedDict
+from uuid import UUID
+
+from caom2utils.caomvalidator import validate
+from caom2utils.wcsvalidator import InvalidWCSError
+from caom2pipe.manage_composable import CadcException
+
+
+__all__ = ['get_validation_level', 'validate_observation', 'VALIDATION_LEVELS', 'WcsValidationMemo']
+
+VALIDATION_LEVELS = ['off', 'structural', 'full']
+
+# the entity bookkeeping attributes, which do not affect WCS validity
+_NOT_WCS = {'_id', '_last_modified', '_max_last_modified', '_meta_checksum', '_acc_meta_checksum', '_meta_producer'}
+
+
+def _canonical(value):
+    """
+    :return: a representation of a CAOM2 value built only from tuples, str, numbers, bool and None, that is equal for
+        equal WCS values
+    """
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    if isinstance(value, (list, tuple)):
+        return tuple(_canonical(entry) for entry in value)
+    if isinstance(value, dict):
+        return tuple(sorted((repr(key), _canonical(entry)) for key, entry in value.items()))
+    if isinstance(value, (set, frozenset)):
+        return tuple(sorted(repr(_canonical(entry)) for entry in value))
+    if isinstance(value, UUID):
+        return str(value)
+    if hasattr(value, '__dict__'):
+        return (value.__class__.__name__,) + tuple(
+            (key, _canonical(entry)) for key, entry in sorted(vars(value).items()) if key not in _NOT_WCS
+        )
+    # e.g. enum values
+    return repr(value)
+
+
+class WcsValidationMemo:
+    """Least-recently-used outcomes of the caomvalidator chunk checks, keyed by a hash of the chunk values.
+
+    caomvalidator.validate checks a chunk with wcsvalidator.validate_wcs, so a chunk is checked once, by validate,
+    and not by validate_wcs as well.
+    """
+
+    def __init__(self, max_size=65536):
+        self._max_size = max_size
+        self._outcomes = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+
+    @property
+    def hits(self):
+        return self._hits
+
+    @property
+    def misses(self):
+        return self._misses
+
+    @staticmethod
+    def key(chunk):
+        """
+        :param chunk: Chunk
+        :return: bytes hash of the chunk WCS values
+        """
+        return hashlib.blake2b(repr(_canonical(chunk)).encode(), digest_size=16).digest()
+
+    def validate(self, chunk):
+        """
+        :param chunk: Chunk
+        :raises AssertionError, InvalidWCSError: as caomvalidator.validate does, for the chunk or an identical one
+        """
+        key = self.key(chunk)
+        if key in self._outcomes:
+            self._hits += 1
+            self._outcomes.move_to_end(key)
+            outcome = self._outcomes[key]
+        else:
+            self._misses += 1
+            try:
+                validate(chunk, deep=False)
+                outcome = None
+            except InvalidWCSError as e:
+                outcome = (InvalidWCSError, e.value)
+            except AssertionError as e:
+                outcome = (AssertionError, str(e))
+            self._outcomes[key] = outcome
+            if len(self._outcomes) > self._max_size:
+                self._outcomes.popitem(last=False)
+        if outcome is not None:
+            raise outcome[0](outcome[1])
+
+
+_wcs_memo = WcsValidationMemo()
+
+
+def get_validation_level(config):
+    """
+    :param config: caom2pipe.manage_composable.Config
+    :return: str one of VALIDATION_LEVELS
+    """
+    result = config.lookup.get('validation_level', 'full')
+    if result not in VALIDATION_LEVELS:
+        raise CadcException(f'validation_level must be one of {VALIDATION_LEVELS}, not {result}.')
+    return result
+
+
+def validate_observation(observation, level='full'):
+    """
+    :param observation: Observation, or None
+    :param level: str one of VALIDATION_LEVELS
+    :raises AssertionError, InvalidWCSError: with the URI of the first artifact with an invalid chunk
+    """
+    if observation is None or level == 'off':
+        return
+    validate(observation, deep=False)
+    if level == 'structural':
+        return
+    for plane in observation.planes.values():
+        validate(plane, deep=False)
+        for artifact in plane.artifacts.values():
+            validate(artifact, deep=False)
+            for part in artifact.parts.values():
+                validate(part, deep=False)
+                for chunk in part.chunks:
+                    try:
+                        _wcs_memo.validate(chunk)
+                    except InvalidWCSError as e:
+                        raise InvalidWCSError(f'{artifact.uri}: {e.value}') from e
+                    except AssertionError as e:
+                        raise AssertionError(f'{artifact.uri}: {e}') from e
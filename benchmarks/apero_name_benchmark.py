@@ -0,0 +1,218 @@
+# ***********************************************************************
+# ******************  CANADIAN ASTRONOMY DATA CENTRE  *******************
+# *************  CENTRE CANADIEN DE DONNÉES ASTRONOMIQUES  **************
+#
+#  (c) 2026.                            (c) 2026.
+#  Government of Canada                 Gouvernement du Canada
+#  National Research Council            Conseil national de recherches
+#  Ottawa, Canada, K1A 0R6              Ottawa, Canada, K1A 0R6
+#  All rights reserved                  Tous droits réservés
+#
+#  NRC disclaims any warranties,        Le CNRC dénie toute garantie
+#  expressed, implied, or               énoncée, implicite ou légale,
+#  statutory, of any kind with          de quelque nature que ce
+#  respect to the software,             soit, concernant le logiciel,
+#  including without limitation         y compris sans restriction
+#  any warranty of merchantability      toute garantie de valeur
+#  or fitness for a particular          marchande ou de pertinence
+#  purpose. NRC shall not be            pour un usage particulier.
+#  liable in any event for any          Le CNRC ne pourra en aucun cas
+#  damages, whether direct or           être tenu responsable de tout
+#  indirect, special or general,        dommage, direct ou indirect,
+#  consequential or incidental,         particulier ou général,
+#  arising from the use of the          accessoire ou fortuit, résultant
+#  software.  Neither the name          de l'utilisation du logiciel. Ni
+#  of the National Research             le nom du Conseil National de
+#  Council of Canada nor the            Recherches du Canada ni les noms
+#  names of its contributors may        de ses  participants ne peuvent
+#  be used to endorse or promote        être utilisés pour approuver ou
+#  products derived from this           promouvoir les produits dérivés
+#  software without specific prior      de ce logiciel sans autorisation
+#  written permission.                  préalable et particulière
+#                                       par écrit.
+#
+#  This file is part of the             Ce fichier fait partie du projet
+#  OpenCADC project.                    OpenCADC.
+#
+#  OpenCADC is free software:           OpenCADC est un logiciel libre ;
+#  you can redistribute it and/or       vous pouvez le redistribuer ou le
+#  modify it under the terms of         modifier suivant les termes de
+#  the GNU Affero General Public        la “GNU Affero General Public
+#  License as published by the          License” telle que publiée
+#  Free Software Foundation,            par la Free Software Foundation
+#  either version 3 of the              : soit la version 3 de cette
+#  License, or (at your option)         licence, soit (à votre gré)
+#  any later version.                   toute version ultérieure.
+#
+#  OpenCADC is distributed in the       OpenCADC est distribué
+#  hope that it will be useful,         dans l’espoir qu’il vous
+#  but WITHOUT ANY WARRANTY;            sera utile, mais SANS AUCUNE
+#  without even the implied             GARANTIE : sans même la garantie
+#  warranty of MERCHANTABILITY          implicite de COMMERCIALISABILITÉ
+#  or FITNESS FOR A PARTICULAR          ni d’ADÉQUATION À UN OBJECTIF
+#  PURPOSE.  See the GNU Affero         PARTICULIER. Consultez la Licence
+#  General Public License for           Générale Publique GNU Affero
+#  more details.                        pour plus de détails.
+#
+#  You should have received             Vous devriez avoir reçu une
+#  a copy of the GNU Affero             copie de la Licence Générale
+#  General Public License along         Publique GNU Affero avec
+#  with OpenCADC.  If not, see          OpenCADC ; si ce n’est
+#  <http://www.gnu.org/licenses/>.      pas le cas, consultez :
+#                                       <http://www.gnu.org/licenses/>.
+#
+#  $Revision: 4 $
+#
+# ***********************************************************************
+#
+
+"""
+Micro-benchmark for the APEROName file name parsing.
+
+Compares the per-instance parsing that APEROName used to do (a sequence number match, an obs_id search, the product
+id chain, and the blueprint branches on every access), with parse_apero_name, uncached and cached, over realistic
+SPIRou file names. Each name is constructed --passes times, as it is during work discovery, execution, and provenance
+handling. The legacy parsing repeats the blueprint branches for each of --accesses blueprint_name accesses, where
+APEROName now keeps the parsed values on the instance.
+
+Usage:
+    python benchmarks/apero_name_benchmark.py [--count 1000000] [--accesses 3]
+"""
+
+import argparse
+import random
+
+from re import match, search
+from time import perf_counter
+
+from apero2caom2.main_app import APEROName, parse_apero_name
+
+
+TARGETS = ['GL699', 'GL436', 'GJ1002', 'TOI1452', 'HD189733', 'AUMIC', 'GL15A', 'WOLF359']
+
+
+def build_names(count, seed=42):
+    """
+    :param count: int number of names
+    :return: list of str file names, in the mix of products that one night of APERO output has
+    """
+    rng = random.Random(seed)
+    result = []
+    while len(result) < count:
+        sequence = rng.randint(2300000, 2799999)
+        target = rng.choice(TARGETS)
+        for f_name in [
+            f'APERO_v0.7_SPIROU_{sequence}e.fits',
+            f'APERO_v0.7_SPIROU_{sequence}p.fits',
+            f'APERO_v0.7_SPIROU_{sequence}s.fits',
+            f'APERO_v0.7_SPIROU_{sequence}t.fits',
+            f'APERO_v0.7_SPIROU_{sequence}v.fits',
+            f'APERO_v0.7_SPIROU_{sequence}e_256.png',
+            f'APERO_v0.7_SPIROU_{sequence}o_pp_e2dsff_tcorr_AB_{target}_{target}_lbl.fits',
+            f'APERO_v0.7_SPIROU_Template_s1dw_{target}_sc1d_w_file_AB.fits',
+            f'APERO_v0.7_SPIROU_Template_{target}_tellu_obj_AB.fits',
+            f'APERO_v0.7_SPIROU_lbl_{target}_{target}.rdb',
+            f'APERO_v0.7_SPIROU_lbl2_{target}_{target}_drift.fits',
+        ]:
+            result.append(f_name)
+    return result[:count]
+
+
+def legacy_parse(file_name, instrument, accesses):
+    """The parsing as it was done by the APEROName set_file_id, set_obs_id, set_product_id, and blueprint_name
+    implementations, before parse_apero_name."""
+    file_id = APEROName.remove_extensions(file_name)
+    suffix = None
+    if match('^[0-9]{5,7}', file_name):
+        suffix = file_id.split('_')[0][-1]
+    temp = search('[0-9]{5,7}', file_name)
+    if temp:
+        suffix = file_name[temp.end()]
+    temp_file_id = file_id
+    if file_name.endswith('.png'):
+        temp_file_id = file_id.replace('.png', '').replace('_256', '')
+    if suffix and temp_file_id[-1] == suffix:
+        obs_id = temp_file_id[:-1]
+    else:
+        obs_id = temp_file_id
+    if '_Template_' in file_id:
+        if '_s1dw_' in file_id:
+            product_id = 'TELLU_TEMP_S1DW'
+        elif '_s1dv_' in file_id:
+            product_id = 'TELLU_TEMP_S1DV'
+        else:
+            product_id = 'TELLU_TEMP'
+    elif '_lbl2' in file_id:
+        product_id = 'LBL_RDB2_DRIFT' if '_drift' in file_id else 'LBL_RDB2'
+        if file_name.endswith('.fits'):
+            product_id = product_id.replace('RDB2', 'FITS')
+    elif '_lbl' in file_id:
+        product_id = 'LBL_RDB_DRIFT' if '_drift' in file_id else 'LBL_RDB'
+        if file_name.endswith('lbl.fits') or file_name.endswith('lbl.png') or file_name.endswith('lbl_256.png'):
+            product_id = 'LBL_FITS'
+        elif file_name.endswith('.fits') or file_name.endswith('.png'):
+            product_id = f'{product_id}_FITS'
+    elif suffix and len(file_name.split('_')) in [4, 5]:
+        product_id = f'DRS_POST_{suffix.upper()}'
+    else:
+        product_id = 'NO_GUIDANCE'
+    blueprint_name = None
+    for _ in range(accesses):
+        obs_cardinality = 'derived'
+        if product_id.startswith('DRS_POST_') or suffix == 'o':
+            obs_cardinality = 'simple'
+        if file_name.endswith('.png') or file_name.endswith('.rdb') or file_name.endswith('.txt'):
+            wcs_axes = 'no_wcs'
+        elif product_id == 'LBL_RDB_FITS':
+            wcs_axes = 'lbl_rdb_fits'
+        elif obs_cardinality == 'simple':
+            if suffix == 'p':
+                wcs_axes = 'polarization_spatial_spectral_temporal'
+            elif suffix == 'o':
+                wcs_axes = 'spatial_temporal'
+            else:
+                wcs_axes = 'spatial_spectral_temporal'
+        else:
+            wcs_axes = 'spatial_temporal'
+        blueprint_name = f'{instrument.lower()}_{obs_cardinality}_{wcs_axes}.bp'
+    return file_id, suffix, obs_id, product_id, blueprint_name
+
+
+def _time(label, function, names, passes):
+    start = perf_counter()
+    for f_name in names:
+        # the work for a name is done start to finish before the next name, so the constructions of one name are
+        # close together
+        for _ in range(passes):
+            function(f_name)
+    elapsed = perf_counter() - start
+    print(f'{label:<40} {elapsed:8.3f}s {elapsed / (len(names) * passes) * 1e9:10.1f} ns/construction')
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--count', type=int, default=1000000, help='number of file names')
+    parser.add_argument('--accesses', type=int, default=3, help='blueprint_name accesses for each name')
+    parser.add_argument('--passes', type=int, default=3, help='times each name is parsed in a pipeline run')
+    args = parser.parse_args()
+    instrument = 'SPIRou'
+    names = build_names(args.count)
+    print(f'{len(names)} names, {len(set(names))} unique, {args.passes} passes, {args.accesses} blueprint accesses')
+
+    for f_name in set(names):
+        legacy = legacy_parse(f_name, instrument, 1)
+        parsed = parse_apero_name(f_name, instrument)
+        assert legacy == parsed[:5], f'{f_name}: {legacy} != {parsed[:5]}'
+
+    uncached = parse_apero_name.__wrapped__
+    parse_apero_name.cache_clear()
+    legacy = _time('legacy', lambda x: legacy_parse(x, instrument, args.accesses), names, args.passes)
+    single = _time('parse_apero_name, uncached', lambda x: uncached(x, instrument), names, args.passes)
+    cached = _time('parse_apero_name, lru_cache', lambda x: parse_apero_name(x, instrument), names, args.passes)
+    print(f'speedup: uncached {legacy / single:.2f}x, cached {legacy / cached:.2f}x')
+    print(parse_apero_name.cache_info())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,176 @@
+# ***********************************************************************
+# ******************  CANADIAN ASTRONOMY DATA CENTRE  *******************
+# *************  CENTRE CANADIEN DE DONNÉES ASTRONOMIQUES  **************
+#
+#  (c) 2026.                            (c) 2026.
+#  Government of Canada                 Gouvernement du Canada
+#  National Research Council            Conseil national de recherches
+#  Ottawa, Canada, K1A 0R6              Ottawa, Canada, K1A 0R6
+#  All rights reserved                  Tous droits réservés
+#
+#  NRC disclaims any warranties,        Le CNRC dénie toute garantie
+#  expressed, implied, or               énoncée, implicite ou légale,
+#  statutory, of any kind with          de quelque nature que ce
+#  respect to the software,             soit, concernant le logiciel,
+#  including without limitation         y compris sans restriction
+#  any warranty of merchantability      toute garantie de valeur
+#  or fitness for a particular          marchande ou de pertinence
+#  purpose. NRC shall not be            pour un usage particulier.
+#  liable in any event for any          Le CNRC ne pourra en aucun cas
+#  damages, whether direct or           être tenu responsable de tout
+#  indirect, special or general,        dommage, direct ou indirect,
+#  consequential or incidental,         particulier ou général,
+#  arising from the use of the          accessoire ou fortuit, résultant
+#  software.  Neither the name          de l'utilisation du logiciel. Ni
+#  of the National Research             le nom du Conseil National de
+#  Council of Canada nor the            Recherches du Canada ni les noms
+#  names of its contributors may        de ses  participants ne peuvent
+#  be used to endorse or promote        être utilisés pour approuver ou
+#  products derived from this           promouvoir les produits dérivés
+#  software without specific prior      de ce logiciel sans autorisation
+#  written permission.                  préalable et particulière
+#                                       par écrit.
+#
+#  This file is part of the             Ce fichier fait partie du projet
+#  OpenCADC project.                    OpenCADC.
+#
+#  OpenCADC is free software:           OpenCADC est un logiciel libre ;
+#  you can redistribute it and/or       vous pouvez le redistribuer ou le
+#  modify it under the terms of         modifier suivant les termes de
+#  the GNU Affero General Public        la “GNU Affero General Public
+#  License as published by the          License” telle que publiée
+#  Free Software Foundation,            par la Free Software Foundation
+#  either version 3 of the              : soit la version 3 de cette
+#  License, or (at your option)         licence, soit (à votre gré)
+#  any later version.                   toute version ultérieure.
+#
+#  OpenCADC is distributed in the       OpenCADC est distribué
+#  hope that it will be useful,         dans l’espoir qu’il vous
+#  but WITHOUT ANY WARRANTY;            sera utile, mais SANS AUCUNE
+#  without even the implied             GARANTIE : sans même la garantie
+#  warranty of MERCHANTABILITY          implicite de COMMERCIALISABILITÉ
+#  or FITNESS FOR A PARTICULAR          ni d’ADÉQUATION À UN OBJECTIF
+#  PURPOSE.  See the GNU Affero         PARTICULIER. Consultez la Licence
+#  General Public License for           Générale Publique GNU Affero
+#  more details.                        pour plus de détails.
+#
+#  You should have received             Vous devriez avoir reçu une
+#  a copy of the GNU Affero             copie de la Licence Générale
+#  General Public License along         Publique GNU Affero avec
+#  with OpenCADC.  If not, see          OpenCADC ; si ce n’est
+#  <http://www.gnu.org/licenses/>.      pas le cas, consultez :
+#                                       <http://www.gnu.org/licenses/>.
+#
+#  $Revision: 4 $
+#
+# ***********************************************************************
+#
+
+"""
+Benchmark for the process-wide blueprint cache in File2caom2Visitor.
+
+Visits the test headers with File2caom2Visitor, --repeat times each, first with the blueprint cache emptied before
+every visit, as when every destination URI loaded its blueprint file, and then with the cache kept between visits.
+Then compares the cost of loading each blueprint file with BlueprintPlan.instantiate, and counts the sorted entries.
+
+Usage:
+    python benchmarks/blueprint_cache_benchmark.py [--repeat 20] [--data-dir apero2caom2/tests/data]
+"""
+
+import argparse
+import glob
+import logging
+
+from os.path import basename, dirname, join, realpath
+from time import perf_counter
+
+from caom2pipe.manage_composable import Config, StorageName, TaskType
+from caom2utils.blueprints import ObsBlueprint
+
+from apero2caom2 import file2caom2_augmentation
+from apero2caom2.main_app import APEROName, set_storage_name_from_config
+
+
+def build_config(data_dir):
+    config = Config()
+    config.collection = 'APERO'
+    config.preview_scheme = 'cadc'
+    config.scheme = 'cadc'
+    config.task_types = [TaskType.INGEST]
+    config.lookup = {'instrument': 'SPIRou', 'blueprint_directory': f'{data_dir}/blueprints'}
+    config.meta_read_groups = ['ivo://cadc.nrc.ca/gms?CADC']
+    config.data_read_groups = config.meta_read_groups
+    StorageName.collection = config.collection
+    StorageName.preview_scheme = config.preview_scheme
+    StorageName.scheme = config.scheme
+    return config
+
+
+def build_storage_names(config, data_dir):
+    logger = logging.getLogger('benchmark')
+    result = []
+    for test_file_name in sorted(glob.glob(f'{data_dir}/try3/*.fits.header')):
+        storage_name = APEROName(
+            instrument=config.lookup.get('instrument'), source_names=[test_file_name.replace('.header', '')]
+        )
+        storage_name._source_names = [test_file_name]
+        set_storage_name_from_config(storage_name, config, logger)
+        result.append(storage_name)
+    return result
+
+
+def _time(label, storage_names, config, repeat, cold):
+    cache = file2caom2_augmentation._blueprint_cache
+    start = perf_counter()
+    for _ in range(repeat):
+        for storage_name in storage_names:
+            if cold:
+                cache.clear()
+            observation = file2caom2_augmentation.visit(None, storage_name=storage_name, config=config)
+            assert observation is not None, f'visit failed for {storage_name.file_name}'
+    elapsed = perf_counter() - start
+    print(f'{label:<20} {elapsed:8.3f}s {elapsed / (repeat * len(storage_names)) * 1e3:8.2f} ms/visit')
+    return elapsed
+
+
+def _time_copies(repeat):
+    cache = file2caom2_augmentation._blueprint_cache
+    for (bp_fqn, module_fqn), (mtime, module, plan) in sorted(cache._templates.items()):
+        start = perf_counter()
+        for _ in range(repeat):
+            ObsBlueprint(module=module).load_from_file(bp_fqn)
+        loaded = perf_counter() - start
+        start = perf_counter()
+        for _ in range(repeat):
+            plan.instantiate()
+        planned = perf_counter() - start
+        print(
+            f'{basename(bp_fqn):<60} load {loaded / repeat * 1e6:8.1f} us, plan {planned / repeat * 1e6:8.1f} us, '
+            f'{len(plan.constants)} constants, {len(plan.look_ups)} look-ups, {len(plan.functions)} functions'
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=20, help='visits for each file')
+    parser.add_argument(
+        '--data-dir',
+        default=join(dirname(dirname(realpath(__file__))), 'apero2caom2', 'tests', 'data'),
+        help='directory with the blueprints and try3 test headers',
+    )
+    args = parser.parse_args()
+    logging.getLogger().setLevel(logging.ERROR)
+    config = build_config(args.data_dir)
+    storage_names = build_storage_names(config, args.data_dir)
+    print(f'{len(storage_names)} files, {args.repeat} visits each')
+
+    cold = _time('load every visit', storage_names, config, args.repeat, cold=True)
+    cache = file2caom2_augmentation._blueprint_cache
+    hits, misses = cache.hits, cache.misses
+    warm = _time('cached', storage_names, config, args.repeat, cold=False)
+    print(f'speedup: {cold / warm:.2f}x, cached hits {cache.hits - hits}, misses {cache.misses - misses}')
+    _time_copies(args.repeat * 50)
+
+
+if __name__ == '__main__':
+    main()
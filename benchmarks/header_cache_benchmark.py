@@ -0,0 +1,174 @@
+# ***********************************************************************
+# ******************  CANADIAN ASTRONOMY DATA CENTRE  *******************
+# *************  CENTRE CANADIEN DE DONNÉES ASTRONOMIQUES  **************
+#
+#  (c) 2026.                            (c) 2026.
+#  Government of Canada                 Gouvernement du Canada
+#  National Research Council            Conseil national de recherches
+#  Ottawa, Canada, K1A 0R6              Ottawa, Canada, K1A 0R6
+#  All rights reserved                  Tous droits réservés
+#
+#  NRC disclaims any warranties,        Le CNRC dénie toute garantie
+#  expressed, implied, or               énoncée, implicite ou légale,
+#  statutory, of any kind with          de quelque nature que ce
+#  respect to the software,             soit, concernant le logiciel,
+#  including without limitation         y compris sans restriction
+#  any warranty of merchantability      toute garantie de valeur
+#  or fitness for a particular          marchande ou de pertinence
+#  purpose. NRC shall not be            pour un usage particulier.
+#  liable in any event for any          Le CNRC ne pourra en aucun cas
+#  damages, whether direct or           être tenu responsable de tout
+#  indirect, special or general,        dommage, direct ou indirect,
+#  consequential or incidental,         particulier ou général,
+#  arising from the use of the          accessoire ou fortuit, résultant
+#  software.  Neither the name          de l'utilisation du logiciel. Ni
+#  of the National Research             le nom du Conseil National de
+#  Council of Canada nor the            Recherches du Canada ni les noms
+#  names of its contributors may        de ses  participants ne peuvent
+#  be used to endorse or promote        être utilisés pour approuver ou
+#  products derived from this           promouvoir les produits dérivés
+#  software without specific prior      de ce logiciel sans autorisation
+#  written permission.                  préalable et particulière
+#                                       par écrit.
+#
+#  This file is part of the             Ce fichier fait partie du projet
+#  OpenCADC project.                    OpenCADC.
+#
+#  OpenCADC is free software:           OpenCADC est un logiciel libre ;
+#  you can redistribute it and/or       vous pouvez le redistribuer ou le
+#  modify it under the terms of         modifier suivant les termes de
+#  the GNU Affero General Public        la “GNU Affero General Public
+#  License as published by the          License” telle que publiée
+#  Free Software Foundation,            par la Free Software Foundation
+#  either version 3 of the              : soit la version 3 de cette
+#  License, or (at your option)         licence, soit (à votre gré)
+#  any later version.                   toute version ultérieure.
+#
+#  OpenCADC is distributed in the       OpenCADC est distribué
+#  hope that it will be useful,         dans l’espoir qu’il vous
+#  but WITHOUT ANY WARRANTY;            sera utile, mais SANS AUCUNE
+#  without even the implied             GARANTIE : sans même la garantie
+#  warranty of MERCHANTABILITY          implicite de COMMERCIALISABILITÉ
+#  or FITNESS FOR A PARTICULAR          ni d’ADÉQUATION À UN OBJECTIF
+#  PURPOSE.  See the GNU Affero         PARTICULIER. Consultez la Licence
+#  General Public License for           Générale Publique GNU Affero
+#  more details.                        pour plus de détails.
+#
+#  You should have received             Vous devriez avoir reçu une
+#  a copy of the GNU Affero             copie de la Licence Générale
+#  General Public License along         Publique GNU Affero avec
+#  with OpenCADC.  If not, see          OpenCADC ; si ce n’est
+#  <http://www.gnu.org/licenses/>.      pas le cas, consultez :
+#                                       <http://www.gnu.org/licenses/>.
+#
+#  $Revision: 4 $
+#
+# ***********************************************************************
+#
+
+"""
+Benchmark for the on-disk header cache.
+
+Writes the test headers to FITS files, with small data units, then reads the headers of every file --repeat times,
+with the astropy reader, with the seek reader from fits_structure, and from a HeaderCache keyed by the file md5sum.
+The md5sum is known before the headers are needed, so computing it is not part of the timing. Card values are parsed
+when they are first used, so --all-values includes the cost of using every value in every header.
+
+Usage:
+    python benchmarks/header_cache_benchmark.py [--repeat 20] [--all-values] [--data-dir apero2caom2/tests/data]
+"""
+
+import argparse
+import glob
+import numpy as np
+import os
+
+from astropy.io import fits
+from caom2utils.data_util import get_local_file_headers
+from hashlib import md5
+from os.path import basename, dirname, join, realpath
+from tempfile import TemporaryDirectory
+from time import perf_counter
+
+from apero2caom2.fits_structure import read_headers
+from apero2caom2.header_cache import HeaderCache
+
+
+def _read_header_text(fqn):
+    """:return: list of astropy Header instances from a '# HDU n' separated .fits.header test file"""
+    result = []
+    lines = []
+    with open(fqn) as f:
+        for line in f:
+            if line.startswith('# HDU'):
+                if lines:
+                    result.append(fits.Header.fromstring(''.join(lines), sep='\n'))
+                lines = []
+            else:
+                lines.append(line)
+    if lines:
+        result.append(fits.Header.fromstring(''.join(lines), sep='\n'))
+    return result
+
+
+def _data():
+    return np.random.default_rng().random(1024, dtype=np.float32)
+
+
+def build_files(data_dir, working_directory):
+    """:return: list of (fqn, md5sum) for a FITS file for each test header file"""
+    result = []
+    for header_fqn in sorted(glob.glob(f'{data_dir}/try3/*.fits.header')):
+        headers = _read_header_text(header_fqn)
+        # a small binary data unit for each HDU, so the file is read as FITS, and not as header text
+        hdus = [fits.PrimaryHDU(data=_data(), header=headers[0])]
+        hdus += [fits.ImageHDU(data=_data(), header=header) for header in headers[1:]]
+        fqn = join(working_directory, basename(header_fqn).replace('.header', ''))
+        fits.HDUList(hdus).writeto(fqn, output_verify='silentfix')
+        with open(fqn, 'rb') as f:
+            result.append((fqn, md5(f.read()).hexdigest()))
+    return result
+
+
+def _time(label, files, repeat, read, all_values):
+    start = perf_counter()
+    for _ in range(repeat):
+        for fqn, md5sum in files:
+            headers = read(fqn, md5sum)
+            assert headers, f'no headers for {fqn}'
+            if all_values:
+                for header in headers:
+                    for card in header.cards:
+                        card.value
+    elapsed = perf_counter() - start
+    print(f'{label:<10} {elapsed:8.3f}s {elapsed / (repeat * len(files)) * 1e3:8.2f} ms/file')
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=20, help='reads for each file')
+    parser.add_argument('--all-values', action='store_true', help='use every card value after each read')
+    parser.add_argument(
+        '--data-dir',
+        default=join(dirname(dirname(realpath(__file__))), 'apero2caom2', 'tests', 'data'),
+        help='directory with the try3 test headers',
+    )
+    args = parser.parse_args()
+    with TemporaryDirectory() as working_directory:
+        files = build_files(args.data_dir, working_directory)
+        cards = sum(len(header) for fqn, _ in files for header in read_headers(fqn))
+        print(f'{len(files)} files, {cards} cards, {args.repeat} reads each')
+        cache = HeaderCache(os.path.join(working_directory, 'cache'), max_bytes=1024 * 1024 * 1024)
+        for fqn, md5sum in files:
+            cache.put(md5sum, read_headers(fqn))
+        astropy_s = _time(
+            'astropy', files, args.repeat, lambda fqn, md5sum: get_local_file_headers(fqn), args.all_values
+        )
+        seek_s = _time('seek', files, args.repeat, lambda fqn, md5sum: read_headers(fqn), args.all_values)
+        cached_s = _time('cached', files, args.repeat, lambda fqn, md5sum: cache.get(md5sum), args.all_values)
+        print(f'speedup: {astropy_s / cached_s:.2f}x over astropy, {seek_s / cached_s:.2f}x over seek')
+
+
+if __name__ == '__main__':
+    main()